@@ -4,12 +4,103 @@ Download ZIP files from extracted download URLs and populate data_files table.
 """
 
 import sqlite3
+import sys
 import requests
-import hashlib
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-import uuid
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from infrastructure.etl.file_records import (
+    CHECKSUM_ALGO, ensure_checksum_algo_column, gen_ids, new_checksum
+)
+
+# Downloads are latency-bound, so overlap them across a pool of threads
+MAX_WORKERS = 16
+
+# Read size for streaming response bodies to disk
+CHUNK_SIZE = 65536
+
+# Number of data_files rows written per executemany/commit
+BATCH_SIZE = 50
+
+INSERT_SQL = '''
+    INSERT INTO data_files
+    (id, dataset_id, filename, file_path, file_size, file_format, checksum, checksum_algo, description, downloaded_at, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def build_session():
+    """Create a shared HTTP session with a keep-alive pool and retry on 5xx."""
+    session = requests.Session()
+    retries = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[502, 503, 504],
+        raise_on_status=False  # Hand the final response back to fetch_zip
+    )
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retries)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def zip_filename(download_url):
+    """Local filename for a ZIP download URL."""
+    filename = download_url.split('/')[-1]
+    if not filename.endswith('.zip'):
+        filename += '.zip'
+    return filename
+
+
+def fetch_zip(session, download_url, file_path):
+    """
+    Download a single ZIP file to file_path.
+
+    The body is streamed to a temporary file next to file_path and only
+    renamed into place once complete, so a failed or interrupted download
+    never leaves a truncated ZIP behind.
+
+    Returns:
+        Tuple of (filename, file_path, file_size, checksum)
+    """
+    response = session.get(download_url, timeout=(5, 30), stream=True)
+
+    # Bail out on the headers alone, before any of the body is transferred
+    if response.status_code != 200:
+        response.close()
+        raise requests.exceptions.HTTPError(f'HTTP {response.status_code}')
+
+    # Redirects to login or error pages come back as 200 text/html
+    content_type = response.headers.get('Content-Type', '')
+    if 'text/html' in content_type:
+        response.close()
+        raise requests.exceptions.HTTPError(f'Unexpected Content-Type: {content_type}')
+
+    # Stream to disk, hashing each chunk on the way through
+    digest = new_checksum()
+    file_size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=file_path.parent, prefix=f'.{file_path.name}.', suffix='.part')
+    try:
+        with response, os.fdopen(fd, 'wb') as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                digest.update(chunk)
+                f.write(chunk)
+                file_size += len(chunk)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    return file_path.name, file_path, file_size, digest.hexdigest()
+
 
 def download_zip_files(limit=20):
     """Download ZIP files from metadata download URLs."""
@@ -19,7 +110,9 @@ def download_zip_files(limit=20):
     docs_dir.mkdir(exist_ok=True)
 
     conn = sqlite3.connect('datasets.db')
+    conn.execute('PRAGMA journal_mode=WAL')
     cursor = conn.cursor()
+    ensure_checksum_algo_column(cursor, 'data_files')
 
     # Get datasets with ZIP URLs
     cursor.execute('''
@@ -34,6 +127,15 @@ def download_zip_files(limit=20):
     print(f'Found {len(rows)} datasets with ZIP URLs')
     print('=' * 60)
 
+    # URLs sharing a basename would race on one file; the first row wins
+    targets = {}
+    for dataset_id, download_url, title in rows:
+        file_path = docs_dir / zip_filename(download_url)
+        if file_path in targets:
+            print(f'Skipping duplicate target {file_path}: {download_url}')
+            continue
+        targets[file_path] = (dataset_id, download_url, title)
+
     stats = {
         'attempted': 0,
         'success': 0,
@@ -41,76 +143,74 @@ def download_zip_files(limit=20):
         'total_bytes': 0
     }
 
-    for dataset_id, download_url, title in rows:
-        stats['attempted'] += 1
-        print(f'\n[{stats["attempted"]}/{len(rows)}] Downloading: {title[:50]}...')
-        print(f'URL: {download_url}')
-
-        try:
-            # Download with timeout
-            response = requests.get(download_url, timeout=30, stream=True)
-
-            if response.status_code != 200:
-                print(f'  ✗ HTTP {response.status_code}')
+    session = build_session()
+    pending_inserts = []
+
+    # Network I/O runs on the pool; SQLite writes stay on this thread
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        futures = {
+            pool.submit(fetch_zip, session, download_url, file_path): (dataset_id, download_url, title)
+            for file_path, (dataset_id, download_url, title) in targets.items()
+        }
+
+        # One ID per URL; failures simply leave theirs unused
+        file_ids = gen_ids(len(futures))
+
+        for future in as_completed(futures):
+            dataset_id, download_url, title = futures[future]
+            stats['attempted'] += 1
+            print(f'\n[{stats["attempted"]}/{len(futures)}] {title[:50]}...')
+            print(f'URL: {download_url}')
+
+            try:
+                filename, file_path, file_size, checksum = future.result()
+
+                stats['total_bytes'] += file_size
+
+                # Queue row for the data_files table
+                file_id = file_ids[stats['attempted'] - 1]
+                now = datetime.utcnow()
+                pending_inserts.append((
+                    file_id,
+                    dataset_id,
+                    filename,
+                    str(file_path),
+                    file_size,
+                    'zip',
+                    checksum,
+                    CHECKSUM_ALGO,
+                    f'Downloaded from {download_url}',
+                    now,  # downloaded_at
+                    now  # created_at
+                ))
+
+                if len(pending_inserts) >= BATCH_SIZE:
+                    cursor.executemany(INSERT_SQL, pending_inserts)
+                    conn.commit()
+                    pending_inserts.clear()
+
+                print(f'  ✓ Downloaded: {file_size/1024:.1f} KB')
+                print(f'  ✓ Saved to: {file_path}')
+                stats['success'] += 1
+
+            except requests.exceptions.Timeout:
+                print(f'  ✗ Timeout (>30s)')
+                stats['failed'] += 1
+            except requests.exceptions.HTTPError as e:
+                print(f'  ✗ {e}')
+                stats['failed'] += 1
+            except requests.exceptions.RequestException as e:
+                print(f'  ✗ Network error: {e}')
                 stats['failed'] += 1
-                continue
-
-            # Get filename from URL
-            filename = download_url.split('/')[-1]
-            if not filename.endswith('.zip'):
-                filename += '.zip'
-
-            # Save to supporting_docs
-            file_path = docs_dir / filename
-
-            # Download content
-            content = response.content
-            file_size = len(content)
-
-            # Calculate checksum
-            checksum = hashlib.sha256(content).hexdigest()
-
-            # Write file
-            with open(file_path, 'wb') as f:
-                f.write(content)
-
-            stats['total_bytes'] += file_size
-
-            # Insert into data_files table
-            file_id = str(uuid.uuid4())
-            cursor.execute('''
-                INSERT INTO data_files
-                (id, dataset_id, filename, file_path, file_size, file_format, checksum, description, downloaded_at, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                file_id,
-                dataset_id,
-                filename,
-                str(file_path),
-                file_size,
-                'zip',
-                checksum,
-                f'Downloaded from {download_url}',
-                datetime.utcnow(),
-                datetime.utcnow()
-            ))
-
-            conn.commit()
-
-            print(f'  ✓ Downloaded: {file_size/1024:.1f} KB')
-            print(f'  ✓ Saved to: {file_path}')
-            stats['success'] += 1
-
-        except requests.exceptions.Timeout:
-            print(f'  ✗ Timeout (>30s)')
-            stats['failed'] += 1
-        except requests.exceptions.RequestException as e:
-            print(f'  ✗ Network error: {e}')
-            stats['failed'] += 1
-        except Exception as e:
-            print(f'  ✗ Error: {e}')
-            stats['failed'] += 1
+            except Exception as e:
+                print(f'  ✗ Error: {e}')
+                stats['failed'] += 1
+
+    session.close()
 
+    if pending_inserts:
+        cursor.executemany(INSERT_SQL, pending_inserts)
+        conn.commit()
     conn.close()
 
     print('\n' + '=' * 60)
@@ -5,17 +5,152 @@ and populate the supporting_documents table.
 """
 
 import sqlite3
+import sys
 import zipfile
-import hashlib
-import uuid
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from infrastructure.etl.file_records import (
+    CHECKSUM_ALGO, ensure_checksum_algo_column, gen_ids, new_checksum
+)
+
+# Read size when streaming ZIP members to disk
+CHUNK_SIZE = 65536
+
+# Documents larger than this are skipped (sanity cap)
+MAX_DOC_SIZE = 200 * 1024 * 1024
+
+# Number of supporting_documents rows written per executemany/commit
+BATCH_SIZE = 50
+
+INSERT_SQL = '''
+    INSERT INTO supporting_documents
+    (id, dataset_id, title, document_type, filename, file_path, file_size,
+     file_type, checksum, checksum_algo, extracted_from_zip, is_processed,
+     downloaded_at, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Document types we're interested in (lowercase, without the dot)
+DOC_EXTS = frozenset({'pdf', 'doc', 'docx', 'txt', 'csv', 'xlsx', 'readme', 'md'})
+
+
+def member_extension(name):
+    """Return the lowercase extension of a ZIP member name ('' if none)."""
+    stem, dot, ext = name.rpartition('/')[2].rpartition('.')
+    return ext.lower() if dot and stem else ''
+
+
+# Output directories this process has already created
+_created_dirs = set()
+
+
+def process_zip(data_file_id, dataset_id, filename, file_path):
+    """
+    Extract up to 10 documents from one ZIP file.
+
+    Runs in a worker process, so it never touches SQLite and prints nothing;
+    the parent writes the rows and prints the log lines in order.
+
+    Returns:
+        Tuple of (insert rows for supporting_documents, log lines, error flag)
+    """
+    inserts = []
+    log = []
+
+    try:
+        with zipfile.ZipFile(file_path, 'r') as zf:
+            # Pick document members straight from the ZipInfo list
+            doc_infos = []
+            for zi in zf.infolist():
+                if zi.is_dir():
+                    continue
+                file_type = member_extension(zi.filename)
+                if file_type in DOC_EXTS:
+                    doc_infos.append((zi, file_type))
+
+            log.append(f'  Found {len(doc_infos)} document(s) in ZIP')
+
+            dataset_dir = Path('supporting_docs') / dataset_id[:8]
+            doc_infos = doc_infos[:10]  # Extract up to 10 docs per ZIP
+            doc_ids = gen_ids(len(doc_infos))
+
+            for doc_id, (zi, file_type) in zip(doc_ids, doc_infos):
+                doc_file = zi.filename
+                try:
+                    # Skip oversized members before touching any data
+                    if zi.file_size > MAX_DOC_SIZE:
+                        log.append(f'    ✗ Skipping {doc_file}: larger than {MAX_DOC_SIZE // (1024 * 1024)} MB')
+                        continue
+
+                    # Generate unique filename
+                    doc_filename = Path(doc_file).name
+
+                    # Save to supporting_docs directory
+                    if dataset_dir not in _created_dirs:
+                        dataset_dir.mkdir(parents=True, exist_ok=True)
+                        _created_dirs.add(dataset_dir)
+                    output_path = dataset_dir / doc_filename
+
+                    # Stream the member to disk, hashing as we copy
+                    digest = new_checksum()
+                    with zf.open(zi) as src, open(output_path, 'wb') as dst:
+                        while True:
+                            buf = src.read(CHUNK_SIZE)
+                            if not buf:
+                                break
+                            digest.update(buf)
+                            dst.write(buf)
+                    checksum = digest.hexdigest()
+                    file_size = zi.file_size
+
+                    # Row for the supporting_documents table
+                    now = datetime.utcnow()
+                    inserts.append((
+                        doc_id,
+                        dataset_id,
+                        doc_filename,  # title
+                        file_type,  # document_type
+                        doc_filename,
+                        str(output_path),
+                        file_size,
+                        file_type,
+                        checksum,
+                        CHECKSUM_ALGO,
+                        data_file_id,  # extracted_from_zip
+                        0,  # is_processed
+                        now,  # downloaded_at
+                        now  # created_at
+                    ))
+
+                    log.append(f'    ✓ {doc_filename} ({file_size/1024:.1f} KB, {file_type})')
+
+                except Exception as e:
+                    log.append(f'    ✗ Error extracting {doc_file}: {e}')
+                    continue
+
+    except zipfile.BadZipFile:
+        log.append(f'  ✗ Bad ZIP file')
+        return inserts, log, True
+    except Exception as e:
+        log.append(f'  ✗ Error: {e}')
+        return inserts, log, True
+
+    return inserts, log, False
+
+
 def extract_supporting_documents():
     """Extract supporting documents from ZIP files."""
 
     conn = sqlite3.connect('datasets.db')
+    conn.execute('PRAGMA journal_mode=WAL')
     cursor = conn.cursor()
+    ensure_checksum_algo_column(cursor, 'supporting_documents')
 
     # Get all downloaded ZIP files
     cursor.execute('''
@@ -36,84 +171,34 @@ def extract_supporting_documents():
         'errors': 0
     }
 
-    # Document types we're interested in
-    doc_extensions = {'.pdf', '.doc', '.docx', '.txt', '.csv', '.xlsx', '.readme', '.md'}
-
-    for data_file_id, dataset_id, filename, file_path in zip_files:
-        stats['zips_processed'] += 1
-        print(f'\n[{stats["zips_processed"]}/{len(zip_files)}] Extracting: {filename}')
-
-        try:
-            with zipfile.ZipFile(file_path, 'r') as zf:
-                # List all files in ZIP
-                file_list = zf.namelist()
-                doc_files = [f for f in file_list if Path(f).suffix.lower() in doc_extensions]
-
-                print(f'  Found {len(doc_files)} document(s) in ZIP')
-
-                for doc_file in doc_files[:10]:  # Extract up to 10 docs per ZIP
-                    try:
-                        # Read document content
-                        content = zf.read(doc_file)
-                        file_size = len(content)
-
-                        # Calculate checksum
-                        checksum = hashlib.sha256(content).hexdigest()
-
-                        # Determine file type
-                        file_ext = Path(doc_file).suffix.lower()
-                        file_type = file_ext[1:] if file_ext else 'unknown'
-
-                        # Generate unique filename
-                        doc_filename = Path(doc_file).name
-
-                        # Save to supporting_docs directory
-                        output_path = Path('supporting_docs') / dataset_id[:8] / doc_filename
-                        output_path.parent.mkdir(parents=True, exist_ok=True)
-
-                        with open(output_path, 'wb') as f:
-                            f.write(content)
-
-                        # Insert into supporting_documents table
-                        doc_id = str(uuid.uuid4())
-                        cursor.execute('''
-                            INSERT INTO supporting_documents
-                            (id, dataset_id, title, document_type, filename, file_path, file_size,
-                             file_type, checksum, extracted_from_zip, is_processed, downloaded_at, created_at)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (
-                            doc_id,
-                            dataset_id,
-                            doc_filename,  # title
-                            file_type,  # document_type
-                            doc_filename,
-                            str(output_path),
-                            file_size,
-                            file_type,
-                            checksum,
-                            data_file_id,  # extracted_from_zip
-                            0,  # is_processed
-                            datetime.utcnow(),  # downloaded_at
-                            datetime.utcnow()  # created_at
-                        ))
-
-                        stats['docs_extracted'] += 1
-                        stats['total_bytes'] += file_size
-
-                        print(f'    ✓ {doc_filename} ({file_size/1024:.1f} KB, {file_type})')
-
-                    except Exception as e:
-                        print(f'    ✗ Error extracting {doc_file}: {e}')
-                        continue
+    pending_inserts = []
+
+    # Decompression and hashing are CPU-bound, so spread ZIPs across processes;
+    # map() yields results in input order, keeping the log readable
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        results = pool.map(process_zip, *zip(*zip_files)) if zip_files else []
+
+        for (_, _, filename, _), (inserts, log, failed) in zip(zip_files, results):
+            stats['zips_processed'] += 1
+            print(f'\n[{stats["zips_processed"]}/{len(zip_files)}] Extracting: {filename}')
+            for line in log:
+                print(line)
+
+            if failed:
+                stats['errors'] += 1
+
+            stats['docs_extracted'] += len(inserts)
+            stats['total_bytes'] += sum(row[6] for row in inserts)  # file_size
+            pending_inserts.extend(inserts)
 
+            if len(pending_inserts) >= BATCH_SIZE:
+                cursor.executemany(INSERT_SQL, pending_inserts)
                 conn.commit()
+                pending_inserts.clear()
 
-        except zipfile.BadZipFile:
-            print(f'  ✗ Bad ZIP file')
-            stats['errors'] += 1
-        except Exception as e:
-            print(f'  ✗ Error: {e}')
-            stats['errors'] += 1
+    if pending_inserts:
+        cursor.executemany(INSERT_SQL, pending_inserts)
+        conn.commit()
 
     conn.close()
 
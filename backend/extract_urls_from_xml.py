@@ -5,74 +5,119 @@ and update the database.
 """
 
 import sqlite3
+from io import BytesIO
 from lxml import etree
 import sys
 
+NS = {
+    'gmd': 'http://www.isotc211.org/2005/gmd',
+    'gco': 'http://www.isotc211.org/2005/gco'
+}
+
+# Commit URL updates in batches so a crash keeps earlier progress
+COMMIT_EVERY = 500
+
+ONLINE_RESOURCE_TAG = '{%s}CI_OnlineResource' % NS['gmd']
+
+# Compiled once and reused for every resource. Both return plain strings so
+# the distribution check, attribute lookup and lower-casing run in libxml2.
+_URL_XP = etree.XPath(
+    'string((self::*[ancestor::gmd:onLine/ancestor::gmd:distributionInfo]'
+    '//gmd:linkage//gmd:URL)[1])',
+    namespaces=NS
+)
+_FUNC_XP = etree.XPath(
+    'translate(string((.//gmd:function//gmd:CI_OnLineFunctionCode/@codeListValue)[1]),'
+    ' "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")',
+    namespaces=NS
+)
+
 def extract_urls():
     """Extract URLs from all metadata XML documents."""
     conn = sqlite3.connect('datasets.db')
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
     cursor = conn.cursor()
 
-    # Get all datasets with XML
-    cursor.execute('SELECT id, dataset_id, raw_document_xml FROM metadata WHERE raw_document_xml IS NOT NULL')
-    rows = cursor.fetchall()
+    # idx_metadata_has_xml (declared on MetadataModel) lets the scan skip
+    # metadata rows that have no XML
+    total = cursor.execute(
+        'SELECT COUNT(*) FROM metadata WHERE raw_document_xml IS NOT NULL'
+    ).fetchone()[0]
 
-    print(f'Processing {len(rows)} datasets to extract URLs...')
+    print(f'Processing {total} datasets to extract URLs...')
     print('=' * 60)
 
     stats = {
-        'total': len(rows),
+        'total': total,
         'with_download': 0,
         'with_landing': 0,
         'with_both': 0,
         'errors': 0
     }
 
-    ns = {
-        'gmd': 'http://www.isotc211.org/2005/gmd',
-        'gco': 'http://www.isotc211.org/2005/gco'
-    }
-
-    for idx, row in enumerate(rows, 1):
+    # Pending (download_url, landing_url, id) tuples, written every COMMIT_EVERY rows
+    updates = []
+    update_cursor = conn.cursor()
+
+    def flush_updates():
+        update_cursor.executemany(
+            'UPDATE metadata SET download_url = ?, landing_page_url = ? WHERE id = ?',
+            updates
+        )
+        conn.commit()
+        updates.clear()
+
+    # Stream rows so only one XML document is held in memory at a time;
+    # CAST to BLOB hands lxml the stored UTF-8 bytes without a str round trip
+    cursor.execute(
+        'SELECT id, dataset_id, CAST(raw_document_xml AS BLOB) '
+        'FROM metadata WHERE raw_document_xml IS NOT NULL'
+    )
+
+    for idx, row in enumerate(cursor, 1):
         metadata_id, dataset_id, raw_xml = row
 
         if not raw_xml:
             continue
 
         try:
-            root = etree.fromstring(raw_xml.encode('utf-8'))
-
-            # Extract online resources
-            xpath = './/gmd:distributionInfo//gmd:onLine//gmd:CI_OnlineResource'
-            resources = root.xpath(xpath, namespaces=ns)
-
             download_url = ''
             landing_url = ''
 
+            # Stream online resources instead of building the full DOM
+            context = etree.iterparse(
+                BytesIO(raw_xml),
+                events=('end',),
+                tag=ONLINE_RESOURCE_TAG
+            )
+
             # Categorize URLs by function code
-            for resource in resources:
-                url_elem = resource.xpath('.//gmd:linkage//gmd:URL', namespaces=ns)
-                function_elem = resource.xpath('.//gmd:function//gmd:CI_OnLineFunctionCode', namespaces=ns)
-
-                if url_elem and len(url_elem) > 0:
-                    url = url_elem[0].text
-                    if not url:
-                        continue
-
-                    function_code = ''
-                    if function_elem and len(function_elem) > 0:
-                        function_code = function_elem[0].get('codeListValue', '').lower()
-
-                    # Prioritize download URLs
-                    if 'download' in function_code or url.endswith('.zip'):
-                        if not download_url:  # Use first download URL found
-                            download_url = url
-                    elif 'information' in function_code:
-                        if not landing_url:
-                            landing_url = url
-                    elif not landing_url and url.startswith('http'):
-                        # Fallback: any HTTP URL can be landing page
+            for _, resource in context:
+                # Empty unless the resource sits under distributionInfo/onLine
+                url = str(_URL_XP(resource))
+                function_code = str(_FUNC_XP(resource)) if url else ''
+
+                # Free the processed subtree so memory stays flat
+                resource.clear()
+                while resource.getprevious() is not None:
+                    del resource.getparent()[0]
+
+                if not url:
+                    continue
+
+                # Prioritize download URLs
+                if 'download' in function_code or url.endswith('.zip'):
+                    if not download_url:  # Use first download URL found
+                        download_url = url
+                elif 'information' in function_code:
+                    if not landing_url:
                         landing_url = url
+                elif not landing_url and url.startswith('http'):
+                    # Fallback: any HTTP URL can be landing page
+                    landing_url = url
+            del context
 
             # Update statistics
             if download_url:
@@ -82,11 +127,10 @@ def extract_urls():
             if download_url and landing_url:
                 stats['with_both'] += 1
 
-            # Update database
-            cursor.execute(
-                'UPDATE metadata SET download_url = ?, landing_page_url = ? WHERE id = ?',
-                (download_url or None, landing_url or None, metadata_id)
-            )
+            updates.append((download_url or None, landing_url or None, metadata_id))
+
+            if len(updates) >= COMMIT_EVERY:
+                flush_updates()
 
             if idx % 50 == 0:
                 print(f'Processed {idx}/{stats["total"]} datasets...')
@@ -96,7 +140,8 @@ def extract_urls():
             stats['errors'] += 1
             continue
 
-    conn.commit()
+    # Write whatever is left from the last partial batch
+    flush_updates()
     conn.close()
 
     print('=' * 60)
@@ -0,0 +1,54 @@
+"""
+Gunicorn configuration for the Dataset Search API.
+
+Runs uvicorn workers under gunicorn's pre-fork model. The app is imported
+and the embedding model loaded in the master process, then workers are
+forked, so they share the model weights copy-on-write instead of each
+loading a copy.
+
+CUDA cannot be re-initialized in a forked process, so with
+EMBEDDING_DEVICE=cuda the master must not touch the model: the warm-up is
+skipped and each worker loads the model on its first request, after the
+fork. The model is always loaded lazily, so importing the app (preload)
+never initializes CUDA by itself.
+
+Usage:
+    gunicorn -c gunicorn.conf.py src.api.main:app
+
+Author: University of Manchester RSE Team
+"""
+
+import importlib
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+
+# Chat history and caches are per process; more than one worker needs
+# sticky routing for multi-turn chat
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app (and load the model) once, before forking
+preload_app = True
+
+# First requests may still open the vector store
+timeout = 120
+
+
+def _app_module(server):
+    """Return the already-imported module that defines the app."""
+    return importlib.import_module(server.app.app_uri.split(":")[0])
+
+
+def when_ready(server):
+    """Warm the embedding model in the master so workers inherit it (CPU only)."""
+    if os.environ.get("EMBEDDING_DEVICE", "cpu").lower().startswith("cuda"):
+        server.log.info("EMBEDDING_DEVICE is CUDA; workers load the model after fork")
+        return
+    _app_module(server).warm_up_embedding_model()
+
+
+def post_fork(server, worker):
+    """Threads do not survive fork; restart the log writer in each worker."""
+    module = _app_module(server)
+    module.log_listener = module.start_log_listener()
@@ -4,6 +4,13 @@ import json
 import random
 import sys
 
+# Optional HTTP cache: revalidates with ETag/Last-Modified so reruns mostly get 304s
+try:
+    import requests_cache
+    HAS_REQUESTS_CACHE = True
+except ImportError:
+    HAS_REQUESTS_CACHE = False
+
 # Sample IDs from the file
 SAMPLE_IDS = [
     "be0bdc0e-bc2e-4f1d-b524-2c02798dd893",
@@ -11,6 +18,17 @@ SAMPLE_IDS = [
     "1c4f835c-d243-4593-a9b4-71410b9b4bf0"
 ]
 
+if HAS_REQUESTS_CACHE:
+    # Key on Accept too, so the JSON and XML negotiations are cached separately
+    SESSION = requests_cache.CachedSession(
+        'ceh_cache',
+        expire_after=3600,
+        cache_control=True,
+        match_headers=['Accept']
+    )
+else:
+    SESSION = requests.Session()
+
 def fetch_and_analyze(uuid):
     # Strategy 1: Try base URL (Content Negotiation)
     base_url = f"https://catalogue.ceh.ac.uk/id/{uuid}"
@@ -19,7 +37,7 @@ def fetch_and_analyze(uuid):
     try:
         # Try asking for JSON
         headers = {'Accept': 'application/json'}
-        response = requests.get(base_url, headers=headers, timeout=10, allow_redirects=True)
+        response = SESSION.get(base_url, headers=headers, timeout=10, allow_redirects=True)
         print(f"Status: {response.status_code}")
         print(f"Final URL: {response.url}")
         
@@ -43,7 +61,7 @@ def fetch_and_analyze(uuid):
     waf_url = f"https://catalogue.ceh.ac.uk/documents/gemini/waf/{uuid}.xml"
     print(f"Strategy 2: Requesting WAF URL {waf_url}")
     try:
-        response = requests.get(waf_url, timeout=10)
+        response = SESSION.get(waf_url, timeout=10)
         print(f"Status: {response.status_code}")
         if response.status_code == 200:
             print("SUCCESS: XML found in WAF")
@@ -52,16 +70,21 @@ def fetch_and_analyze(uuid):
         print(f"Strategy 2 Failed: {e}")
 
 def scan_keys(obj, path=""):
-    if isinstance(obj, dict):
-        for k, v in obj.items():
-            new_path = f"{path}.{k}" if path else k
-            if 'url' in k.lower() or 'download' in k.lower() or 'file' in k.lower():
-                if isinstance(v, str) and v.startswith('http'):
-                    print(f"  Found potential resource at {new_path}: {v}")
-            scan_keys(v, new_path)
-    elif isinstance(obj, list):
-        for i, item in enumerate(obj):
-            scan_keys(item, f"{path}[{i}]")
+    # Explicit stack instead of recursion; entries are (value, path, key_lower).
+    # Children are pushed in reverse so output keeps the document order.
+    stack = [(obj, path, '')]
+    while stack:
+        cur, cur_path, k_lower = stack.pop()
+        if 'url' in k_lower or 'download' in k_lower or 'file' in k_lower:
+            if isinstance(cur, str) and cur.startswith('http'):
+                print(f"  Found potential resource at {cur_path}: {cur}")
+        if isinstance(cur, dict):
+            for k, v in reversed(cur.items()):
+                new_path = f"{cur_path}.{k}" if cur_path else k
+                stack.append((v, new_path, k.lower()))
+        elif isinstance(cur, list):
+            for i in range(len(cur) - 1, -1, -1):
+                stack.append((cur[i], f"{cur_path}[{i}]", ''))
 
 if __name__ == "__main__":
     print("Starting Resource Type Survey...")
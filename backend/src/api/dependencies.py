@@ -0,0 +1,147 @@
+"""
+API Dependencies
+
+Process-wide services shared by the API and its routers. Each is built on
+first use and then reused, so the embedding model is loaded and each vector
+collection opened once per process rather than once per request.
+
+Author: University of Manchester RSE Team
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, wraps
+from pathlib import Path
+
+from application.interfaces.embedding_service import IEmbeddingService
+from domain.repositories.vector_repository import IVectorRepository
+
+logger = logging.getLogger(__name__)
+
+
+# Database and ChromaDB live in the backend directory
+BACKEND_DIR = Path(__file__).parent.parent.parent
+CHROMA_PATH = str(BACKEND_DIR / "chroma_db")
+DB_PATH = str(BACKEND_DIR / "datasets.db")
+SUPPORTING_DOCS_COLLECTION = "supporting_docs"
+
+# Serializes first builds: sync dependencies run on threadpool workers, and
+# concurrent first requests must not each load the model or open Chroma.
+# Re-entrant because getters call each other while building.
+_build_lock = threading.RLock()
+
+
+def _shared(build):
+    """
+    Cache build's result for the process, building it at most once.
+
+    Like lru_cache(maxsize=1), whose cache_info()/cache_clear() it keeps,
+    but a miss is resolved under _build_lock so racing callers wait for the
+    first build instead of running their own.
+    """
+    cached = lru_cache(maxsize=1)(build)
+
+    @wraps(build)
+    def getter():
+        if cached.cache_info().currsize:
+            return cached()
+        with _build_lock:
+            return cached()
+
+    getter.cache_info = cached.cache_info
+    getter.cache_clear = cached.cache_clear
+    return getter
+
+
+@_shared
+def get_model_embedding_service() -> IEmbeddingService:
+    """
+    Load the embedding model on first use.
+
+    sentence-transformers (and torch) are imported here rather than at module
+    level, so processes that never embed anything skip the model load.
+    Used directly for bulk document embedding, which should not churn the
+    query cache.
+    """
+    from infrastructure.services.embedding_service import HuggingFaceEmbeddingService
+
+    embedding_service = HuggingFaceEmbeddingService()
+    logger.info(f"✓ Embedding model loaded: {embedding_service.get_model_name()}")
+    return embedding_service
+
+
+@_shared
+def get_embedding_service() -> IEmbeddingService:
+    """Query embedding service: the shared model behind an LRU cache (search and chat)."""
+    from infrastructure.services.cached_embedding_service import CachedEmbeddingService
+
+    return CachedEmbeddingService(get_model_embedding_service())
+
+
+@_shared
+def get_vector_repository() -> IVectorRepository:
+    """Open the dataset vector collection on first use (search backend per ANN_PROFILE)."""
+    from infrastructure.persistence.vector.brute_force_repository import create_vector_repository
+
+    vector_repository = create_vector_repository(CHROMA_PATH)
+    logger.info(f"✓ Vector repository initialized: {CHROMA_PATH}, {vector_repository.count()} vectors")
+    return vector_repository
+
+
+@_shared
+def get_supporting_docs_repository() -> IVectorRepository:
+    """Open the supporting documents vector collection on first use (same ANN_PROFILE)."""
+    from infrastructure.persistence.vector.brute_force_repository import create_vector_repository
+
+    supporting_docs_repository = create_vector_repository(
+        CHROMA_PATH, collection_name=SUPPORTING_DOCS_COLLECTION
+    )
+    logger.info(
+        f"✓ Supporting docs repository initialized: {CHROMA_PATH}, "
+        f"{supporting_docs_repository.count()} vectors"
+    )
+    return supporting_docs_repository
+
+
+@_shared
+def get_doc_embedding_service():
+    """Document chunking and embedding service writing to the supporting docs collection."""
+    from application.services.document_embedding_service import DocumentEmbeddingService
+
+    return DocumentEmbeddingService(
+        embedding_service=get_model_embedding_service(),
+        vector_repository=get_supporting_docs_repository()
+    )
+
+
+@_shared
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for CPU-bound document text extraction (PDF parsing).
+
+    Workers are spawned rather than forked, so they never inherit the
+    model, thread pools or locks of the API process.
+    """
+    return ProcessPoolExecutor(
+        max_workers=min(4, os.cpu_count() or 1),
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+@_shared
+def get_database_connection():
+    """The application database (datasets.db in the backend directory)."""
+    from infrastructure.persistence.sqlite.connection import get_database
+
+    return get_database(DB_PATH)
+
+
+@_shared
+def get_processing_cache():
+    """Persistent /process result cache in the application database."""
+    from infrastructure.persistence.sqlite.processing_cache import ProcessingResultCache
+
+    return ProcessingResultCache(get_database_connection().session_scope)
@@ -7,16 +7,34 @@ the ETL, persistence, and semantic search capabilities.
 Author: University of Manchester RSE Team
 """
 
+import ast
+import asyncio
+import atexit
+import json
+import queue
 import sys
 import os
 import logging
+import logging.handlers
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# orjson decodes stored keyword lists and encodes responses faster than
+# the stdlib (optional)
+try:
+    import orjson
+    json_loads = orjson.loads
+    HAS_ORJSON = True
+except ImportError:
+    json_loads = json.loads
+    HAS_ORJSON = False
+
 # Load environment variables from repo root .env (local runs).
 try:
     from dotenv import load_dotenv
@@ -25,8 +43,10 @@ try:
 except Exception:
     pass
 
-from fastapi import FastAPI, HTTPException, Query
+import numpy as np
+from fastapi import FastAPI, HTTPException, Query, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from contextlib import asynccontextmanager
 
 from api.models import (
@@ -39,33 +59,147 @@ from api.models import (
     BoundingBoxSchema
 )
 
-from infrastructure.persistence.sqlite.connection import get_database
 from infrastructure.persistence.sqlite.dataset_repository_impl import SQLiteDatasetRepository
-from infrastructure.persistence.vector.chroma_repository import ChromaVectorRepository
-from infrastructure.services.embedding_service import HuggingFaceEmbeddingService
 from infrastructure.services.gemini_service import GeminiService, GeminiError
+from infrastructure.services.semantic_cache import SemanticCache
+from infrastructure.services.batching_searcher import BatchingSearcher
 from application.services.rag_service import RAGService
 from domain.repositories.dataset_repository import DatasetNotFoundError
 from domain.repositories.vector_repository import VectorRepositoryError
+from application.interfaces.embedding_service import IEmbeddingService
+
+from api.dependencies import (
+    DB_PATH,
+    get_database_connection,
+    get_embedding_service,
+    get_model_embedding_service,
+    get_vector_repository,
+    get_supporting_docs_repository,
+    get_extraction_pool
+)
 
 # Import routers
 from api.routers import chat as chat_router
 from api.routers import documents as documents_router
 
-# Configure logging
+# Configure logging. Records go through a queue and are written by a
+# background listener thread, so request handlers never block on log I/O.
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
+
+
+def start_log_listener() -> logging.handlers.QueueListener:
+    """Start the thread that writes queued log records (again in forked workers)."""
+    listener = logging.handlers.QueueListener(_log_queue, _log_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+log_listener = start_log_listener()
 logger = logging.getLogger(__name__)
 
 
-# Global services (initialized at startup)
+# Global database and dataset repository (initialized at startup); the
+# repository opens one session per call, so a single instance is shared
 db = None
-embedding_service = None
-vector_repository = None
-supporting_docs_repository = None
-rag_service = None
+dataset_repository: Optional[SQLiteDatasetRepository] = None
+
+# Responses for paraphrased queries are served from here (per process)
+search_cache = SemanticCache()
+
+# Health probes poll every few seconds; reuse counts for this long
+HEALTH_COUNTS_TTL = 10.0
+_health_counts = None
+_health_counts_at = 0.0
+_health_counts_lock = asyncio.Lock()
+
+
+def warm_up_embedding_model() -> None:
+    """
+    Load the embedding model and run one inference.
+
+    Called by the gunicorn master (gunicorn.conf.py) before it forks
+    workers, so every worker shares the model's pages copy-on-write instead
+    of loading its own copy, and the first search skips the cold start.
+    """
+    get_embedding_service().generate_embedding("warmup")
+    logger.info("✓ Embedding model warmed up")
+
+
+@lru_cache(maxsize=1)
+def get_batching_searcher() -> BatchingSearcher:
+    """Coalesce concurrent /api/search queries into batched vector calls."""
+    return BatchingSearcher(get_vector_repository(), fields=SEARCH_FIELDS)
+
+
+def parse_keywords(raw) -> list:
+    """
+    Decode the keywords stored in vector metadata.
+
+    New vectors hold a JSON list; vectors indexed before that hold the
+    Python repr of a list, which is parsed with ast.literal_eval (never eval).
+    """
+    if not raw:
+        return []
+    try:
+        keywords = json_loads(raw)
+    except ValueError:
+        try:
+            keywords = ast.literal_eval(raw) if raw.startswith('[') else [raw]
+        except (ValueError, SyntaxError):
+            return []
+    return keywords if isinstance(keywords, list) else [str(keywords)]
+
+
+def dataset_schema_from_row(row: dict) -> DatasetSchema:
+    """
+    Build a DatasetSchema from a get_all_rows() dict without validation.
+
+    The row's values are already typed by SQLAlchemy and the repository,
+    so model_construct() is safe and skips a full validation pass.
+    """
+    metadata = row.get('metadata')
+    if metadata is not None:
+        bounding_box = metadata.get('bounding_box')
+        metadata = MetadataSchema.model_construct(**{
+            **metadata,
+            'bounding_box': BoundingBoxSchema.model_construct(**bounding_box) if bounding_box else None
+        })
+    return DatasetSchema.model_construct(**{**row, 'metadata': metadata})
+
+# Vector metadata fields read by /api/search
+SEARCH_FIELDS = (
+    'title', 'abstract_preview', 'abstract', 'keywords', 'has_geo_extent',
+    'has_temporal_extent', 'center_lat', 'center_lon'
+)
+
+
+def float_column(values: list, mask: list) -> list:
+    """
+    Convert a metadata column to floats in one pass.
+
+    Entries where mask is False become None; missing values count as 0 as
+    before. Only falls back to per-value parsing if the column has junk.
+    """
+    raw = [(0 if value is None else value) for value in values]
+    try:
+        floats = np.asarray(raw, dtype=np.float64).tolist()
+    except (TypeError, ValueError):
+        floats = []
+        for value in raw:
+            try:
+                floats.append(float(value))
+            except (TypeError, ValueError):
+                floats.append(None)
+    return [f if keep else None for f, keep in zip(floats, mask)]
 
 
 @asynccontextmanager
@@ -73,57 +207,55 @@ async def lifespan(app: FastAPI):
     """
     Lifespan context manager for FastAPI.
     
-    Initializes services on startup and cleans up on shutdown.
+    Initializes the database on startup and cleans up on shutdown. The
+    embedding model and vector collections are loaded on first use.
     """
-    global db, embedding_service, vector_repository, supporting_docs_repository, rag_service
+    global db, dataset_repository
     
     logger.info("Initializing API services...")
     
+    # Bounded pool for blocking DB, embedding and vector calls. Installed as
+    # the loop's default executor, so asyncio.to_thread() runs on it too.
+    app.state.executor = ThreadPoolExecutor(
+        max_workers=min(32, (os.cpu_count() or 1) * 2),
+        thread_name_prefix="api-worker"
+    )
+    asyncio.get_running_loop().set_default_executor(app.state.executor)
+    
     try:
         # Initialize database (use parent directory)
-        backend_dir = Path(__file__).parent.parent.parent
-        db_path = str(backend_dir / "datasets.db")
-        db = get_database(db_path)
-        logger.info(f"✓ Database initialized: {db_path}")
-
-        # Initialize embedding service
-        embedding_service = HuggingFaceEmbeddingService()
-        logger.info(f"✓ Embedding service initialized: {embedding_service.get_model_name()}")
-
-        # Initialize vector repository (use parent directory)
-        chroma_path = str(backend_dir / "chroma_db")
-        vector_repository = ChromaVectorRepository(chroma_path)
-        logger.info(f"✓ Vector repository initialized: {chroma_path}, {vector_repository.count()} vectors")
-
-        # Initialize supporting docs repository
-        supporting_docs_repository = ChromaVectorRepository(
-            persist_directory=chroma_path,
-            collection_name="supporting_docs"
-        )
-        logger.info(
-            f"✓ Supporting docs repository initialized: {chroma_path}, "
-            f"{supporting_docs_repository.count()} vectors"
-        )
-        
-        # Initialize Gemini and RAG service
+        db = get_database_connection()
+        dataset_repository = SQLiteDatasetRepository(session_factory=db.session_scope)
+        logger.info(f"✓ Database initialized: {DB_PATH}")
+
+        # Initialize Gemini; the RAG service is built on the first chat request
         try:
             gemini_api_key = os.environ.get("GEMINI_API_KEY")
             gemini_model = os.environ.get("GEMINI_MODEL", "gemini-flash-latest")
+            # A wrong reused answer costs more than a wrong reused search,
+            # so answers need a closer paraphrase than search_cache does
+            answer_cache_threshold = float(
+                os.environ.get("RAG_SEMANTIC_CACHE_THRESHOLD", "0.95")
+            )
             
             if gemini_api_key:
                 gemini_service = GeminiService(
                     api_key=gemini_api_key,
                     model=gemini_model
                 )
-                rag_service = RAGService(
-                    embedding_service=embedding_service,
-                    vector_repository=vector_repository,
-                    supporting_docs_repository=supporting_docs_repository,
-                    gemini_service=gemini_service
-                )
-                # Set RAG service in chat router
-                chat_router.rag_service = rag_service
-                logger.info(f"✓ RAG service initialized with Gemini model: {gemini_model}")
+
+                def build_rag_service() -> RAGService:
+                    return RAGService(
+                        embedding_service=get_embedding_service(),
+                        vector_repository=get_vector_repository(),
+                        supporting_docs_repository=get_supporting_docs_repository(),
+                        gemini_service=gemini_service,
+                        semantic_cache_threshold=answer_cache_threshold
+                    )
+
+                # Chat router builds the RAG service lazily through this factory
+                chat_router.rag_service_factory = build_rag_service
+                logger.info(f"✓ Gemini configured for RAG service: {gemini_model}")
             else:
                 logger.warning("⚠ GEMINI_API_KEY not set - Chat/RAG features disabled")
                 
@@ -140,6 +272,13 @@ async def lifespan(app: FastAPI):
     
     # Cleanup on shutdown
     logger.info("Shutting down API services...")
+    if get_batching_searcher.cache_info().currsize:
+        await get_batching_searcher().close()
+    if get_extraction_pool.cache_info().currsize:
+        get_extraction_pool().shutdown(wait=True)
+    if chat_router.rag_service is not None:
+        chat_router.rag_service.close()
+    app.state.executor.shutdown(wait=True)
 
 
 # Create FastAPI application
@@ -147,7 +286,9 @@ app = FastAPI(
     title="Dataset Search and Discovery API",
     description="REST API for searching and discovering environmental datasets",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson serializes large, datetime-heavy dataset lists much faster
+    default_response_class=ORJSONResponse if HAS_ORJSON else JSONResponse
 )
 
 # Add CORS middleware
@@ -191,16 +332,31 @@ async def health_check():
     """
     Health check endpoint.
     
-    Returns the status of all services and database connections.
+    Returns the status of all services and database connections. Probes
+    never load the embedding model: its name and dimension are reported
+    only once something else has loaded it. Counts are cached for
+    HEALTH_COUNTS_TTL seconds; a failed count is not cached, so an outage
+    still surfaces on the next probe.
     """
+    global _health_counts, _health_counts_at
+    
     try:
-        # Check database connection
-        with db.session_scope() as session:
-            repository = SQLiteDatasetRepository(session)
-            dataset_count = repository.count()
+        def _count():
+            # Check database and vector database connections
+            return dataset_repository.count(), get_vector_repository().count()
         
-        # Check vector database connection
-        vector_count = vector_repository.count()
+        # One caller refreshes an expired entry; concurrent probes wait for it
+        async with _health_counts_lock:
+            if _health_counts is None or time.monotonic() - _health_counts_at > HEALTH_COUNTS_TTL:
+                _health_counts = await asyncio.to_thread(_count)
+                _health_counts_at = time.monotonic()
+            dataset_count, vector_count = _health_counts
+        
+        embedding_model = embedding_dimension = None
+        if get_model_embedding_service.cache_info().currsize:
+            model_service = get_model_embedding_service()
+            embedding_model = model_service.get_model_name()
+            embedding_dimension = model_service.get_dimension()
         
         return HealthCheckSchema(
             status="healthy",
@@ -208,8 +364,8 @@ async def health_check():
             vector_db_connected=True,
             total_datasets=dataset_count,
             total_vectors=vector_count,
-            embedding_model=embedding_service.get_model_name(),
-            embedding_dimension=embedding_service.get_dimension()
+            embedding_model=embedding_model,
+            embedding_dimension=embedding_dimension
         )
         
     except Exception as e:
@@ -264,7 +420,9 @@ async def search_datasets(
         le=100,
         description="Maximum number of results to return",
         examples=[10]
-    )
+    ),
+    embedding_service: IEmbeddingService = Depends(get_embedding_service),
+    searcher: BatchingSearcher = Depends(get_batching_searcher)
 ):
     """
     Semantic search endpoint for finding relevant datasets.
@@ -284,7 +442,7 @@ async def search_datasets(
     Returns:
         SearchResponseSchema with ranked results and processing time
     """
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     
     try:
         logger.info(f"Search request: query='{q}', limit={limit}")
@@ -292,63 +450,65 @@ async def search_datasets(
             raise HTTPException(status_code=422, detail="Search query cannot be empty")
         
         # Generate query embedding
-        query_embedding = embedding_service.generate_embedding(q)
-        logger.debug(f"Generated {len(query_embedding)}-dimensional query embedding")
+        query_embedding = await asyncio.to_thread(embedding_service.generate_embedding, q)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Generated {len(query_embedding)}-dimensional query embedding")
+        
+        # Reuse results of an earlier, semantically equivalent query
+        cache_namespace = f"search:{limit}"
+        search_results = search_cache.get(query_embedding, namespace=cache_namespace)
+        if search_results is not None:
+            processing_time = (time.perf_counter_ns() - start_ns) / 1e6
+            return SearchResponseSchema.model_construct(
+                query=q,
+                total_results=len(search_results),
+                results=search_results,
+                processing_time_ms=round(processing_time, 2)
+            )
         
-        # Search vector database
-        vector_results = vector_repository.search(query_embedding, limit=limit)
-        logger.info(f"Found {len(vector_results)} results")
+        # Search vector database, one list per metadata field; concurrent
+        # requests share one batched query
+        columns = await searcher.search(query_embedding, limit=limit)
+        logger.info(f"Found {len(columns['ids'])} results")
         
-        # Convert to API schema
-        search_results = []
-        for result in vector_results:
-            metadata = result.metadata
-            
-            # Parse keywords (stored as string)
-            keywords = []
-            if 'keywords' in metadata:
-                try:
-                    keywords_str = metadata['keywords']
-                    # Handle string representation of list
-                    if keywords_str.startswith('[') and keywords_str.endswith(']'):
-                        keywords = eval(keywords_str)  # Safe here as we control the data
-                    else:
-                        keywords = [keywords_str]
-                except:
-                    keywords = []
-            
-            # Parse geo extent
-            has_geo_extent = metadata.get('has_geo_extent') == 'True'
-            center_lat = None
-            center_lon = None
-            if has_geo_extent:
-                try:
-                    center_lat = float(metadata.get('center_lat', 0))
-                    center_lon = float(metadata.get('center_lon', 0))
-                except:
-                    pass
-            
-            # Parse temporal extent
-            has_temporal_extent = metadata.get('has_temporal_extent') == 'True'
-            
-            search_results.append(
-                SearchResultSchema(
-                    id=result.id,
-                    title=metadata.get('title', 'Unknown'),
-                    abstract=metadata.get('abstract', '')[:500],  # Truncated
-                    score=result.score,
-                    keywords=keywords,
-                    has_geo_extent=has_geo_extent,
-                    has_temporal_extent=has_temporal_extent,
-                    center_lat=center_lat,
-                    center_lon=center_lon
-                )
+        # Convert whole columns first, then zip them into rows. Flags are
+        # stored as native bools; 'True' strings come from older indexes.
+        has_geo_extent = [value is True or value == 'True' for value in columns['has_geo_extent']]
+        has_temporal_extent = [value is True or value == 'True' for value in columns['has_temporal_extent']]
+        center_lat = float_column(columns['center_lat'], has_geo_extent)
+        center_lon = float_column(columns['center_lon'], has_geo_extent)
+        keywords = [parse_keywords(value) for value in columns['keywords']]
+        # Preview is truncated at ingest; older vectors only have the abstract
+        abstracts = [
+            preview if preview is not None else (abstract or '')[:500]
+            for preview, abstract in zip(columns['abstract_preview'], columns['abstract'])
+        ]
+        
+        # Values come from our own index, so skip Pydantic validation
+        search_results = [
+            SearchResultSchema.model_construct(
+                id=id,
+                title=title or 'Unknown',
+                abstract=abstract,
+                score=score,
+                keywords=kw,
+                has_geo_extent=geo,
+                has_temporal_extent=temporal,
+                center_lat=lat,
+                center_lon=lon
             )
+            for id, title, abstract, score, kw, geo, temporal, lat, lon in zip(
+                columns['ids'], columns['title'], abstracts,
+                columns['scores'], keywords, has_geo_extent,
+                has_temporal_extent, center_lat, center_lon
+            )
+        ]
+        search_cache.put(query_embedding, search_results, namespace=cache_namespace)
         
         # Calculate processing time
-        processing_time = (time.time() - start_time) * 1000  # Convert to ms
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e6  # Convert to ms
         
-        return SearchResponseSchema(
+        return SearchResponseSchema.model_construct(
             query=q,
             total_results=len(search_results),
             results=search_results,
@@ -381,29 +541,28 @@ async def get_dataset(dataset_id: str):
     try:
         logger.info(f"Get dataset request: id={dataset_id}")
         
-        # Query database
-        with db.session_scope() as session:
-            repository = SQLiteDatasetRepository(session)
-            result = repository.get_by_id(dataset_id)
+        # Query database off the event loop
+        result = await asyncio.to_thread(dataset_repository.get_by_id, dataset_id)
         
         if not result:
             raise HTTPException(status_code=404, detail=f"Dataset not found: {dataset_id}")
         
         dataset, metadata = result
         
-        # Convert to API schema
+        # Convert to API schema; entity fields are already typed, so skip
+        # Pydantic validation
         metadata_schema = None
         if metadata:
             bounding_box_schema = None
             if metadata.bounding_box:
-                bounding_box_schema = BoundingBoxSchema(
-                    west_longitude=metadata.bounding_box.west_longitude,
-                    east_longitude=metadata.bounding_box.east_longitude,
-                    south_latitude=metadata.bounding_box.south_latitude,
-                    north_latitude=metadata.bounding_box.north_latitude
+                bounding_box_schema = BoundingBoxSchema.model_construct(
+                    west_longitude=float(metadata.bounding_box.west_longitude),
+                    east_longitude=float(metadata.bounding_box.east_longitude),
+                    south_latitude=float(metadata.bounding_box.south_latitude),
+                    north_latitude=float(metadata.bounding_box.north_latitude)
                 )
             
-            metadata_schema = MetadataSchema(
+            metadata_schema = MetadataSchema.model_construct(
                 title=metadata.title,
                 abstract=metadata.abstract,
                 keywords=metadata.keywords,
@@ -417,7 +576,7 @@ async def get_dataset(dataset_id: str):
                 metadata_date=metadata.metadata_date
             )
         
-        return DatasetSchema(
+        return DatasetSchema.model_construct(
             id=str(dataset.id),
             title=dataset.title,
             abstract=dataset.abstract,
@@ -454,52 +613,13 @@ async def list_datasets(
     try:
         logger.info(f"List datasets request: limit={limit}, offset={offset}")
         
-        # Query database
-        with db.session_scope() as session:
-            repository = SQLiteDatasetRepository(session)
-            results = repository.get_all(limit=limit, offset=offset)
-        
-        # Convert to API schema
-        datasets = []
-        for dataset, metadata in results:
-            metadata_schema = None
-            if metadata:
-                bounding_box_schema = None
-                if metadata.bounding_box:
-                    bounding_box_schema = BoundingBoxSchema(
-                        west_longitude=metadata.bounding_box.west_longitude,
-                        east_longitude=metadata.bounding_box.east_longitude,
-                        south_latitude=metadata.bounding_box.south_latitude,
-                        north_latitude=metadata.bounding_box.north_latitude
-                    )
-                
-                metadata_schema = MetadataSchema(
-                    title=metadata.title,
-                    abstract=metadata.abstract,
-                    keywords=metadata.keywords,
-                    contact_organization=metadata.contact_organization,
-                    contact_email=metadata.contact_email,
-                    dataset_language=metadata.dataset_language,
-                    topic_category=metadata.topic_category,
-                    bounding_box=bounding_box_schema,
-                    temporal_extent_start=metadata.temporal_extent_start,
-                    temporal_extent_end=metadata.temporal_extent_end,
-                    metadata_date=metadata.metadata_date
-                )
-            
-            datasets.append(
-                DatasetSchema(
-                    id=str(dataset.id),
-                    title=dataset.title,
-                    abstract=dataset.abstract,
-                    metadata_url=dataset.metadata_url,
-                    created_at=dataset.created_at,
-                    last_updated=dataset.last_updated,
-                    metadata=metadata_schema
-                )
-            )
+        # Query database off the event loop
+        rows = await asyncio.to_thread(
+            dataset_repository.get_all_rows, limit=limit, offset=offset
+        )
         
-        return datasets
+        # Rows are typed by the repository, so construct without validation
+        return [dataset_schema_from_row(row) for row in rows]
         
     except Exception as e:
         logger.error(f"Error listing datasets: {str(e)}")
@@ -517,6 +637,12 @@ if __name__ == "__main__":
     # Usage: PORT=8001 python src/api/main.py (if port 8000 is occupied)
     port = int(os.environ.get("PORT", 8000))
     
+    # Auto-reload only in development (ENV=dev); it cannot run multiple
+    # workers. Chat conversations and caches live in process memory, so
+    # more than one worker (WEB_CONCURRENCY) needs sticky routing for chat.
+    dev = os.environ.get("ENV") == "dev"
+    workers = 1 if dev else int(os.environ.get("WEB_CONCURRENCY", 1))
+    
     print("=" * 80)
     print("Starting Dataset Search and Discovery API")
     print("=" * 80)
@@ -529,6 +655,11 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=port,
-        reload=True,
+        # uvloop and httptools ship with uvicorn[standard]; "auto" uses them
+        # where available (uvloop has no Windows build)
+        loop="auto",
+        http="auto",
+        workers=workers,
+        reload=dev,
         log_level="info"
     )
@@ -72,8 +72,8 @@ class HealthCheckSchema(BaseModel):
     vector_db_connected: bool
     total_datasets: int
     total_vectors: int
-    embedding_model: str
-    embedding_dimension: int
+    embedding_model: Optional[str] = None
+    embedding_dimension: Optional[int] = None
 
 
 class ErrorSchema(BaseModel):
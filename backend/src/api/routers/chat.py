@@ -7,8 +7,10 @@ and multi-turn conversation support.
 Author: University of Manchester RSE Team
 """
 
+import asyncio
 import logging
-from typing import Optional
+import threading
+from typing import Callable, Optional
 
 from fastapi import APIRouter, HTTPException, Depends
 
@@ -25,12 +27,20 @@ logger = logging.getLogger(__name__)
 # Create router
 router = APIRouter(prefix="/api/chat", tags=["Chat"])
 
-# Global RAG service (will be set by main.py)
+# Global RAG service, built on first use from the factory set by main.py
 rag_service: Optional[RAGService] = None
+rag_service_factory: Optional[Callable[[], RAGService]] = None
+_rag_service_lock = threading.Lock()
 
 
 def get_rag_service() -> RAGService:
     """Dependency to get RAG service."""
+    global rag_service
+    if rag_service is None and rag_service_factory is not None:
+        # Sync dependencies run on threadpool workers; build only once
+        with _rag_service_lock:
+            if rag_service is None:
+                rag_service = rag_service_factory()
     if rag_service is None:
         raise HTTPException(
             status_code=503, 
@@ -69,8 +79,10 @@ async def chat(
     try:
         logger.info(f"Chat request: message='{request.message[:50]}...'")
         
-        # Execute RAG query with conversation support
-        response = service.chat(
+        # Execute RAG query with conversation support (blocking LLM call,
+        # so run it on the API's worker pool)
+        response = await asyncio.to_thread(
+            service.chat,
             message=request.message,
             conversation_id=request.conversation_id,
             include_sources=request.include_sources
@@ -9,24 +9,84 @@ Endpoints for supporting document processing, including:
 Author: University of Manchester RSE Team
 """
 
+import asyncio
 import logging
-from pathlib import Path
+import threading
+import time
+from collections import OrderedDict
 from typing import List, Optional
 
 from fastapi import APIRouter, HTTPException, BackgroundTasks
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import BaseModel, ConfigDict
+
+# orjson encodes large file listings faster (optional)
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+from api.dependencies import (
+    get_database_connection,
+    get_doc_embedding_service,
+    get_extraction_pool,
+    get_processing_cache
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/documents", tags=["Documents"])
 
+# Response class for endpoints that return ready-built JSON content
+JSON_RESPONSE_CLASS = ORJSONResponse if HAS_ORJSON else JSONResponse
+
+
+# Serialized discovery responses per dataset; the landing page scrape is
+# slow and the document list rarely changes
+DISCOVER_CACHE_TTL = 3600.0
+DISCOVER_CACHE_SIZE = 256
+_discover_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_discover_cache_lock = threading.Lock()
+
+
+def get_fetcher(download_dir: str = "supporting_docs"):
+    """
+    Build a SupportingDocFetcher for one request.
+
+    Cheap: all fetchers share one pooled HTTP session, so connections to
+    the CEH hosts stay open between requests.
+    """
+    from infrastructure.etl.supporting_doc_fetcher import SupportingDocFetcher
+
+    return SupportingDocFetcher(download_dir=download_dir)
+
+
+def _lookup_download_url(dataset_id: str) -> Optional[str]:
+    """Read a dataset's download URL from the database (blocking)."""
+    try:
+        from infrastructure.persistence.sqlite.models import MetadataModel
+        
+        with get_database_connection().session_scope() as session:
+            download_url = session.query(MetadataModel.download_url).filter_by(
+                dataset_id=dataset_id
+            ).scalar()
+        if download_url:
+            logger.info(f"Using download_url from database: {download_url}")
+        return download_url
+    except Exception as e:
+        logger.warning(f"Failed to query database for download_url: {e}")
+        return None
+
 
 # ============================================================================
 # Request/Response Models
 # ============================================================================
 
 class SupportingDocumentResponse(BaseModel):
-    """Response model for a supporting document."""
+    """Response model for a supporting document (validated from SupportingDocumentInfo attributes)."""
+    model_config = ConfigDict(from_attributes=True)
+    
     id: str
     dataset_id: str
     title: str
@@ -90,33 +150,34 @@ async def discover_documents(dataset_id: str):
     This endpoint queries the CEH Catalogue landing page for a dataset
     and returns a list of available supporting documents.
     """
+    with _discover_cache_lock:
+        cached = _discover_cache.get(dataset_id)
+        if cached and time.monotonic() - cached[0] < DISCOVER_CACHE_TTL:
+            _discover_cache.move_to_end(dataset_id)
+            return Response(content=cached[1], media_type="application/json")
+    
     try:
-        from infrastructure.etl.supporting_doc_fetcher import SupportingDocFetcher
+        fetcher = get_fetcher()
+        
+        # Blocking HTTP scrape runs on the worker pool, not the event loop
+        docs = await asyncio.to_thread(fetcher.discover_documents, dataset_id)
+        
+        # One pydantic-core pass reads the fetcher's dataclasses by attribute
+        # and serializes to JSON; returning the bytes directly stops FastAPI
+        # validating and encoding the model a second time
+        content = DiscoverDocumentsResponse.model_validate({
+            "dataset_id": dataset_id,
+            "total_documents": len(docs),
+            "documents": docs
+        }).model_dump_json().encode()
+        
+        with _discover_cache_lock:
+            _discover_cache[dataset_id] = (time.monotonic(), content)
+            _discover_cache.move_to_end(dataset_id)
+            while len(_discover_cache) > DISCOVER_CACHE_SIZE:
+                _discover_cache.popitem(last=False)
+        return Response(content=content, media_type="application/json")
         
-        fetcher = SupportingDocFetcher()
-        try:
-            docs = fetcher.discover_documents(dataset_id)
-            
-            return DiscoverDocumentsResponse(
-                dataset_id=dataset_id,
-                total_documents=len(docs),
-                documents=[
-                    SupportingDocumentResponse(
-                        id=doc.id,
-                        dataset_id=doc.dataset_id,
-                        title=doc.title,
-                        document_type=doc.document_type,
-                        url=doc.url,
-                        filename=doc.filename,
-                        is_downloaded=doc.is_downloaded,
-                        file_size=doc.file_size
-                    )
-                    for doc in docs
-                ]
-            )
-        finally:
-            fetcher.close()
-            
     except Exception as e:
         logger.error(f"Document discovery failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -137,53 +198,61 @@ async def process_documents(request: ProcessDocumentsRequest, background_tasks:
     2. Downloads available PDFs and text files
     3. Extracts text content
     4. Creates vector embeddings for RAG search
+    
+    Results are cached per dataset against the ETag / Last-Modified of its
+    supporting documents; an unchanged dataset returns the previous result
+    with status "cached" instead of being downloaded and embedded again.
     """
     try:
-        from infrastructure.etl.supporting_doc_fetcher import SupportingDocFetcher
-        from infrastructure.persistence.vector.chroma_repository import ChromaVectorRepository
-        from infrastructure.services.embedding_service import HuggingFaceEmbeddingService
-        from application.services.document_embedding_service import DocumentEmbeddingService
+        processing_cache = get_processing_cache()
         
-        # Initialize services
-        embedding_service = HuggingFaceEmbeddingService()
-        vector_repository = ChromaVectorRepository(
-            collection_name="supporting_docs",
-            persist_directory="chroma_db"
+        fetcher = get_fetcher("supporting_docs")
+        
+        content_version = await asyncio.to_thread(
+            fetcher.get_content_version, request.dataset_id
         )
-        doc_embedding_service = DocumentEmbeddingService(
-            embedding_service=embedding_service,
-            vector_repository=vector_repository
+        if content_version:
+            # A different document limit yields a different result
+            content_version = f"{content_version}|max_documents={request.max_documents}"
+            cached = await asyncio.to_thread(
+                processing_cache.get, request.dataset_id, content_version
+            )
+            if cached:
+                logger.info(f"Processing cache hit for {request.dataset_id}")
+                return ProcessDocumentsResponse(**{**cached, "status": "cached"})
+        
+        # Model and collection are loaded once per process
+        doc_embedding_service = get_doc_embedding_service()
+        
+        # Fetch documents
+        downloaded_docs = await asyncio.to_thread(
+            fetcher.fetch_all_documents,
+            dataset_id=request.dataset_id,
+            max_docs=request.max_documents
         )
-        fetcher = SupportingDocFetcher(download_dir="supporting_docs")
         
-        try:
-            # Fetch documents
-            downloaded_docs = fetcher.fetch_all_documents(
-                dataset_id=request.dataset_id,
-                max_docs=request.max_documents
-            )
-            
-            # Process each document
-            total_chunks = 0
-            for doc in downloaded_docs:
-                if doc.file_path:
-                    chunks = doc_embedding_service.process_document(
-                        file_path=doc.file_path,
-                        dataset_id=request.dataset_id,
-                        document_type=doc.document_type
-                    )
-                    total_chunks += len(chunks)
-            
-            return ProcessDocumentsResponse(
-                dataset_id=request.dataset_id,
-                documents_processed=len(downloaded_docs),
-                chunks_created=total_chunks,
-                status="completed"
+        # Embed chunks of all documents together in batched model calls;
+        # PDF parsing is spread over the extraction process pool
+        chunks = await asyncio.to_thread(
+            doc_embedding_service.process_documents,
+            [(doc.file_path, doc.document_type) for doc in downloaded_docs if doc.file_path],
+            dataset_id=request.dataset_id,
+            executor=get_extraction_pool()
+        )
+        total_chunks = len(chunks)
+        
+        response = ProcessDocumentsResponse(
+            dataset_id=request.dataset_id,
+            documents_processed=len(downloaded_docs),
+            chunks_created=total_chunks,
+            status="completed"
+        )
+        if content_version:
+            await asyncio.to_thread(
+                processing_cache.put, request.dataset_id, content_version, response.model_dump()
             )
-            
-        finally:
-            fetcher.close()
-            
+        return response
+        
     except Exception as e:
         logger.error(f"Document processing failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -216,24 +285,7 @@ async def extract_zip(request: ZipExtractionRequest):
             download_url = request.download_url
             if not download_url:
                 # First, try to get download_url from database
-                try:
-                    from infrastructure.persistence.sqlite.connection import get_database
-                    from infrastructure.persistence.sqlite.models import MetadataModel
-                    from pathlib import Path
-                    
-                    backend_dir = Path(__file__).parent.parent.parent.parent
-                    db_path = str(backend_dir / "datasets.db")
-                    db = get_database(db_path)
-                    
-                    with db.session_scope() as session:
-                        metadata = session.query(MetadataModel).filter_by(
-                            dataset_id=request.dataset_id
-                        ).first()
-                        if metadata and metadata.download_url:
-                            download_url = metadata.download_url
-                            logger.info(f"Using download_url from database: {download_url}")
-                except Exception as e:
-                    logger.warning(f"Failed to query database for download_url: {e}")
+                download_url = await asyncio.to_thread(_lookup_download_url, request.dataset_id)
                 
                 # Fallback to default URL pattern if not found in database
                 if not download_url:
@@ -241,26 +293,20 @@ async def extract_zip(request: ZipExtractionRequest):
                     download_url = f"https://data-package.ceh.ac.uk/data/{request.dataset_id}.zip"
                     logger.info(f"Using fallback download_url: {download_url}")
             
-            # Check if already extracted
-            manifest = extractor.get_manifest(request.dataset_id)
-            if manifest:
+            # Check if already extracted (precomputed totals, first 20 files)
+            summary = await asyncio.to_thread(extractor.get_manifest_summary, request.dataset_id)
+            if summary and summary.total_files:
                 return ZipExtractionResponse(
                     dataset_id=request.dataset_id,
-                    total_files=len(manifest),
-                    total_size_bytes=sum(f.file_size for f in manifest),
-                    files=[
-                        {
-                            "filename": f.filename,
-                            "format": f.file_format,
-                            "size": f.file_size
-                        }
-                        for f in manifest[:20]  # Limit to first 20 files
-                    ],
+                    total_files=summary.total_files,
+                    total_size_bytes=summary.total_size,
+                    files=summary.preview,
                     status="already_extracted"
                 )
             
             # Download and extract
-            result = extractor.extract_from_url(
+            result = await asyncio.to_thread(
+                extractor.extract_from_url,
                 url=download_url,
                 dataset_id=request.dataset_id
             )
@@ -307,7 +353,7 @@ async def list_extracted_files(dataset_id: str):
         extractor = ZipExtractor(extract_dir="extracted_datasets")
         
         try:
-            manifest = extractor.get_manifest(dataset_id)
+            manifest = await asyncio.to_thread(extractor.get_manifest, dataset_id)
             
             if not manifest:
                 raise HTTPException(
@@ -315,7 +361,8 @@ async def list_extracted_files(dataset_id: str):
                     detail=f"No extracted files found for dataset {dataset_id}"
                 )
             
-            return {
+            # Plain JSON types only: skip jsonable_encoder for large manifests
+            return JSON_RESPONSE_CLASS({
                 "dataset_id": dataset_id,
                 "total_files": len(manifest),
                 "files": [
@@ -327,7 +374,7 @@ async def list_extracted_files(dataset_id: str):
                     }
                     for f in manifest
                 ]
-            }
+            })
             
         finally:
             extractor.close()
@@ -11,6 +11,8 @@ Author: University of Manchester RSE Team
 from abc import ABC, abstractmethod
 from typing import List
 
+import numpy as np
+
 
 class IEmbeddingService(ABC):
     """
@@ -29,10 +31,15 @@ class IEmbeddingService(ABC):
     - Dependency Inversion: Application depends on abstraction
     - Interface Segregation: Focused interface for embedding generation
     - Single Responsibility: Only handles text-to-vector conversion
+
+    Embeddings cross this boundary as float32 numpy arrays, not lists of
+    Python floats (breaking change: generate_embedding used to return
+    List[float]). Code that needs a list calls generate_embedding_list(),
+    or .tolist() at its own edge.
     """
 
     @abstractmethod
-    def generate_embedding(self, text: str) -> List[float]:
+    def generate_embedding(self, text: str) -> np.ndarray:
         """
         Generate a dense vector embedding from text.
 
@@ -44,7 +51,7 @@ class IEmbeddingService(ABC):
             text: Input text to embed (e.g., title + abstract)
 
         Returns:
-            List[float]: Dense vector embedding (typically 384-768 dimensions)
+            np.ndarray: (dimension,) float32 vector (typically 384-768 dimensions)
 
         Raises:
             EmbeddingError: If embedding generation fails
@@ -52,13 +59,54 @@ class IEmbeddingService(ABC):
         Example:
             >>> service = HuggingFaceEmbeddingService()
             >>> embedding = service.generate_embedding("Land cover map")
-            >>> len(embedding)  # Model-dependent dimension
-            384
-            >>> isinstance(embedding[0], float)
-            True
+            >>> embedding.shape  # Model-dependent dimension
+            (384,)
+            >>> embedding.dtype
+            dtype('float32')
         """
         pass
 
+    def generate_embedding_list(self, text: str) -> List[float]:
+        """
+        Generate an embedding as a list of Python floats.
+
+        Adapter for legacy consumers (e.g. JSON serialization) that expect
+        List[float]; everything else should use generate_embedding().
+
+        Args:
+            text: Input text to embed
+
+        Returns:
+            List[float]: Dense vector embedding
+        """
+        return self.generate_embedding(text).tolist()
+
+    def generate_embeddings(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Generate embeddings for many texts at once.
+
+        Implementations backed by a batched model should override this; the
+        default embeds one text at a time.
+
+        Args:
+            texts: Input texts to embed
+            batch_size: Texts per model forward pass
+
+        Returns:
+            np.ndarray: (len(texts), dimension) float32 matrix
+
+        Raises:
+            EmbeddingError: If embedding generation fails
+
+        Example:
+            >>> embeddings = service.generate_embeddings(["Climate data", "Land cover"])
+            >>> embeddings.shape
+            (2, 384)
+        """
+        if not texts:
+            return np.empty((0, self.get_dimension()), dtype=np.float32)
+        return np.stack([self.generate_embedding(text) for text in texts]).astype(np.float32, copy=False)
+
     @abstractmethod
     def get_dimension(self) -> int:
         """
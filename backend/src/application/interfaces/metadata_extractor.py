@@ -12,12 +12,6 @@ Author: University of Manchester RSE Team
 
 from abc import ABC, abstractmethod
 from typing import Optional, List
-import sys
-import os
-
-# Add the parent directory to the path to allow imports from domain layer
-# This is a workaround for the current project structure
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
 
 from domain.entities.metadata import Metadata
 from domain.entities.resource import Resource
@@ -7,18 +7,33 @@ This module provides functionality for extracting text from supporting documents
 Author: University of Manchester RSE Team
 """
 
+import hashlib
 import logging
+import mmap
+import multiprocessing
 import os
 import re
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, MutableMapping, Optional, Tuple
 from uuid import uuid4
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
-# Try to import PDF extraction libraries
+# Try to import PDF extraction libraries (PyMuPDF first: native and much faster)
+try:
+    import fitz  # PyMuPDF
+    HAS_FITZ = True
+except ImportError:
+    HAS_FITZ = False
+
 try:
     from pypdf import PdfReader as PyPdfReader
     HAS_PYPDF = True
@@ -31,6 +46,13 @@ try:
 except ImportError:
     HAS_PYPDF2 = False
 
+# Zstandard for documents stored compressed (.zst) by the fetcher
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
 # Try to import DOCX extraction library
 try:
     from docx import Document as DocxDocument
@@ -62,7 +84,7 @@ class DocumentTextExtractor:
     Extracts text content from various document formats.
     
     Supports:
-    - PDF (via PyPDF2)
+    - PDF (via PyMuPDF, falling back to pypdf/PyPDF2)
     - TXT (plain text)
     - DOCX (basic text extraction)
     """
@@ -93,6 +115,9 @@ class DocumentTextExtractor:
         
         ext = path.suffix.lower()
         
+        if ext == '.zst':
+            return self._extract_zst(path)
+        
         try:
             if ext == '.pdf':
                 return self._extract_pdf(path)
@@ -107,14 +132,43 @@ class DocumentTextExtractor:
             logger.error(f"Text extraction failed for {file_path}: {e}")
             return None
     
+    def _extract_zst(self, path: Path) -> Optional[str]:
+        """Extract text from a zstd-compressed document (e.g. notes.txt.zst)."""
+        if not HAS_ZSTD:
+            logger.warning(f"zstandard not available to read {path.name}")
+            return None
+        
+        # Decompress next to the original name so format detection still works
+        if not Path(path.stem).suffix:
+            logger.warning(f"Unsupported file format: {path.name}")
+            return None
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                plain_path = Path(tmp) / path.stem
+                with open(path, 'rb') as src, open(plain_path, 'wb') as dst:
+                    zstandard.ZstdDecompressor().copy_stream(src, dst)
+                return self.extract_text(str(plain_path))
+        except Exception as e:
+            logger.error(f"Zstd decompression failed for {path.name}: {e}")
+            return None
+    
     def _extract_pdf(self, path: Path) -> Optional[str]:
         """Extract text from PDF file."""
         try:
-            if HAS_PYPDF:
+            if HAS_FITZ:
+                text_parts = []
+                # Plain text only: no image blocks or ligature preservation
+                flags = fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_IMAGES & ~fitz.TEXT_PRESERVE_LIGATURES
+                with fitz.open(str(path)) as doc:
+                    for page in doc:
+                        page_text = page.get_text("text", flags=flags)
+                        if page_text:
+                            text_parts.append(page_text)
+            elif HAS_PYPDF:
                 reader = PyPdfReader(str(path))
                 text_parts = []
                 for page in reader.pages:
-                    page_text = page.extract_text()
+                    page_text = page.extract_text(extraction_mode="plain")
                     if page_text:
                         text_parts.append(page_text)
             elif HAS_PYPDF2:
@@ -140,8 +194,16 @@ class DocumentTextExtractor:
     def _extract_txt(self, path: Path) -> Optional[str]:
         """Extract text from plain text file."""
         try:
-            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                text = f.read()
+            # Decode straight from the mapped file, with no read() buffer copy
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    text = ""
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        text = str(mm, 'utf-8', errors='ignore')
+            # Match text-mode universal newlines
+            if '\r' in text:
+                text = text.replace('\r\n', '\n').replace('\r', '\n')
             logger.info(f"Read {len(text)} chars from TXT: {path.name}")
             return text
         except Exception as e:
@@ -175,6 +237,44 @@ class DocumentTextExtractor:
             logger.error(f"DOCX extraction error: {e}")
             return None
 
+    def extract_chunks(self, file_path: str) -> List[str]:
+        """
+        Extract a document's text and split it into chunks.
+        
+        Uses only the extractor's settings, so it can run in a worker process.
+        
+        Args:
+            file_path: Path to the document
+            
+        Returns:
+            List of text chunks (empty if no text could be extracted)
+        """
+        text = self.extract_text(file_path)
+        if not text:
+            logger.warning(f"No text extracted from {file_path}")
+            return []
+        return self.chunk_text(text)
+    
+    def extract_spans(self, file_path: str) -> Tuple[str, List[Tuple[int, int]]]:
+        """
+        Extract a document's text and the offsets of its chunks.
+        
+        For worker processes: the text crosses the process boundary once,
+        with plain (start, end) pairs, instead of as overlapping chunk
+        strings that repeat each overlap and pickle one object per chunk.
+        
+        Args:
+            file_path: Path to the document
+            
+        Returns:
+            (text, spans); text is "" if no text could be extracted
+        """
+        text = self.extract_text(file_path)
+        if not text:
+            logger.warning(f"No text extracted from {file_path}")
+            return "", []
+        return text, list(self.iter_spans(text))
+    
     def chunk_text(self, text: str) -> List[str]:
         """
         Split text into overlapping chunks for embedding.
@@ -185,38 +285,120 @@ class DocumentTextExtractor:
         Returns:
             List of text chunks
         """
+        chunks = list(self.iter_chunks(text))
+        logger.info(f"Split text into {len(chunks)} chunks")
+        return chunks
+    
+    def iter_chunks(self, text: str) -> Iterator[str]:
+        """
+        Yield overlapping chunks of text one at a time (see chunk_text).
+        
+        Args:
+            text: Full document text
+            
+        Yields:
+            Text chunks, in order
+        """
+        for start, end in self.iter_spans(text):
+            yield text[start:end]
+    
+    def iter_spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Yield the (start, end) offsets of each chunk of text.
+        
+        text[start:end] is the chunk, already stripped of surrounding
+        whitespace; empty chunks are skipped.
+        
+        Args:
+            text: Full document text
+            
+        Yields:
+            Chunk offsets, in order
+        """
         if not text or len(text) < self.chunk_size:
-            return [text] if text else []
+            if text:
+                yield 0, len(text)
+            return
         
-        chunks = []
-        start = 0
+        # Fixed-stride window: chunk i starts at i * stride, and the chunk
+        # count is ceil((len - chunk_size) / stride) + 1
+        stride = max(1, self.chunk_size - self.overlap)
+        count = -(-(len(text) - self.chunk_size) // stride) + 1
         
-        while start < len(text):
+        for start in range(0, count * stride, stride):
             end = start + self.chunk_size
             
-            # Try to break at sentence or paragraph boundary
+            # Snap the end back to a paragraph or sentence boundary, but only
+            # within the overlap with the next chunk so no text is skipped.
+            # The window is just `overlap` chars, so bounded rfind() calls
+            # (C scans) beat indexing every boundary in the document.
             if end < len(text):
-                # Look for paragraph break
-                para_break = text.rfind('\n\n', start, end)
-                if para_break > start + self.chunk_size // 2:
+                next_start = start + stride
+                para_break = text.rfind('\n\n', next_start, end)
+                if para_break >= 0:
                     end = para_break
                 else:
-                    # Look for sentence break
                     sentence_break = max(
-                        text.rfind('. ', start, end),
-                        text.rfind('.\n', start, end)
+                        text.rfind('. ', next_start - 1, end),
+                        text.rfind('.\n', next_start - 1, end)
                     )
-                    if sentence_break > start + self.chunk_size // 2:
+                    if sentence_break >= 0:
                         end = sentence_break + 1
             
-            chunk = text[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
-            
-            start = end - self.overlap
-        
-        logger.info(f"Split text into {len(chunks)} chunks")
-        return chunks
+            # Same span as text[start:end].strip()
+            end = min(end, len(text))
+            while start < end and text[start].isspace():
+                start += 1
+            while end > start and text[end - 1].isspace():
+                end -= 1
+            if start < end:
+                yield start, end
+
+
+class _EmbeddingWriter:
+    """
+    Embeds chunks in full model batches and writes them in large upserts.
+    
+    Holds at most one partial model batch plus one upsert buffer, however
+    many chunks pass through it.
+    """
+    
+    def __init__(self, service: "DocumentEmbeddingService"):
+        self.service = service
+        self.pending: List[DocumentChunk] = []
+        self.embedded_chunks: List[DocumentChunk] = []
+        self.embedded_vectors: List[np.ndarray] = []
+    
+    def add(self, chunks: List[DocumentChunk]) -> None:
+        """Queue chunks; embed whole batches now and keep the remainder."""
+        self.pending.extend(chunks)
+        ready = len(self.pending) - len(self.pending) % self.service.batch_size
+        if ready:
+            self._embed_pending(ready)
+        if len(self.embedded_chunks) >= self.service.upsert_batch_size:
+            self._flush()
+    
+    def close(self) -> None:
+        """Embed whatever is pending and write everything buffered."""
+        self._embed_pending(len(self.pending))
+        self._flush()
+    
+    def _embed_pending(self, count: int) -> None:
+        """Embed the first `count` pending chunks into the write buffer."""
+        if not count:
+            return
+        batch, self.pending = self.pending[:count], self.pending[count:]
+        embeddings = self.service._embed(batch)
+        if embeddings is not None:
+            self.embedded_chunks.extend(batch)
+            self.embedded_vectors.append(embeddings)
+    
+    def _flush(self) -> None:
+        """Write the buffered embeddings in one vector store call."""
+        if self.embedded_chunks:
+            self.service._store(self.embedded_chunks, np.concatenate(self.embedded_vectors))
+            self.embedded_chunks = []
+            self.embedded_vectors = []
 
 
 class DocumentEmbeddingService:
@@ -228,13 +410,30 @@ class DocumentEmbeddingService:
     2. Chunks text for embedding
     3. Generates embeddings using the embedding service
     4. Stores embeddings in the vector database
+    
+    Chunks whose normalized text was already stored (shared headers,
+    copyright pages, repeated boilerplate) are not embedded again: their
+    vector is read back from the store and upserted under the new chunk's
+    id and metadata.
     """
     
+    # Content hashes of stored chunks remembered for deduplication
+    SEEN_CHUNKS_SIZE = 100_000
+    
+    # embedding_cache entries are stored at half precision (half the bytes
+    # per entry; cosine scores change by well under 1e-3) and widened to
+    # float32 when read back
+    CACHE_DTYPE = np.float16
+    
     def __init__(
         self,
         embedding_service,  # IEmbeddingService
         vector_repository,  # IVectorRepository
-        chunk_size: int = 1500
+        chunk_size: int = 1500,
+        batch_size: int = 32,
+        extraction_workers: int = 4,
+        upsert_batch_size: int = 1024,
+        embedding_cache: Optional[MutableMapping[str, np.ndarray]] = None
     ):
         """
         Initialize document embedding service.
@@ -243,10 +442,213 @@ class DocumentEmbeddingService:
             embedding_service: Service for generating embeddings
             vector_repository: Repository for storing vectors
             chunk_size: Characters per chunk
+            batch_size: Chunks per embedding model forward pass
+            extraction_workers: Threads parsing documents when no executor is given
+            upsert_batch_size: Embedded chunks buffered per vector store write
+            embedding_cache: Optional dict-like store of chunk embeddings by
+                content hash, so re-ingested documents skip the model
+                (entries are CACHE_DTYPE)
         """
         self.embedding_service = embedding_service
         self.vector_repository = vector_repository
+        self.batch_size = batch_size
+        self.extraction_workers = max(1, extraction_workers)
+        self.upsert_batch_size = max(1, upsert_batch_size)
         self.extractor = DocumentTextExtractor(chunk_size=chunk_size)
+        self.embedding_cache = embedding_cache
+        self._cache_namespace: Optional[str] = None
+        # Content hash -> id of a stored chunk with that text
+        self._seen: "OrderedDict[bytes, str]" = OrderedDict()
+        # One service instance is shared by concurrent API requests
+        self._seen_lock = threading.Lock()
+    
+    @staticmethod
+    def _content_key(chunk: DocumentChunk) -> bytes:
+        """Hash of a chunk's embedding text with whitespace normalized."""
+        text = " ".join(chunk.to_embedding_text().split())
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    
+    def _cache_key(self, key: bytes) -> str:
+        """Embedding cache key: content hash namespaced by model and dimension."""
+        if self._cache_namespace is None:
+            self._cache_namespace = (
+                f"{self.embedding_service.get_model_name()}:"
+                f"{self.embedding_service.get_dimension()}"
+            )
+        return f"{self._cache_namespace}:{key.hex()}"
+    
+    def _build_chunks(
+        self,
+        file_path: str,
+        dataset_id: str,
+        document_type: str,
+        chunks_text: List[str]
+    ) -> List[DocumentChunk]:
+        """Wrap one document's text chunks as DocumentChunks."""
+        if not chunks_text:
+            return []
+        return list(self._wrap_chunks(file_path, dataset_id, document_type, chunks_text))
+    
+    def _wrap_chunks(
+        self,
+        file_path: str,
+        dataset_id: str,
+        document_type: str,
+        chunks_text: Iterable[str]
+    ) -> Iterator[DocumentChunk]:
+        """Yield one document's text chunks as DocumentChunks."""
+        # Per-document values, computed once rather than per chunk
+        doc_id = str(uuid4())
+        id_prefix = doc_id + "_chunk_"
+        filename = Path(file_path).name
+        created_at = datetime.utcnow()
+        
+        for idx, chunk_text in enumerate(chunks_text):
+            yield DocumentChunk(
+                id=id_prefix + str(idx),
+                document_id=doc_id,
+                dataset_id=dataset_id,
+                chunk_index=idx,
+                content=chunk_text,
+                source_file=filename,
+                document_type=document_type,
+                created_at=created_at
+            )
+    
+    def _generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts batch_size at a time, halving the batch on out-of-memory.
+        
+        Long chunks make some batches much larger than others, so a batch
+        that exhausts GPU memory is retried in smaller forward passes
+        instead of failing the whole document.
+        """
+        batch_size = self.batch_size
+        while True:
+            try:
+                return self.embedding_service.generate_embeddings(texts, batch_size=batch_size)
+            except Exception as e:
+                if batch_size == 1 or "out of memory" not in str(e).lower():
+                    raise
+                batch_size //= 2
+                logger.warning(f"Embedding ran out of memory; retrying with batch_size={batch_size}")
+    
+    def _embed(self, chunks: List[DocumentChunk]):
+        """
+        Embed chunks in batched model calls; None if embedding fails.
+        
+        Each distinct text is embedded once per call. Texts already in the
+        vector store reuse the stored vector, and texts in embedding_cache
+        reuse the cached one, instead of calling the model.
+        """
+        keys = [self._content_key(chunk) for chunk in chunks]
+        texts: Dict[bytes, str] = {}
+        for key, chunk in zip(keys, chunks):
+            texts.setdefault(key, chunk.to_embedding_text())
+        
+        with self._seen_lock:
+            stored = {key: self._seen[key] for key in texts if key in self._seen}
+            for key in stored:
+                self._seen.move_to_end(key)
+        
+        vectors: Dict[bytes, np.ndarray] = {}
+        if stored:
+            try:
+                found = self.vector_repository.get_vectors(list(stored.values()))
+                vectors.update(zip(stored, np.asarray(found, dtype=np.float32)))
+            except Exception as e:
+                # Stored copies were deleted or are unreadable: embed them again
+                logger.warning(f"Could not reuse {len(stored)} stored chunk vectors: {e}")
+                with self._seen_lock:
+                    for key in stored:
+                        self._seen.pop(key, None)
+        
+        fresh = [key for key in texts if key not in vectors]
+        if fresh and self.embedding_cache is not None:
+            for key in fresh:
+                cached = self.embedding_cache.get(self._cache_key(key))
+                if cached is not None:
+                    vectors[key] = np.asarray(cached, dtype=np.float32)
+            fresh = [key for key in fresh if key not in vectors]
+        
+        if fresh:
+            try:
+                embeddings = self._generate_embeddings([texts[key] for key in fresh])
+            except Exception as e:
+                logger.error(f"Failed to embed {len(fresh)} chunks: {e}")
+                return None
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+            vectors.update(zip(fresh, embeddings))
+            if self.embedding_cache is not None:
+                for key, embedding in zip(fresh, embeddings):
+                    self.embedding_cache[self._cache_key(key)] = embedding.astype(self.CACHE_DTYPE)
+        
+        if len(fresh) < len(chunks):
+            logger.debug(f"Embedded {len(fresh)} of {len(chunks)} chunks; the rest were reused")
+        return np.stack([vectors[key] for key in keys])
+    
+    def _store(self, chunks: List[DocumentChunk], embeddings) -> None:
+        """Upsert embedded chunks with their metadata in one batch call."""
+        if not chunks:
+            return
+        
+        try:
+            # Store in vector database with metadata
+            self.vector_repository.upsert_vectors_batch(
+                ids=[chunk.id for chunk in chunks],
+                vectors=embeddings,
+                metadatas=[
+                    {
+                        "title": f"{chunk.source_file} - Chunk {chunk.chunk_index + 1}",
+                        "abstract": chunk.content[:500],
+                        "keywords": [chunk.document_type, "supporting_document"],
+                        "type": "document",
+                        "dataset_id": chunk.dataset_id,
+                        "source_file": chunk.source_file,
+                        "chunk_index": chunk.chunk_index
+                    }
+                    for chunk in chunks
+                ]
+            )
+            
+            logger.debug(f"Stored embeddings for {len(chunks)} chunks")
+            
+            with self._seen_lock:
+                for chunk in chunks:
+                    key = self._content_key(chunk)
+                    if key not in self._seen:
+                        self._seen[key] = chunk.id
+                while len(self._seen) > self.SEEN_CHUNKS_SIZE:
+                    self._seen.popitem(last=False)
+            
+        except Exception as e:
+            logger.error(f"Failed to store {len(chunks)} chunks: {e}")
+    
+    def iter_chunks(
+        self,
+        file_path: str,
+        dataset_id: str,
+        document_type: str = "supporting_doc"
+    ) -> Iterator[DocumentChunk]:
+        """
+        Extract a document and yield its chunks lazily.
+        
+        Args:
+            file_path: Path to the document
+            dataset_id: Associated dataset ID
+            document_type: Type of document
+            
+        Yields:
+            DocumentChunks, in order
+        """
+        text = self.extractor.extract_text(file_path)
+        if not text:
+            logger.warning(f"No text extracted from {file_path}")
+            return
+        
+        yield from self._wrap_chunks(
+            file_path, dataset_id, document_type, self.extractor.iter_chunks(text)
+        )
     
     def process_document(
         self,
@@ -257,6 +659,9 @@ class DocumentEmbeddingService:
         """
         Process a document and store its embeddings.
         
+        Chunks are streamed from iter_chunks() into the embedder a batch at
+        a time, so embeddings for a long document are never all in memory.
+        
         Args:
             file_path: Path to the document
             dataset_id: Associated dataset ID
@@ -265,75 +670,107 @@ class DocumentEmbeddingService:
         Returns:
             List of created DocumentChunks
         """
-        # Extract text
-        text = self.extractor.extract_text(file_path)
-        if not text:
-            logger.warning(f"No text extracted from {file_path}")
-            return []
+        chunks = []
+        writer = _EmbeddingWriter(self)
+        for chunk in self.iter_chunks(file_path, dataset_id, document_type):
+            chunks.append(chunk)
+            writer.add([chunk])
+        writer.close()
         
-        # Chunk text
-        chunks_text = self.extractor.chunk_text(text)
-        if not chunks_text:
-            return []
+        if chunks:
+            logger.info(f"Processed {len(chunks)} chunks from {chunks[0].source_file}")
+        return chunks
+    
+    def process_documents(
+        self,
+        documents: List[Tuple[str, str]],
+        dataset_id: str,
+        executor: Optional[Executor] = None
+    ) -> List[DocumentChunk]:
+        """
+        Process several documents, embedding their chunks in shared batches.
         
-        # Generate document ID
-        doc_id = str(uuid4())
-        filename = Path(file_path).name
+        Documents are parsed concurrently on `executor` (e.g. a
+        ProcessPoolExecutor, since PDF parsing is CPU-bound Python) or on a
+        local pool of `extraction_workers` threads. Embedding overlaps with
+        parsing: as documents finish, their chunks join a pending list, and
+        every full multiple of batch_size is embedded while the remaining
+        documents are still being parsed. The model therefore still sees full
+        batches that span documents. Embedded chunks are buffered and written
+        to the vector store upsert_batch_size at a time, so a whole run
+        usually costs one or a few large inserts.
         
-        chunks = []
-        for idx, chunk_text in enumerate(chunks_text):
-            chunk = DocumentChunk(
-                id=f"{doc_id}_chunk_{idx}",
-                document_id=doc_id,
-                dataset_id=dataset_id,
-                chunk_index=idx,
-                content=chunk_text,
-                source_file=filename,
-                document_type=document_type,
-                created_at=datetime.utcnow()
+        Args:
+            documents: (file_path, document_type) pairs
+            dataset_id: Associated dataset ID
+            executor: Optional executor for text extraction
+            
+        Returns:
+            All created DocumentChunks, in document order
+        """
+        if not documents:
+            return []
+        
+        own_executor = None
+        if executor is None:
+            own_executor = executor = ThreadPoolExecutor(
+                max_workers=min(self.extraction_workers, len(documents))
             )
-            chunks.append(chunk)
+        
+        try:
+            futures = {
+                executor.submit(self.extractor.extract_spans, file_path): position
+                for position, (file_path, _) in enumerate(documents)
+            }
+            per_document: List[List[DocumentChunk]] = [[] for _ in documents]
+            writer = _EmbeddingWriter(self)
             
-            # Generate embedding
-            try:
-                embedding = self.embedding_service.generate_embedding(chunk_text)
+            for future in as_completed(futures):
+                position = futures[future]
+                file_path, document_type = documents[position]
+                try:
+                    text, spans = future.result()
+                except Exception as e:
+                    logger.error(f"Text extraction failed for {file_path}: {e}")
+                    continue
                 
-                # Store in vector database with metadata
-                self.vector_repository.upsert_vector(
-                    id=chunk.id,
-                    vector=embedding,
-                    metadata={
-                        "title": f"{filename} - Chunk {idx + 1}",
-                        "abstract": chunk_text[:500],
-                        "keywords": [document_type, "supporting_document"],
-                        "type": "document",
-                        "dataset_id": dataset_id,
-                        "source_file": filename,
-                        "chunk_index": idx
-                    }
-                )
+                chunks_text = [text[start:end] for start, end in spans]
                 
-                logger.debug(f"Stored embedding for chunk {idx + 1}/{len(chunks_text)}")
+                chunks = self._build_chunks(file_path, dataset_id, document_type, chunks_text)
+                per_document[position] = chunks
                 
-            except Exception as e:
-                logger.error(f"Failed to embed chunk {idx}: {e}")
+                # Embed whole batches now; keep the remainder for later documents
+                writer.add(chunks)
+            
+            writer.close()
+        finally:
+            if own_executor is not None:
+                own_executor.shutdown(wait=True)
         
-        logger.info(f"Processed {len(chunks)} chunks from {filename}")
-        return chunks
+        all_chunks = [chunk for chunks in per_document for chunk in chunks]
+        logger.info(f"Processed {len(all_chunks)} chunks from {len(documents)} documents")
+        return all_chunks
     
     def process_directory(
         self,
         directory: str,
         dataset_id: str,
-        extensions: List[str] = None
+        extensions: List[str] = None,
+        executor: Optional[Executor] = None
     ) -> List[DocumentChunk]:
         """
         Process all documents in a directory.
         
+        Without an `executor`, a directory of several documents is parsed on
+        a temporary process pool with one worker per core, since PDF parsing
+        is CPU-bound and independent per file. Embedding and vector writes
+        stay in this process.
+        
         Args:
             directory: Directory containing documents
             dataset_id: Associated dataset ID
             extensions: File extensions to process (default: pdf, txt)
+            executor: Optional executor for text extraction
             
         Returns:
             List of all created DocumentChunks
@@ -345,16 +782,28 @@ class DocumentEmbeddingService:
             logger.error(f"Directory not found: {directory}")
             return []
         
-        all_chunks = []
+        # One walk of the tree for all extensions
+        suffixes = tuple(ext.lower() for ext in extensions)
+        documents = [
+            (os.path.join(root, name), "supporting_doc")
+            for root, _, names in os.walk(dir_path)
+            for name in names
+            if name.lower().endswith(suffixes)
+        ]
         
-        for ext in extensions:
-            for file_path in dir_path.glob(f"**/*{ext}"):
-                chunks = self.process_document(
-                    str(file_path),
-                    dataset_id,
-                    "supporting_doc"
-                )
-                all_chunks.extend(chunks)
+        own_executor = None
+        if executor is None and len(documents) > 1:
+            # Spawned, so workers never inherit the model or open handles
+            own_executor = executor = ProcessPoolExecutor(
+                max_workers=min(os.cpu_count() or 1, len(documents)),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        
+        try:
+            all_chunks = self.process_documents(documents, dataset_id, executor=executor)
+        finally:
+            if own_executor is not None:
+                own_executor.shutdown(wait=True)
         
         logger.info(f"Processed {len(all_chunks)} total chunks from {directory}")
         return all_chunks
@@ -7,16 +7,69 @@ including PDF extraction, text processing, and document chunking.
 Author: University of Manchester RSE Team
 """
 
+import importlib
 import logging
+import mmap
+import os
 import re
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
 from uuid import uuid4
 
 logger = logging.getLogger(__name__)
 
+# Text normalization patterns used by TextChunker
+_WHITESPACE = re.compile(r'\s+')
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def _split_sentence_ends(text: str) -> List[str]:
+    """
+    Split whitespace-normalized text after ". ", "! " and "? ".
+    
+    Same result as _SENTENCE_END.split(text) once runs of whitespace are a
+    single space, but done with str.replace/str.split in C instead of a
+    lookbehind regex.
+    """
+    if '\0' in text:
+        return _SENTENCE_END.split(text)
+    return text.replace('. ', '.\0').replace('! ', '!\0').replace('? ', '?\0').split('\0')
+
+
+def _pdf_text_flags(fitz) -> int:
+    """PyMuPDF plain-text flags: no image blocks or ligature preservation."""
+    return fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_IMAGES & ~fitz.TEXT_PRESERVE_LIGATURES
+
+
+def _extract_pdf_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """
+    Text of pages [start, stop) of a PDF.
+    
+    Runs in worker processes, so it opens the file itself: only the path
+    and page numbers cross the process boundary.
+    """
+    import fitz  # PyMuPDF
+    
+    flags = _pdf_text_flags(fitz)
+    with fitz.open(file_path) as doc:
+        return [doc[number].get_text("text", flags=flags) for number in range(start, stop)]
+
+
+
+@lru_cache(maxsize=None)
+def _library_available(module: str, missing_warning: str) -> bool:
+    """Import an optional library once per process and report whether it loaded."""
+    try:
+        importlib.import_module(module)
+        return True
+    except ImportError:
+        logger.warning(missing_warning)
+        return False
+
 
 @dataclass
 class DocumentChunk:
@@ -97,7 +150,7 @@ class TextChunker:
     def _clean_text(self, text: str) -> str:
         """Clean text by normalizing whitespace."""
         # Replace multiple whitespace with single space
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE.sub(' ', text)
         # Remove leading/trailing whitespace
         text = text.strip()
         return text
@@ -105,7 +158,7 @@ class TextChunker:
     def _split_into_sentences(self, text: str) -> List[str]:
         """Split text into sentences."""
         # Simple sentence splitting (could be improved with NLP)
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        sentences = _split_sentence_ends(text)
         return [s.strip() for s in sentences if s.strip()]
     
     def chunk(
@@ -139,54 +192,130 @@ class TextChunker:
                 end_char=len(text)
             )]
         
-        chunks = []
-        sentences = self._split_into_sentences(text)
+        chunks = list(self._chunk_sentences(
+            self._split_into_sentences(text), document_id, document_title
+        ))
         
-        current_chunk = ""
+        logger.debug(f"Created {len(chunks)} chunks from {len(text)} chars")
+        return chunks
+    
+    def chunk_stream(
+        self,
+        parts: Iterable[str],
+        document_id: str,
+        document_title: str
+    ) -> Iterator[DocumentChunk]:
+        """
+        Chunk text that arrives in parts (e.g. PDF pages), yielding as it goes.
+        
+        Produces the same chunks as chunk("\n".join(parts)), but only keeps
+        the current chunk and the unfinished sentence of the latest part in
+        memory, so chunks are available before the last part is read.
+        
+        Args:
+            parts: Consecutive pieces of the document text
+            document_id: Document identifier
+            document_title: Document title for metadata
+            
+        Yields:
+            DocumentChunk objects, in order
+        """
+        yield from self._chunk_sentences(
+            self._iter_sentences(parts), document_id, document_title
+        )
+    
+    def _iter_sentences(self, parts: Iterable[str]) -> Iterator[str]:
+        """Yield the sentences of "\n".join(parts), one part at a time."""
+        pending = None
+        for part in parts:
+            raw = part if pending is None else pending + "\n" + part
+            sentences = _split_sentence_ends(_WHITESPACE.sub(' ', raw).lstrip())
+            # The last sentence may continue in the next part
+            pending = sentences.pop()
+            for sentence in sentences:
+                sentence = sentence.strip()
+                if sentence:
+                    yield sentence
+        
+        if pending is not None:
+            yield from self._split_into_sentences(pending.strip())
+    
+    def _chunk_sentences(
+        self,
+        sentences: Iterable[str],
+        document_id: str,
+        document_title: str
+    ) -> Iterator[DocumentChunk]:
+        """Group sentences into overlapping chunks of about chunk_size chars."""
+        id_prefix = document_id + "_chunk_"
+        # The current chunk is " ".join(current_pieces); it is only joined
+        # when a chunk is emitted, so growing it never copies the buffer
+        current_pieces: List[str] = []
+        current_len = 0
         current_start = 0
         chunk_index = 0
         char_position = 0
         
         for sentence in sentences:
-            potential_chunk = current_chunk + " " + sentence if current_chunk else sentence
+            potential_len = current_len + 1 + len(sentence) if current_pieces else len(sentence)
             
-            if len(potential_chunk) > self.chunk_size and current_chunk:
+            if potential_len > self.chunk_size and current_pieces:
                 # Current chunk is full, save it
-                chunks.append(DocumentChunk(
-                    id=f"{document_id}_chunk_{chunk_index}",
+                current_chunk = " ".join(current_pieces)
+                yield DocumentChunk(
+                    id=id_prefix + str(chunk_index),
                     document_id=document_id,
                     document_title=document_title,
                     content=current_chunk.strip(),
                     chunk_index=chunk_index,
                     start_char=current_start,
                     end_char=char_position
-                ))
+                )
                 
                 chunk_index += 1
                 
                 # Start new chunk with overlap
                 overlap_text = current_chunk[-self.chunk_overlap:] if len(current_chunk) > self.chunk_overlap else ""
-                current_chunk = overlap_text + " " + sentence
+                current_pieces = [overlap_text, sentence]
+                current_len = len(overlap_text) + 1 + len(sentence)
                 current_start = char_position - len(overlap_text)
             else:
-                current_chunk = potential_chunk
+                current_pieces.append(sentence)
+                current_len = potential_len
             
             char_position += len(sentence) + 1  # +1 for space
         
-        # Add final chunk
-        if current_chunk and len(current_chunk.strip()) >= self.min_chunk_size:
-            chunks.append(DocumentChunk(
-                id=f"{document_id}_chunk_{chunk_index}",
+        # Add final chunk; sentences are joined by single spaces, so the
+        # text length is char_position - 1
+        current_chunk = " ".join(current_pieces)
+        text_len = max(char_position - 1, 0)
+        if chunk_index == 0 and text_len < self.min_chunk_size:
+            # Document too small, return as single chunk
+            yield DocumentChunk(
+                id=id_prefix + "0",
+                document_id=document_id,
+                document_title=document_title,
+                content=current_chunk,
+                chunk_index=0,
+                start_char=0,
+                end_char=text_len
+            )
+        elif current_chunk and len(current_chunk.strip()) >= self.min_chunk_size:
+            yield DocumentChunk(
+                id=id_prefix + str(chunk_index),
                 document_id=document_id,
                 document_title=document_title,
                 content=current_chunk.strip(),
                 chunk_index=chunk_index,
                 start_char=current_start,
-                end_char=len(text)
-            ))
-        
-        logger.debug(f"Created {len(chunks)} chunks from {len(text)} chars")
-        return chunks
+                end_char=text_len
+            )
+
+
+@lru_cache(maxsize=None)
+def get_text_chunker(chunk_size: int = 500, chunk_overlap: int = 50) -> TextChunker:
+    """Shared TextChunker per configuration; chunkers hold no per-document state."""
+    return TextChunker(chunk_size, chunk_overlap)
 
 
 class TextFileProcessor(IDocumentProcessor):
@@ -195,17 +324,24 @@ class TextFileProcessor(IDocumentProcessor):
     SUPPORTED_EXTENSIONS = {'.txt', '.md', '.rst', '.csv'}
     
     def __init__(self, chunk_size: int = 500, chunk_overlap: int = 50):
-        self.chunker = TextChunker(chunk_size, chunk_overlap)
+        self.chunker = get_text_chunker(chunk_size, chunk_overlap)
     
     def can_process(self, file_path: str) -> bool:
         ext = Path(file_path).suffix.lower()
         return ext in self.SUPPORTED_EXTENSIONS
     
     def extract_text(self, file_path: str) -> str:
-        """Extract text from file."""
+        """Extract text from file, decoding straight from a memory map."""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return ""
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    text = str(mm, 'utf-8', errors='ignore')
+            # Match text-mode universal newlines
+            if '\r' in text:
+                text = text.replace('\r\n', '\n').replace('\r', '\n')
+            return text
         except Exception as e:
             logger.error(f"Failed to read {file_path}: {e}")
             raise
@@ -238,59 +374,99 @@ class TextFileProcessor(IDocumentProcessor):
 
 
 class PDFProcessor(IDocumentProcessor):
-    """Processor for PDF files using PyMuPDF (optional dependency)."""
+    """
+    Processor for PDF files using PyMuPDF (optional dependency).
+    
+    PyMuPDF documents cannot be shared between threads, so large PDFs are
+    split into page ranges that `executor` (a ProcessPoolExecutor) extracts
+    in parallel, each worker opening the file on its own.
+    """
     
     SUPPORTED_EXTENSIONS = {'.pdf'}
     
-    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 50):
-        self.chunker = TextChunker(chunk_size, chunk_overlap)
+    # Smallest PDF worth splitting across worker processes
+    PARALLEL_MIN_PAGES = 32
+    # Pages extracted per worker task
+    PAGE_RANGE_SIZE = 16
+    
+    def __init__(
+        self,
+        chunk_size: int = 500,
+        chunk_overlap: int = 50,
+        executor: Optional[Executor] = None
+    ):
+        self.chunker = get_text_chunker(chunk_size, chunk_overlap)
+        self.executor = executor
         self._pymupdf_available = self._check_pymupdf()
     
     def _check_pymupdf(self) -> bool:
         """Check if PyMuPDF is available."""
-        try:
-            import fitz  # PyMuPDF
-            return True
-        except ImportError:
-            logger.warning("PyMuPDF not installed. PDF processing will be limited.")
-            return False
+        return _library_available("fitz", "PyMuPDF not installed. PDF processing will be limited.")
     
     def can_process(self, file_path: str) -> bool:
         ext = Path(file_path).suffix.lower()
         return ext in self.SUPPORTED_EXTENSIONS and self._pymupdf_available
     
-    def extract_text(self, file_path: str) -> str:
-        """Extract text from PDF using PyMuPDF."""
+    def iter_pages(self, file_path: str) -> Iterator[str]:
+        """Yield the text of each PDF page in turn, using PyMuPDF."""
         if not self._pymupdf_available:
             raise RuntimeError("PyMuPDF not available for PDF processing")
         
         import fitz  # PyMuPDF
         
-        text_parts = []
         try:
+            flags = _pdf_text_flags(fitz)
             with fitz.open(file_path) as doc:
-                for page in doc:
-                    text_parts.append(page.get_text())
+                page_count = doc.page_count
+                if self.executor is None or page_count < self.PARALLEL_MIN_PAGES:
+                    for page in doc:
+                        yield page.get_text("text", flags=flags)
+                    return
             
-            return "\n".join(text_parts)
+            futures = [
+                self.executor.submit(
+                    _extract_pdf_page_range, file_path, start,
+                    min(start + self.PAGE_RANGE_SIZE, page_count)
+                )
+                for start in range(0, page_count, self.PAGE_RANGE_SIZE)
+            ]
+            # Collected in page order, so chunking starts with the first range
+            for future in futures:
+                yield from future.result()
         except Exception as e:
             logger.error(f"Failed to extract PDF {file_path}: {e}")
             raise
     
+    def extract_text(self, file_path: str) -> str:
+        """Extract text from PDF using PyMuPDF."""
+        return "\n".join(self.iter_pages(file_path))
+    
     def process(self, file_path: str, title: str = None) -> ProcessedDocument:
-        """Process PDF file into chunks."""
+        """
+        Process PDF file into chunks.
+        
+        Pages are chunked as they are read, so the full document text is
+        never held in memory at once.
+        """
         doc_id = str(uuid4())
         doc_title = title or Path(file_path).stem
         
         try:
-            text = self.extract_text(file_path)
-            chunks = self.chunker.chunk(text, doc_id, doc_title)
+            page_lengths = []
+            
+            def pages() -> Iterator[str]:
+                for page_text in self.iter_pages(file_path):
+                    page_lengths.append(len(page_text))
+                    yield page_text
+            
+            chunks = list(self.chunker.chunk_stream(pages(), doc_id, doc_title))
             
             return ProcessedDocument(
                 id=doc_id,
                 title=doc_title,
                 source_path=file_path,
-                total_chars=len(text),
+                # Length of the "\n"-joined text that extract_text returns
+                total_chars=sum(page_lengths) + max(len(page_lengths) - 1, 0),
                 chunks=chunks
             )
         except Exception as e:
@@ -310,17 +486,12 @@ class DOCXProcessor(IDocumentProcessor):
     SUPPORTED_EXTENSIONS = {'.docx', '.doc'}
     
     def __init__(self, chunk_size: int = 500, chunk_overlap: int = 50):
-        self.chunker = TextChunker(chunk_size, chunk_overlap)
+        self.chunker = get_text_chunker(chunk_size, chunk_overlap)
         self._docx_available = self._check_docx()
     
     def _check_docx(self) -> bool:
         """Check if python-docx is available."""
-        try:
-            import docx
-            return True
-        except ImportError:
-            logger.warning("python-docx not installed. DOCX processing will be limited.")
-            return False
+        return _library_available("docx", "python-docx not installed. DOCX processing will be limited.")
     
     def can_process(self, file_path: str) -> bool:
         ext = Path(file_path).suffix.lower()
@@ -386,10 +557,15 @@ class DOCXProcessor(IDocumentProcessor):
 class DocumentProcessorFactory:
     """Factory for creating appropriate document processors."""
     
-    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 50):
+    def __init__(
+        self,
+        chunk_size: int = 500,
+        chunk_overlap: int = 50,
+        pdf_executor: Optional[Executor] = None
+    ):
         self.processors = [
             TextFileProcessor(chunk_size, chunk_overlap),
-            PDFProcessor(chunk_size, chunk_overlap),
+            PDFProcessor(chunk_size, chunk_overlap, executor=pdf_executor),
             DOCXProcessor(chunk_size, chunk_overlap),
         ]
     
@@ -410,3 +586,18 @@ class DocumentProcessorFactory:
     def can_process(self, file_path: str) -> bool:
         """Check if any processor can handle the file."""
         return any(p.can_process(file_path) for p in self.processors)
+
+
+@lru_cache(maxsize=None)
+def get_document_processor_factory(
+    chunk_size: int = 500,
+    chunk_overlap: int = 50,
+    pdf_executor: Optional[Executor] = None
+) -> DocumentProcessorFactory:
+    """
+    Shared DocumentProcessorFactory per configuration.
+    
+    Processors only hold configuration (and the caller's PDF executor), so
+    one factory can serve every document instead of being rebuilt each time.
+    """
+    return DocumentProcessorFactory(chunk_size, chunk_overlap, pdf_executor)
@@ -7,12 +7,20 @@ combining semantic search with LLM-based answer generation.
 Author: University of Manchester RSE Team
 """
 
+import hashlib
+import heapq
 import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+from itertools import islice, takewhile
+from typing import Callable, Deque, Dict, List, Optional, Tuple
 from uuid import uuid4
 
+import numpy as np
+
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -20,11 +28,34 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from domain.repositories.vector_repository import IVectorRepository, VectorSearchResult
 from application.interfaces.embedding_service import IEmbeddingService
 from infrastructure.services.gemini_service import GeminiService, GeminiMessage, GeminiError
+from infrastructure.services.semantic_cache import SemanticCache
+from infrastructure.services.cached_embedding_service import CachedEmbeddingService
 
 logger = logging.getLogger(__name__)
 
+# Turns kept per conversation; older turns fall off the front
+MAX_CONVERSATION_TURNS = 256
+
+# Characters stored per turn; longer messages are truncated
+MAX_TURN_CHARS = 20_000
+
+# Characters of each source's content included in the prompt
+MAX_CONTEXT_CHARS = 1000
+
+# Prompt block per source, and the citation line appended to answers
+_CONTEXT_TEMPLATE = """
+### Source {index}: {title}
+- Relevance Score: {score:.2%}
+- Type: {source_type}
+- ID: {source_id}
 
-@dataclass
+Content:
+{content}{ellipsis}
+""".format
+_SOURCE_TEMPLATE = "[{index}] {title} (relevance: {score:.0%})".format
+
+
+@dataclass(slots=True)
 class RAGContext:
     """Context retrieved for RAG."""
     source_id: str
@@ -35,7 +66,7 @@ class RAGContext:
     metadata: Dict = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class RAGResponse:
     """Response from RAG query."""
     answer: str
@@ -45,7 +76,7 @@ class RAGResponse:
     conversation_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ConversationTurn:
     """A single turn in a conversation."""
     role: str  # 'user' or 'assistant'
@@ -54,34 +85,40 @@ class ConversationTurn:
     sources: List[RAGContext] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class Conversation:
     """Multi-turn conversation state."""
-    id: str = field(default_factory=lambda: str(uuid4()))
-    turns: List[ConversationTurn] = field(default_factory=list)
+    id: str = field(default_factory=lambda: uuid4().hex)
+    turns: Deque[ConversationTurn] = field(
+        default_factory=lambda: deque(maxlen=MAX_CONVERSATION_TURNS)
+    )
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
+    # Gemini messages for the turns, built once as each turn is added
+    _messages: Deque[GeminiMessage] = field(
+        default_factory=lambda: deque(maxlen=MAX_CONVERSATION_TURNS),
+        init=False, repr=False, compare=False
+    )
     
     def add_turn(self, role: str, content: str, sources: List[RAGContext] = None):
         """Add a turn to the conversation."""
+        content = content[:MAX_TURN_CHARS]
         self.turns.append(ConversationTurn(
             role=role,
             content=content,
             sources=sources or []
         ))
+        self._messages.append(GeminiMessage(role=role, content=content))
         self.updated_at = datetime.utcnow()
     
     def get_history(self, max_turns: int = 10) -> List[GeminiMessage]:
         """Get conversation history as Gemini messages."""
-        recent_turns = self.turns[-max_turns:] if len(self.turns) > max_turns else self.turns
-        return [
-            GeminiMessage(role=turn.role, content=turn.content)
-            for turn in recent_turns
-        ]
+        return list(islice(self._messages, max(0, len(self._messages) - max_turns), None))
     
     def clear(self):
         """Clear conversation history."""
-        self.turns = []
+        self.turns.clear()
+        self._messages.clear()
         self.updated_at = datetime.utcnow()
 
 
@@ -108,7 +145,12 @@ class RAGService:
         supporting_docs_repository: Optional[IVectorRepository] = None,
         top_k: int = 5,
         min_relevance_score: float = 0.3,
-        doc_top_k: int = 5
+        doc_top_k: int = 5,
+        response_cache: Optional[SemanticCache] = None,
+        llm_cache_size: int = 1024,
+        semantic_cache_threshold: Optional[float] = None,
+        max_conversations: int = 10_000,
+        conversation_ttl_seconds: float = 3600.0
     ):
         """
         Initialize RAG service.
@@ -119,7 +161,18 @@ class RAGService:
             gemini_service: Gemini LLM service
             top_k: Number of documents to retrieve
             min_relevance_score: Minimum relevance score for inclusion
+            response_cache: Optional semantic cache for answers to
+                history-free questions (single queries, first chat turns)
+            llm_cache_size: Exact-match LLM answers kept, keyed on the
+                question and a hash of the retrieved context (0 disables)
+            semantic_cache_threshold: When no response_cache is given,
+                build one that reuses answers above this cosine similarity
+            max_conversations: Conversations kept (least recently used evicted)
+            conversation_ttl_seconds: Idle time after which a conversation expires
         """
+        # Repeated questions and chat turns must not re-run the embedder
+        if not isinstance(embedding_service, CachedEmbeddingService):
+            embedding_service = CachedEmbeddingService(embedding_service)
         self.embedding_service = embedding_service
         self.vector_repository = vector_repository
         self.supporting_docs_repository = supporting_docs_repository
@@ -127,72 +180,106 @@ class RAGService:
         self.top_k = top_k
         self.min_relevance_score = min_relevance_score
         self.doc_top_k = doc_top_k
+        if response_cache is None and semantic_cache_threshold is not None:
+            response_cache = SemanticCache(threshold=semantic_cache_threshold)
+        self.response_cache = response_cache
+        
+        # (kind, question, context digest, model) -> raw LLM answer
+        self.llm_cache_size = llm_cache_size
+        self._llm_cache: "OrderedDict[Tuple[str, str, str, str], str]" = OrderedDict()
+        self._llm_cache_lock = threading.Lock()
         
-        # Store active conversations
-        self.conversations: Dict[str, Conversation] = {}
+        # The dataset search runs here while the docs search runs inline
+        self._search_pool = ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix="rag-search"
+        ) if supporting_docs_repository else None
+        
+        # Active conversations, least recently used first
+        self.max_conversations = max_conversations
+        self.conversation_ttl = timedelta(seconds=conversation_ttl_seconds)
+        self.conversations: "OrderedDict[str, Conversation]" = OrderedDict()
+        self._conversations_lock = threading.Lock()
         
         logger.info(
             f"RAGService initialized: top_k={top_k}, "
             f"min_relevance={min_relevance_score}"
         )
     
-    def _retrieve_context(self, query: str) -> List[RAGContext]:
+    def close(self) -> None:
+        """Shut down the search thread pool; call once on application shutdown."""
+        if self._search_pool is not None:
+            self._search_pool.shutdown(wait=True)
+    
+    def _retrieve_context(
+        self,
+        query: str,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> List[RAGContext]:
         """
         Retrieve relevant context for a query.
         
         Args:
             query: User query text
+            query_embedding: Precomputed embedding of query, if available
             
         Returns:
             List of relevant context items
         """
         # Generate query embedding
-        query_embedding = self.embedding_service.generate_embedding(query)
+        if query_embedding is None:
+            query_embedding = self.embedding_service.generate_embedding(query)
         
-        # Search vector database
-        dataset_results = self.vector_repository.search(
-            query_vector=query_embedding,
-            limit=self.top_k
-        )
-
-        contexts: List[RAGContext] = []
-        for result in dataset_results:
-            if result.score >= self.min_relevance_score:
-                contexts.append(
-                    RAGContext(
-                        source_id=result.id,
-                        source_type=result.metadata.get("type", "dataset"),
-                        title=result.metadata.get("title", "Unknown"),
-                        content=result.metadata.get("abstract", ""),
-                        relevance_score=result.score,
-                        metadata=result.metadata
-                    )
-                )
-
+        # Search both collections concurrently; total latency is the slower one
+        doc_results = []
         if self.supporting_docs_repository:
+            dataset_future = self._search_pool.submit(
+                self.vector_repository.search,
+                query_vector=query_embedding,
+                limit=self.top_k
+            )
             doc_results = self.supporting_docs_repository.search(
                 query_vector=query_embedding,
                 limit=self.doc_top_k
             )
-            for result in doc_results:
-                if result.score >= self.min_relevance_score:
-                    contexts.append(
-                        RAGContext(
-                            source_id=result.id,
-                            source_type=result.metadata.get("type", "document"),
-                            title=result.metadata.get("title", "Unknown"),
-                            content=result.metadata.get("abstract", ""),
-                            relevance_score=result.score,
-                            metadata=result.metadata
-                        )
-                    )
+            dataset_results = dataset_future.result()
+        else:
+            dataset_results = self.vector_repository.search(
+                query_vector=query_embedding,
+                limit=self.top_k
+            )
 
-        if contexts:
-            contexts.sort(key=lambda c: c.relevance_score, reverse=True)
-            max_contexts = self.top_k + (self.doc_top_k if self.supporting_docs_repository else 0)
-            contexts = contexts[:max_contexts]
+        # Both lists come back best-first, so each is cut at the first hit
+        # below the threshold and the two are merged in one linear pass;
+        # contexts are then built for the surviving hits only
+        min_score = self.min_relevance_score
+        max_contexts = self.top_k + (self.doc_top_k if self.supporting_docs_repository else 0)
+        ranked = islice(
+            heapq.merge(
+                ((result, "dataset") for result in takewhile(
+                    lambda r: r.score >= min_score, dataset_results
+                )),
+                ((result, "document") for result in takewhile(
+                    lambda r: r.score >= min_score, doc_results
+                )),
+                key=lambda hit: hit[0].score,
+                reverse=True
+            ),
+            max_contexts
+        )
+        contexts = [
+            RAGContext(
+                source_id=result.id,
+                source_type=result.metadata.get("type", default_type),
+                title=result.metadata.get("title", "Unknown"),
+                content=result.metadata.get("abstract", ""),
+                relevance_score=result.score,
+                metadata=result.metadata
+            )
+            for result, default_type in ranked
+        ]
 
-        logger.debug(f"Retrieved {len(contexts)} relevant contexts for query")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Retrieved {len(contexts)} relevant contexts for query")
         return contexts
     
     def _format_context(self, contexts: List[RAGContext]) -> str:
@@ -210,15 +297,17 @@ class RAGService:
         
         formatted = []
         for i, ctx in enumerate(contexts, 1):
-            formatted.append(f"""
-### Source {i}: {ctx.title}
-- Relevance Score: {ctx.relevance_score:.2%}
-- Type: {ctx.source_type}
-- ID: {ctx.source_id}
-
-Content:
-{ctx.content[:1000]}{'...' if len(ctx.content) > 1000 else ''}
-""")
+            content = ctx.content
+            truncated = len(content) > MAX_CONTEXT_CHARS
+            formatted.append(_CONTEXT_TEMPLATE(
+                index=i,
+                title=ctx.title,
+                score=ctx.relevance_score,
+                source_type=ctx.source_type,
+                source_id=ctx.source_id,
+                content=content[:MAX_CONTEXT_CHARS] if truncated else content,
+                ellipsis="..." if truncated else ""
+            ))
         
         return "\n".join(formatted)
     
@@ -228,11 +317,59 @@ Content:
             return ""
         
         sources = [
-            f"[{i}] {ctx.title} (relevance: {ctx.relevance_score:.0%})"
+            _SOURCE_TEMPLATE(index=i, title=ctx.title, score=ctx.relevance_score)
             for i, ctx in enumerate(contexts, 1)
         ]
         return "\n\n**Sources:**\n" + "\n".join(sources)
 
+    def _cached_llm_call(
+        self,
+        kind: str,
+        question: str,
+        formatted_context: str,
+        call: Callable[[], str]
+    ) -> str:
+        """
+        Return the LLM answer for a history-free question and context.
+        
+        The same question over the same retrieved context reuses the earlier
+        answer instead of another LLM round-trip. Only successful answers
+        are cached; GeminiError propagates from `call`.
+        
+        Args:
+            kind: Which LLM call produced the answer ('query' or 'chat')
+            question: User question
+            formatted_context: Prompt context built from retrieval
+            call: Makes the LLM request on a miss
+            
+        Returns:
+            The LLM answer (without source citations)
+        """
+        if self.llm_cache_size <= 0:
+            return call()
+        
+        key = (
+            kind,
+            question,
+            hashlib.blake2b(formatted_context.encode("utf-8"), digest_size=16).hexdigest(),
+            getattr(self.gemini_service, "model", "")
+        )
+        with self._llm_cache_lock:
+            answer = self._llm_cache.get(key)
+            if answer is not None:
+                self._llm_cache.move_to_end(key)
+                return answer
+        
+        # The lock is not held during the LLM call
+        answer = call()
+        
+        with self._llm_cache_lock:
+            self._llm_cache[key] = answer
+            self._llm_cache.move_to_end(key)
+            if len(self._llm_cache) > self.llm_cache_size:
+                self._llm_cache.popitem(last=False)
+        return answer
+    
     def _fallback_answer(self, query: str, contexts: List[RAGContext]) -> str:
         """
         Generate a deterministic fallback response when the LLM is unavailable.
@@ -266,27 +403,46 @@ Content:
             RAGResponse with answer and sources
         """
         import time
-        start_time = time.time()
-        
-        # Step 1: Retrieve relevant context
-        contexts = self._retrieve_context(query)
+        start_ns = time.perf_counter_ns()
         
-        # Step 2: Format context for LLM
-        formatted_context = self._format_context(contexts)
+        # Answers to paraphrased questions can be reused as-is
+        query_embedding = None
+        cached = None
+        cache_namespace = f"query:{include_sources}"
+        if self.response_cache is not None:
+            query_embedding = self.embedding_service.generate_embedding(query)
+            cached = self.response_cache.get(query_embedding, namespace=cache_namespace)
         
-        # Step 3: Generate answer
-        try:
-            answer = self.gemini_service.generate(query, context=formatted_context)
+        if cached is not None:
+            answer, contexts = cached
+        else:
+            # Step 1: Retrieve relevant context
+            contexts = self._retrieve_context(query, query_embedding)
+            
+            # Step 2: Format context for LLM
+            formatted_context = self._format_context(contexts)
             
-            # Add source citations if requested
-            if include_sources and contexts:
-                answer += self._format_sources_for_response(contexts)
+            # Step 3: Generate answer
+            try:
+                answer = self._cached_llm_call(
+                    "query", query, formatted_context,
+                    lambda: self.gemini_service.generate(query, context=formatted_context)
+                )
+                
+                # Add source citations if requested
+                if include_sources and contexts:
+                    answer += self._format_sources_for_response(contexts)
                 
-        except GeminiError as e:
-            logger.error(f"LLM generation failed: {e}")
-            answer = self._fallback_answer(query, contexts)
+                if self.response_cache is not None:
+                    self.response_cache.put(
+                        query_embedding, (answer, contexts), namespace=cache_namespace
+                    )
+                    
+            except GeminiError as e:
+                logger.error(f"LLM generation failed: {e}")
+                answer = self._fallback_answer(query, contexts)
         
-        processing_time = (time.time() - start_time) * 1000
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e6
         
         return RAGResponse(
             answer=answer,
@@ -313,44 +469,65 @@ Content:
             RAGResponse with answer and conversation ID
         """
         import time
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         # Get or create conversation
-        if conversation_id and conversation_id in self.conversations:
-            conversation = self.conversations[conversation_id]
-        else:
-            conversation = Conversation()
-            self.conversations[conversation.id] = conversation
+        conversation = self._get_or_create_conversation(conversation_id)
+        
+        # Only the first turn has no history, so only it is safe to cache
+        use_cache = self.response_cache is not None and not conversation.turns
         
         # Add user message
         conversation.add_turn("user", message)
         
-        # Retrieve context based on current message
-        contexts = self._retrieve_context(message)
-        formatted_context = self._format_context(contexts)
-        
-        # Get conversation history
-        history = conversation.get_history(max_turns=10)
+        query_embedding = None
+        cached = None
+        cache_namespace = f"chat:{include_sources}"
+        if use_cache:
+            query_embedding = self.embedding_service.generate_embedding(message)
+            cached = self.response_cache.get(query_embedding, namespace=cache_namespace)
         
-        # Generate response with history and context
-        try:
-            answer = self.gemini_service.chat(
-                messages=history,
-                context=formatted_context
-            )
+        if cached is not None:
+            answer, contexts = cached
+        else:
+            # Retrieve context based on current message
+            contexts = self._retrieve_context(message, query_embedding)
+            formatted_context = self._format_context(contexts)
             
-            # Add source citations if requested
-            if include_sources and contexts:
-                answer += self._format_sources_for_response(contexts)
+            # Get conversation history
+            history = conversation.get_history(max_turns=10)
+            
+            # Generate response with history and context
+            try:
+                if len(history) == 1:
+                    # First turn: the answer depends only on message and context
+                    answer = self._cached_llm_call(
+                        "chat", message, formatted_context,
+                        lambda: self.gemini_service.chat(messages=history, context=formatted_context)
+                    )
+                else:
+                    answer = self.gemini_service.chat(
+                        messages=history,
+                        context=formatted_context
+                    )
+                
+                # Add source citations if requested
+                if include_sources and contexts:
+                    answer += self._format_sources_for_response(contexts)
                 
-        except GeminiError as e:
-            logger.error(f"LLM chat failed: {e}")
-            answer = self._fallback_answer(message, contexts)
+                if use_cache:
+                    self.response_cache.put(
+                        query_embedding, (answer, contexts), namespace=cache_namespace
+                    )
+                    
+            except GeminiError as e:
+                logger.error(f"LLM chat failed: {e}")
+                answer = self._fallback_answer(message, contexts)
         
         # Add assistant response to conversation
         conversation.add_turn("assistant", answer, contexts)
         
-        processing_time = (time.time() - start_time) * 1000
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e6
         
         return RAGResponse(
             answer=answer,
@@ -360,26 +537,52 @@ Content:
             conversation_id=conversation.id
         )
     
+    def _expire_conversations(self) -> None:
+        """Drop idle and excess conversations; caller holds the lock."""
+        cutoff = datetime.utcnow() - self.conversation_ttl
+        while self.conversations:
+            oldest = next(iter(self.conversations.values()))
+            if oldest.updated_at >= cutoff and len(self.conversations) <= self.max_conversations:
+                break
+            self.conversations.popitem(last=False)
+    
+    def _get_or_create_conversation(self, conversation_id: Optional[str]) -> Conversation:
+        """Return a live conversation by ID, or start a new one."""
+        with self._conversations_lock:
+            self._expire_conversations()
+            conversation = self.conversations.get(conversation_id) if conversation_id else None
+            if conversation is None:
+                conversation = Conversation()
+                self.conversations[conversation.id] = conversation
+                self._expire_conversations()
+            else:
+                self.conversations.move_to_end(conversation_id)
+            return conversation
+    
     def get_conversation(self, conversation_id: str) -> Optional[Conversation]:
         """Get a conversation by ID."""
-        return self.conversations.get(conversation_id)
+        with self._conversations_lock:
+            self._expire_conversations()
+            return self.conversations.get(conversation_id)
     
     def clear_conversation(self, conversation_id: str) -> bool:
         """Clear a conversation's history."""
-        if conversation_id in self.conversations:
-            self.conversations[conversation_id].clear()
+        conversation = self.get_conversation(conversation_id)
+        if conversation is not None:
+            conversation.clear()
             return True
         return False
     
     def delete_conversation(self, conversation_id: str) -> bool:
         """Delete a conversation."""
-        if conversation_id in self.conversations:
-            del self.conversations[conversation_id]
-            return True
-        return False
+        with self._conversations_lock:
+            return self.conversations.pop(conversation_id, None) is not None
     
     def list_conversations(self) -> List[Dict]:
         """List all active conversations."""
+        with self._conversations_lock:
+            self._expire_conversations()
+            conversations = list(self.conversations.values())
         return [
             {
                 "id": conv.id,
@@ -387,5 +590,5 @@ Content:
                 "created_at": conv.created_at.isoformat(),
                 "updated_at": conv.updated_at.isoformat()
             }
-            for conv in self.conversations.values()
+            for conv in conversations
         ]
@@ -13,7 +13,7 @@ from uuid import UUID, uuid4
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class DataFile:
     """
     DataFile entity representing a single data file within a dataset.
@@ -69,7 +69,7 @@ class DataFile:
         return self.filename
 
 
-@dataclass
+@dataclass(slots=True)
 class SupportingDocument:
     """
     SupportingDocument entity representing supplementary documentation for a dataset.
@@ -13,7 +13,7 @@ from uuid import UUID, uuid4
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Dataset:
     """
     Dataset entity representing a discoverable dataset in the system.
@@ -10,6 +10,7 @@ Author: University of Manchester RSE Team
 """
 
 from dataclasses import dataclass, field
+from functools import cached_property
 from typing import List, Optional, Tuple
 from datetime import datetime
 
@@ -73,9 +74,16 @@ class BoundingBox:
                 f"North latitude ({self.north_latitude})"
             )
 
-    def get_center(self) -> Tuple[float, float]:
+    def __setattr__(self, name, value):
+        """Drop cached derived values whenever a coordinate changes."""
+        super().__setattr__(name, value)
+        self.__dict__.pop('center', None)
+        self.__dict__.pop('area', None)
+
+    @cached_property
+    def center(self) -> Tuple[float, float]:
         """
-        Calculate the center point of the bounding box.
+        Center point of the bounding box, computed once per instance.
 
         Returns:
             Tuple of (longitude, latitude) representing the center point
@@ -84,9 +92,10 @@ class BoundingBox:
         center_lat = (self.south_latitude + self.north_latitude) / 2
         return (center_lon, center_lat)
 
-    def get_area(self) -> float:
+    @cached_property
+    def area(self) -> float:
         """
-        Calculate the approximate area covered by the bounding box in square degrees.
+        Approximate area covered by the bounding box in square degrees.
 
         Returns:
             Area in square degrees (rough approximation)
@@ -95,6 +104,14 @@ class BoundingBox:
         height = self.north_latitude - self.south_latitude
         return width * height
 
+    def get_center(self) -> Tuple[float, float]:
+        """Return the cached center point as (longitude, latitude)."""
+        return self.center
+
+    def get_area(self) -> float:
+        """Return the cached area in square degrees."""
+        return self.area
+
     def __repr__(self) -> str:
         """Return a detailed string representation."""
         return (
@@ -207,6 +224,11 @@ class Metadata:
         return (self.temporal_extent_start is not None and
                 self.temporal_extent_end is not None)
 
+    def __setattr__(self, name, value):
+        """Drop the cached summary whenever a field is reassigned."""
+        super().__setattr__(name, value)
+        self.__dict__.pop('summary', None)
+
     def add_keywords(self, *keywords: str) -> None:
         """
         Add keywords to the metadata.
@@ -217,10 +239,13 @@ class Metadata:
         for keyword in keywords:
             if keyword and keyword.strip() and keyword not in self.keywords:
                 self.keywords.append(keyword.strip())
+        # keywords is mutated in place, so __setattr__ does not see it
+        self.__dict__.pop('summary', None)
 
-    def get_summary(self) -> str:
+    @cached_property
+    def summary(self) -> str:
         """
-        Get a human-readable summary of the metadata.
+        Human-readable summary of the metadata, built once per instance.
 
         Returns:
             Multi-line string summary of key metadata fields
@@ -233,7 +258,7 @@ class Metadata:
         ]
 
         if self.bounding_box:
-            center = self.bounding_box.get_center()
+            center = self.bounding_box.center
             summary_lines.append(f"Center: {center[1]:.2f}°N, {center[0]:.2f}°E")
 
         if self.has_temporal_extent():
@@ -243,6 +268,10 @@ class Metadata:
 
         return "\n".join(summary_lines)
 
+    def get_summary(self) -> str:
+        """Return the cached human-readable summary of the metadata."""
+        return self.summary
+
     def __repr__(self) -> str:
         """Return a detailed string representation."""
         return (
@@ -10,7 +10,7 @@ Author: University of Manchester RSE Team
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 from dataclasses import dataclass
 
 
@@ -132,6 +132,91 @@ class IVectorRepository(ABC):
         """
         pass
 
+    def search_batch(
+        self,
+        query_vector: List[float],
+        limit: int = 10,
+        fields: Sequence[str] = ()
+    ) -> Dict[str, List[Any]]:
+        """
+        Column-oriented variant of search().
+
+        Returns parallel lists instead of one object per hit, so callers that
+        build many response rows avoid per-result dict lookups. Implementations
+        may override this to skip building VectorSearchResult objects.
+
+        Args:
+            query_vector: Query embedding vector
+            limit: Maximum number of results to return
+            fields: Metadata keys to return as columns (None where missing)
+
+        Returns:
+            Dict with 'ids' and 'scores' lists plus one list per field
+
+        Example:
+            >>> cols = repo.search_batch(query, limit=5, fields=["title"])
+            >>> for id, title in zip(cols["ids"], cols["title"]):
+            ...     print(id, title)
+        """
+        results = self.search(query_vector, limit=limit)
+        columns: Dict[str, List[Any]] = {
+            'ids': [r.id for r in results],
+            'scores': [r.score for r in results],
+        }
+        for field_name in fields:
+            columns[field_name] = [r.metadata.get(field_name) for r in results]
+        return columns
+
+    def search_many(
+        self,
+        query_vectors: Sequence[List[float]],
+        limit: int = 10,
+        fields: Sequence[str] = ()
+    ) -> List[Dict[str, List[Any]]]:
+        """
+        Run search_batch() for several queries at once.
+
+        Implementations backed by a store with native multi-query support
+        should override this to issue a single round-trip.
+
+        Args:
+            query_vectors: Query embedding vectors (list or 2-D array)
+            limit: Maximum number of results per query
+            fields: Metadata keys to return as columns (None where missing)
+
+        Returns:
+            One search_batch()-style column dict per query, in input order
+        """
+        return [
+            self.search_batch(query_vector, limit=limit, fields=fields)
+            for query_vector in query_vectors
+        ]
+
+    def get_vectors(self, ids: Sequence[str]) -> List[List[float]]:
+        """
+        Retrieve the stored vectors for several IDs.
+
+        Implementations should override this to fetch all rows in one
+        round-trip.
+
+        Args:
+            ids: Identifiers to fetch
+
+        Returns:
+            One vector per ID, in input order (implementations may return
+            a (len(ids), D) array)
+
+        Raises:
+            VectorNotFoundError: If any ID is not stored
+        """
+        rows = []
+        for id in ids:
+            result = self.get_by_id(id)
+            if result is None or result['vector'] is None:
+                raise VectorNotFoundError(f"Vector not found: {id}")
+            rows.append(result['vector'])
+        return rows
+
     @abstractmethod
     def get_by_id(self, id: str) -> Optional[Dict[str, Any]]:
         """
@@ -14,8 +14,9 @@ import json
 import logging
 import os
 import re
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import sys
 
 # Add the parent directory to the path to allow imports
@@ -39,6 +40,9 @@ class JSONExtractor(IMetadataExtractor):
     ...
     """
 
+    # Parsed documents kept so extract() and extract_resources() parse once
+    PARSED_CACHE_SIZE = 32
+
     def __init__(self, strict_mode: bool = False):
         """
         Initialize the JSON extractor.
@@ -48,6 +52,37 @@ class JSONExtractor(IMetadataExtractor):
                         If False, use defaults for missing optional fields.
         """
         self.strict_mode = strict_mode
+        self._parsed: "OrderedDict[Tuple[str, int], Dict[str, Any]]" = OrderedDict()
+
+    def _load(self, source_path: str) -> Dict[str, Any]:
+        """
+        Parse a JSON file, reusing the result of an earlier parse.
+
+        Entries are keyed by path and modification time, so an edited file
+        is parsed again. Callers must not mutate the returned dict.
+
+        Args:
+            source_path: Path to the JSON metadata file
+
+        Returns:
+            Dict[str, Any]: Parsed JSON document
+
+        Raises:
+            json.JSONDecodeError: If the file is not valid JSON
+        """
+        key = (os.path.abspath(source_path), os.stat(source_path).st_mtime_ns)
+        data = self._parsed.get(key)
+        if data is not None:
+            self._parsed.move_to_end(key)
+            return data
+
+        with open(source_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        self._parsed[key] = data
+        if len(self._parsed) > self.PARSED_CACHE_SIZE:
+            self._parsed.popitem(last=False)
+        return data
 
     def extract_resources(self, source_path: str) -> List[Resource]:
         """
@@ -58,11 +93,10 @@ class JSONExtractor(IMetadataExtractor):
         resources: List[Resource] = []
         
         try:
-            with open(source_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = self._load(source_path)
             
-            # Check onlineResources (UKCEH specific)
-            online_resources = data.get('onlineResources', [])
+            # Check onlineResources (UKCEH specific); copied, the parse is cached
+            online_resources = list(data.get('onlineResources') or [])
             if not online_resources:
                 # Fallback: check 'distribution' or 'downloadUrl'
                 if 'downloadUrl' in data:
@@ -126,9 +160,8 @@ class JSONExtractor(IMetadataExtractor):
             raise UnsupportedFormatError(source_path, ["JSON"])
 
         try:
-            # Read and parse JSON file
-            with open(source_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # Read and parse JSON file (shared with extract_resources)
+            data = self._load(source_path)
 
             # Transform JSON data to Metadata entity
             metadata = self._transform_to_metadata(data)
@@ -10,18 +10,29 @@ Author: University of Manchester RSE Team
 import logging
 import os
 import re
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 from uuid import uuid4
 
 import requests
 from lxml import html
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
+# Zstandard compression of stored text documents (optional)
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
 
 class DocumentFetchError(Exception):
     """Raised when document fetch fails."""
@@ -74,17 +85,61 @@ class SupportingDocFetcher:
     # Supported file extensions for document processing
     SUPPORTED_EXTENSIONS = {'.pdf', '.doc', '.docx', '.txt', '.csv', '.xlsx'}
     
+    # Formats worth compressing at rest; PDF, DOCX and XLSX are already
+    # deflate-compressed internally and barely shrink
+    COMPRESSIBLE_EXTENSIONS = {'.txt', '.csv', '.html', '.htm', '.json', '.xml'}
+    ZSTD_LEVEL = 3
+    
     # CEH catalogue base URL
     CEH_BASE_URL = "https://catalogue.ceh.ac.uk"
     
     # CEH supporting documents ZIP URL pattern (PRIMARY SOURCE)
     CEH_SUPPORTING_DOCS_URL = "https://data-package.ceh.ac.uk/sd/{uuid}.zip"
     
+    # One HTTP session for all fetchers, so keep-alive connections (and
+    # their TLS handshakes) to the CEH hosts are reused across requests
+    _shared_session: Optional[requests.Session] = None
+    _shared_session_lock = threading.Lock()
+    
+    @classmethod
+    def _get_shared_session(cls) -> requests.Session:
+        """Create the shared session on first use."""
+        with cls._shared_session_lock:
+            if cls._shared_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=10,
+                    pool_maxsize=50,
+                    max_retries=Retry(
+                        total=3,
+                        backoff_factor=0.3,
+                        status_forcelist=(502, 503, 504),
+                        allowed_methods=frozenset({"GET", "HEAD"}),
+                        raise_on_status=False
+                    )
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({
+                    'User-Agent': 'DatasetSearchBot/1.0 (University of Manchester RSE)',
+                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                    'Accept-Encoding': 'gzip, deflate'
+                })
+                cls._shared_session = session
+            return cls._shared_session
+    
+    # Landing pages by URL with their validators, revalidated with
+    # If-None-Match / If-Modified-Since so an unchanged page costs a 304
+    PAGE_CACHE_SIZE = 256
+    _page_cache: "OrderedDict[str, Tuple[str, str, bytes]]" = OrderedDict()
+    _page_cache_lock = threading.Lock()
+    
     def __init__(
         self,
         download_dir: str = "supporting_docs",
         timeout: int = 60,
-        max_size_mb: int = 50
+        max_size_mb: int = 50,
+        compress: Optional[bool] = None
     ):
         """
         Initialize supporting document fetcher.
@@ -93,20 +148,23 @@ class SupportingDocFetcher:
             download_dir: Directory for downloaded documents
             timeout: Download timeout in seconds
             max_size_mb: Maximum document size to download (MB)
+            compress: Store text-like documents zstd-compressed (as .zst);
+                defaults to SUPPORTING_DOCS_COMPRESSION=zstd in the environment
         """
         self.download_dir = Path(download_dir)
         self.timeout = timeout
         self.max_size_bytes = max_size_mb * 1024 * 1024
+        if compress is None:
+            compress = os.environ.get("SUPPORTING_DOCS_COMPRESSION", "").lower() == "zstd"
+        if compress and not HAS_ZSTD:
+            logger.warning("zstandard not installed; storing supporting documents uncompressed")
+        self.compress = compress and HAS_ZSTD
         
         # Create download directory
         self.download_dir.mkdir(parents=True, exist_ok=True)
         
-        # Session for HTTP requests
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'DatasetSearchBot/1.0 (University of Manchester RSE)',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
-        })
+        # Shared session for HTTP requests (pooled, retried, gzip)
+        self.session = self._get_shared_session()
         
         logger.info(f"SupportingDocFetcher initialized: dir={self.download_dir}")
     
@@ -114,6 +172,66 @@ class SupportingDocFetcher:
         """Get the download path for a dataset's documents."""
         return self.download_dir / dataset_id
     
+    def _save(self, file_path: Path, chunks: Iterable[bytes]) -> Tuple[Path, int]:
+        """
+        Write a document to disk, zstd-compressing text-like formats if enabled.
+        
+        Returns:
+            Tuple of (path actually written, uncompressed size in bytes)
+        """
+        size = 0
+        if self.compress and file_path.suffix.lower() in self.COMPRESSIBLE_EXTENSIONS:
+            file_path = file_path.with_name(file_path.name + '.zst')
+            compressor = zstandard.ZstdCompressor(level=self.ZSTD_LEVEL)
+            with open(file_path, 'wb') as raw, compressor.stream_writer(raw) as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+        else:
+            with open(file_path, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+        return file_path, size
+    
+    def _get_page(self, url: str) -> bytes:
+        """
+        GET an HTML page, revalidating a cached copy when the server sent validators.
+        
+        Raises:
+            requests.exceptions.RequestException: On network or HTTP errors
+        """
+        with self._page_cache_lock:
+            cached = self._page_cache.get(url)
+        
+        headers = {}
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if cached and response.status_code == 304:
+            logger.debug(f"Page not modified: {url}")
+            with self._page_cache_lock:
+                self._page_cache.move_to_end(url)
+            return cached[2]
+        response.raise_for_status()
+        
+        etag = response.headers.get('etag', '')
+        last_modified = response.headers.get('last-modified', '')
+        with self._page_cache_lock:
+            if etag or last_modified:
+                self._page_cache[url] = (etag, last_modified, response.content)
+                self._page_cache.move_to_end(url)
+                while len(self._page_cache) > self.PAGE_CACHE_SIZE:
+                    self._page_cache.popitem(last=False)
+            else:
+                self._page_cache.pop(url, None)
+        return response.content
+    
     def _classify_document_type(self, title: str, filename: str) -> str:
         """Classify document type based on title/filename."""
         text = f"{title} {filename}".lower()
@@ -211,10 +329,10 @@ class SupportingDocFetcher:
                         file_path = dataset_dir / safe_filename
                     
                     # Extract file
-                    with zf.open(file_info) as src, open(file_path, 'wb') as dst:
-                        dst.write(src.read())
-                    
-                    file_size = file_path.stat().st_size
+                    with zf.open(file_info) as src:
+                        file_path, file_size = self._save(
+                            file_path, iter(lambda: src.read(1 << 20), b'')
+                        )
                     logger.debug(f"Extracted: {safe_filename} ({file_size / 1024:.1f}KB)")
                     
                     # Only include actual documents (not HTML/JSON metadata)
@@ -249,6 +367,39 @@ class SupportingDocFetcher:
             logger.warning(f"Failed to download supporting docs ZIP for {dataset_id}: {e}")
             return []
     
+    def get_content_version(self, dataset_id: str) -> Optional[str]:
+        """
+        Get a version tag for a dataset's supporting documents.
+        
+        HEADs the supporting docs ZIP and falls back to the landing page;
+        the ETag and Last-Modified headers of the first one that answers
+        form the version.
+        
+        Args:
+            dataset_id: Dataset UUID
+            
+        Returns:
+            Version string, or None if neither source exposes a validator
+        """
+        for url in (
+            self.CEH_SUPPORTING_DOCS_URL.format(uuid=dataset_id),
+            f"{self.CEH_BASE_URL}/documents/{dataset_id}"
+        ):
+            try:
+                response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+            except requests.exceptions.RequestException as e:
+                logger.debug(f"HEAD failed for {url}: {e}")
+                continue
+            if response.status_code != 200:
+                continue
+            
+            etag = response.headers.get('etag', '')
+            last_modified = response.headers.get('last-modified', '')
+            if etag or last_modified:
+                return f"{url}|{etag}|{last_modified}"
+        
+        return None
+    
     def discover_documents(self, dataset_id: str) -> List[SupportingDocumentInfo]:
         """
         Discover supporting documents from a dataset's landing page.
@@ -264,11 +415,8 @@ class SupportingDocFetcher:
         try:
             logger.info(f"Discovering supporting docs for: {dataset_id}")
             
-            response = self.session.get(landing_url, timeout=self.timeout)
-            response.raise_for_status()
-            
             # Parse HTML
-            tree = html.fromstring(response.content)
+            tree = html.fromstring(self._get_page(landing_url))
             
             # Find document links
             # CEH typically has supporting documents in specific sections
@@ -380,12 +528,9 @@ class SupportingDocFetcher:
                     filename = match.group(2)
             
             # Save file
-            file_path = dataset_dir / filename
-            with open(file_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            
-            file_size = file_path.stat().st_size
+            file_path, file_size = self._save(
+                dataset_dir / filename, response.iter_content(chunk_size=8192)
+            )
             
             logger.info(f"Downloaded: {filename} ({file_size / 1024:.1f}KB)")
             
@@ -455,8 +600,8 @@ class SupportingDocFetcher:
         return downloaded
     
     def close(self):
-        """Close HTTP session."""
-        self.session.close()
+        """Release the fetcher; the shared HTTP session stays open for reuse."""
+        pass
     
     def __enter__(self):
         return self
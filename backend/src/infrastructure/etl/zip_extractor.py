@@ -9,13 +9,17 @@ Author: University of Manchester RSE Team
 """
 
 import io
+import json
 import logging
 import os
+import shutil
+import tempfile
 import zipfile
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 import requests
@@ -54,6 +58,14 @@ class ZipArchiveInfo:
     downloaded_at: datetime
 
 
+@dataclass
+class ManifestSummary:
+    """Totals and a short file preview for an extracted dataset."""
+    total_files: int
+    total_size: int
+    preview: List[Dict[str, Any]]
+
+
 class ZipExtractor:
     """
     ZIP file extractor for dataset archives.
@@ -74,13 +86,23 @@ class ZipExtractor:
     # Default extraction directory
     DEFAULT_EXTRACT_DIR = "extracted_archives"
     
+    # Read/write chunk for downloads and member extraction (1 MB)
+    COPY_BUFFER_SIZE = 1 << 20
+    
+    # Archives up to this size stay in memory while extracting; larger ones spill to a temp file
+    SPOOL_MAX_BYTES = 16 * 1024 * 1024
+    
+    # Files listed in a manifest summary preview
+    SUMMARY_PREVIEW_SIZE = 20
+    
     def __init__(
         self,
         extract_dir: str = None,
         timeout: int = 300,
         max_size_mb: int = 500,
         overwrite: bool = False,
-        max_nested_depth: int = 3
+        max_nested_depth: int = 3,
+        workers: int = 4
     ):
         """
         Initialize ZIP extractor.
@@ -91,12 +113,14 @@ class ZipExtractor:
             max_size_mb: Maximum archive size to download (MB)
             overwrite: Whether to overwrite existing extractions
             max_nested_depth: Maximum depth for recursive nested ZIP extraction
+            workers: Threads decompressing archive members in parallel
         """
         self.extract_dir = Path(extract_dir or self.DEFAULT_EXTRACT_DIR)
         self.timeout = timeout
         self.max_size_bytes = max_size_mb * 1024 * 1024
         self.overwrite = overwrite
         self.max_nested_depth = max_nested_depth
+        self.workers = max(1, workers)
 
         # Create extraction directory
         self.extract_dir.mkdir(parents=True, exist_ok=True)
@@ -113,100 +137,193 @@ class ZipExtractor:
         """Get the extraction path for a dataset."""
         return self.extract_dir / dataset_id
     
+    def _get_summary_path(self, dataset_id: str) -> Path:
+        """Get the manifest summary path (beside, not inside, the extraction directory)."""
+        return self.extract_dir / f"{dataset_id}.manifest.summary.json"
+    
+    def _write_summary(self, dataset_id: str, extracted_files: List[ExtractedFile]) -> ManifestSummary:
+        """Compute a manifest summary in one pass and persist it."""
+        total_size = 0
+        preview = []
+        for f in extracted_files:
+            total_size += f.file_size
+            if len(preview) < self.SUMMARY_PREVIEW_SIZE:
+                preview.append({"filename": f.filename, "format": f.file_format, "size": f.file_size})
+        summary = ManifestSummary(
+            total_files=len(extracted_files),
+            total_size=total_size,
+            preview=preview
+        )
+        
+        summary_path = self._get_summary_path(dataset_id)
+        tmp_path = summary_path.with_name(summary_path.name + '.tmp')
+        try:
+            tmp_path.write_text(json.dumps(asdict(summary)))
+            os.replace(tmp_path, summary_path)
+        except OSError as e:
+            logger.warning(f"Could not write manifest summary for {dataset_id}: {e}")
+        return summary
+    
     def _check_file_exists(self, dataset_id: str) -> bool:
         """Check if dataset has already been extracted."""
         path = self._get_extraction_path(dataset_id)
         return path.exists() and any(path.iterdir())
     
-    def download_zip(self, url: str, dataset_id: str = None) -> Tuple[bytes, int]:
+    def _open_download(self, url: str) -> requests.Response:
         """
-        Download a ZIP file from URL.
+        Start a streaming download after checking size and authentication.
+
+        Raises:
+            ZipDownloadError: If the resource is too large, needs login or is not a ZIP
+        """
+        # First, check file size with HEAD request (allow redirects to check final destination)
+        head_response = self.session.head(url, timeout=30, allow_redirects=True)
+        
+        # Check if redirected to login/SSO page (authentication required)
+        final_url = head_response.url
+        if any(auth_indicator in final_url.lower() for auth_indicator in ['/sso/', '/login', '/signin', '/auth']):
+            raise ZipDownloadError(
+                f"Authentication required: The data provider requires login to access this resource. "
+                f"Please download manually from: {url}"
+            )
+        
+        content_length = int(head_response.headers.get('content-length', 0))
+        
+        if content_length > self.max_size_bytes:
+            raise ZipDownloadError(
+                f"File too large: {content_length / 1024 / 1024:.1f}MB "
+                f"(max: {self.max_size_bytes / 1024 / 1024:.1f}MB)"
+            )
+        
+        # Download the file (allow redirects)
+        response = self.session.get(url, timeout=self.timeout, stream=True, allow_redirects=True)
+        response.raise_for_status()
+        
+        # Check Content-Type to ensure it's actually a ZIP file
+        content_type = response.headers.get('content-type', '').lower()
+        
+        # If we got HTML, it's likely a login page or error page
+        if 'text/html' in content_type:
+            # Check response content for login indicators
+            content_preview = response.raw.read(1000, decode_content=True).decode('utf-8', errors='ignore').lower()
+            response.close()
+            if any(indicator in content_preview for indicator in ['login', 'sign in', 'sso', 'authenticate']):
+                raise ZipDownloadError(
+                    f"Authentication required: The data provider requires login to access this resource. "
+                    f"Please download manually from: {url}"
+                )
+            else:
+                raise ZipDownloadError(
+                    f"Invalid response: Expected ZIP file but received HTML. "
+                    f"The server may require authentication or the resource may not exist."
+                )
+        
+        return response
+    
+    def download_zip_to_file(self, url: str, target: BinaryIO) -> int:
+        """
+        Stream a ZIP file from URL into a writable file object.
+        
+        The body is copied in COPY_BUFFER_SIZE chunks, so memory use does not
+        grow with the archive size; the size limit is enforced as bytes arrive.
         
         Args:
             url: URL of the ZIP file
-            dataset_id: Optional dataset ID for logging
+            target: Binary file object to write to
             
         Returns:
-            Tuple of (file_content, file_size)
+            Number of bytes written
             
         Raises:
             ZipDownloadError: If download fails
         """
         try:
             logger.info(f"Downloading ZIP: {url}")
-            
-            # First, check file size with HEAD request (allow redirects to check final destination)
-            head_response = self.session.head(url, timeout=30, allow_redirects=True)
-            
-            # Check if redirected to login/SSO page (authentication required)
-            final_url = head_response.url
-            if any(auth_indicator in final_url.lower() for auth_indicator in ['/sso/', '/login', '/signin', '/auth']):
-                raise ZipDownloadError(
-                    f"Authentication required: The data provider requires login to access this resource. "
-                    f"Please download manually from: {url}"
-                )
-            
-            content_length = int(head_response.headers.get('content-length', 0))
-            
-            if content_length > self.max_size_bytes:
-                raise ZipDownloadError(
-                    f"File too large: {content_length / 1024 / 1024:.1f}MB "
-                    f"(max: {self.max_size_bytes / 1024 / 1024:.1f}MB)"
-                )
-            
-            # Download the file (allow redirects)
-            response = self.session.get(url, timeout=self.timeout, stream=True, allow_redirects=True)
-            response.raise_for_status()
-            
-            # Check Content-Type to ensure it's actually a ZIP file
+            response = self._open_download(url)
             content_type = response.headers.get('content-type', '').lower()
-            valid_zip_types = ['application/zip', 'application/x-zip-compressed', 'application/octet-stream']
             
-            # If we got HTML, it's likely a login page or error page
-            if 'text/html' in content_type:
-                # Check response content for login indicators
-                content_preview = response.content[:1000].decode('utf-8', errors='ignore').lower()
-                if any(indicator in content_preview for indicator in ['login', 'sign in', 'sso', 'authenticate']):
-                    raise ZipDownloadError(
-                        f"Authentication required: The data provider requires login to access this resource. "
-                        f"Please download manually from: {url}"
-                    )
-                else:
-                    raise ZipDownloadError(
-                        f"Invalid response: Expected ZIP file but received HTML. "
-                        f"The server may require authentication or the resource may not exist."
-                    )
-            
-            content = response.content
-            actual_size = len(content)
+            actual_size = 0
+            with response:
+                for chunk in response.iter_content(chunk_size=self.COPY_BUFFER_SIZE):
+                    if actual_size == 0:
+                        # Verify it's actually a ZIP file by checking magic bytes
+                        if len(chunk) < 4 or chunk[:4] not in [b'PK\x03\x04', b'PK\x05\x06', b'PK\x07\x08']:
+                            raise ZipDownloadError(
+                                f"Invalid file format: The downloaded content is not a valid ZIP file. "
+                                f"Content-Type: {content_type}"
+                            )
+                    actual_size += len(chunk)
+                    if actual_size > self.max_size_bytes:
+                        raise ZipDownloadError(
+                            f"File too large: exceeded {self.max_size_bytes / 1024 / 1024:.1f}MB while downloading"
+                        )
+                    target.write(chunk)
             
-            # Verify it's actually a ZIP file by checking magic bytes
-            if len(content) < 4 or content[:4] not in [b'PK\x03\x04', b'PK\x05\x06', b'PK\x07\x08']:
+            if actual_size == 0:
                 raise ZipDownloadError(
-                    f"Invalid file format: The downloaded content is not a valid ZIP file. "
-                    f"Content-Type: {content_type}, Size: {actual_size} bytes"
+                    f"Invalid file format: The downloaded content is empty. Content-Type: {content_type}"
                 )
             
             logger.info(f"Downloaded: {actual_size / 1024 / 1024:.2f}MB")
-            return content, actual_size
+            return actual_size
             
         except requests.exceptions.Timeout:
             raise ZipDownloadError(f"Download timed out after {self.timeout}s")
         except requests.exceptions.RequestException as e:
             raise ZipDownloadError(f"Download failed: {str(e)}")
     
-    def extract_from_bytes(
+    def download_zip(self, url: str, dataset_id: str = None) -> Tuple[bytes, int]:
+        """
+        Download a ZIP file from URL.
+        
+        Args:
+            url: URL of the ZIP file
+            dataset_id: Optional dataset ID for logging
+            
+        Returns:
+            Tuple of (file_content, file_size)
+            
+        Raises:
+            ZipDownloadError: If download fails
+        """
+        buffer = io.BytesIO()
+        size = self.download_zip_to_file(url, buffer)
+        return buffer.getvalue(), size
+    
+    def _extract_member(self, zf: zipfile.ZipFile, info: zipfile.ZipInfo, extraction_path: Path) -> ExtractedFile:
+        """Decompress one archive member straight to disk."""
+        output_path = extraction_path / info.filename
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with zf.open(info) as source, open(output_path, 'wb') as target:
+            shutil.copyfileobj(source, target, length=self.COPY_BUFFER_SIZE)
+        
+        logger.debug(f"Extracted: {info.filename} ({info.file_size} bytes)")
+        return ExtractedFile(
+            filename=info.filename,
+            file_path=str(output_path),
+            file_size=info.file_size,
+            file_format=Path(info.filename).suffix.lower().lstrip('.'),
+            extracted_at=datetime.utcnow()
+        )
+    
+    def extract_from_file(
         self,
-        content: bytes,
+        fileobj: BinaryIO,
         dataset_id: str,
         file_filter: Optional[callable] = None,
         current_depth: int = 0
     ) -> List[ExtractedFile]:
         """
-        Extract ZIP content from bytes with recursive nested ZIP support.
+        Extract a ZIP archive from a seekable file object, with nested ZIP support.
+
+        Members are streamed to disk in COPY_BUFFER_SIZE chunks and
+        decompressed by up to `workers` threads (zlib releases the GIL).
+        Nested ZIPs are re-opened from their extracted file, so no archive
+        is ever held in memory whole.
 
         Args:
-            content: ZIP file content as bytes
+            fileobj: Seekable binary file object holding the archive
             dataset_id: Dataset ID for directory naming
             file_filter: Optional function to filter files (returns True to include)
             current_depth: Current recursion depth (internal use)
@@ -224,66 +341,53 @@ class ZipExtractor:
             logger.info(f"Already extracted, skipping: {dataset_id}")
             return self._get_existing_files(extraction_path)
 
-        # Create extraction directory
+        # Create extraction directory; any saved summary is now stale
         extraction_path.mkdir(parents=True, exist_ok=True)
+        self._get_summary_path(dataset_id).unlink(missing_ok=True)
 
         try:
-            extracted_files = []
-
-            with zipfile.ZipFile(io.BytesIO(content)) as zf:
-                for info in zf.infolist():
-                    # Skip directories
-                    if info.is_dir():
-                        continue
-
-                    # Apply file filter if provided
-                    if file_filter and not file_filter(info.filename):
-                        continue
-
-                    # Extract file
-                    output_path = extraction_path / info.filename
-                    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-                    with zf.open(info) as source:
-                        file_content = source.read()
-                        with open(output_path, 'wb') as target:
-                            target.write(file_content)
-
-                    # Get file extension
-                    ext = Path(info.filename).suffix.lower().lstrip('.')
-
-                    extracted_files.append(ExtractedFile(
-                        filename=info.filename,
-                        file_path=str(output_path),
-                        file_size=info.file_size,
-                        file_format=ext,
-                        extracted_at=datetime.utcnow()
-                    ))
-
-                    logger.debug(f"Extracted: {info.filename} ({info.file_size} bytes)")
-
-                    # ENHANCEMENT: Recursively extract nested ZIP files
-                    if ext == 'zip' and current_depth < self.max_nested_depth:
-                        logger.info(f"Found nested ZIP at depth {current_depth}: {info.filename}")
-                        try:
-                            # Create nested dataset ID
-                            nested_id = f"{dataset_id}_nested_{Path(info.filename).stem}"
-
-                            # Recursively extract
-                            nested_files = self.extract_from_bytes(
-                                content=file_content,
+            with zipfile.ZipFile(fileobj) as zf:
+                members = [
+                    info for info in zf.infolist()
+                    # Skip directories; apply file filter if provided
+                    if not info.is_dir() and (not file_filter or file_filter(info.filename))
+                ]
+                
+                if self.workers > 1 and len(members) > 1:
+                    with ThreadPoolExecutor(max_workers=min(self.workers, len(members))) as pool:
+                        extracted_files = list(pool.map(
+                            lambda info: self._extract_member(zf, info, extraction_path),
+                            members
+                        ))
+                else:
+                    extracted_files = [
+                        self._extract_member(zf, info, extraction_path) for info in members
+                    ]
+
+            # ENHANCEMENT: Recursively extract nested ZIP files
+            if current_depth < self.max_nested_depth:
+                for extracted in [f for f in extracted_files if f.file_format == 'zip']:
+                    logger.info(f"Found nested ZIP at depth {current_depth}: {extracted.filename}")
+                    try:
+                        # Create nested dataset ID
+                        nested_id = f"{dataset_id}_nested_{Path(extracted.filename).stem}"
+
+                        # Recursively extract
+                        with open(extracted.file_path, 'rb') as nested_file:
+                            nested_files = self.extract_from_file(
+                                nested_file,
                                 dataset_id=nested_id,
                                 file_filter=file_filter,
                                 current_depth=current_depth + 1
                             )
 
-                            # Add nested files to result
-                            extracted_files.extend(nested_files)
-                            logger.info(f"Extracted {len(nested_files)} files from nested ZIP: {info.filename}")
+                        # Add nested files to result
+                        extracted_files.extend(nested_files)
+                        logger.info(f"Extracted {len(nested_files)} files from nested ZIP: {extracted.filename}")
 
-                        except Exception as e:
-                            logger.warning(f"Failed to extract nested ZIP {info.filename}: {str(e)}")
-                            # Continue with other files
+                    except Exception as e:
+                        logger.warning(f"Failed to extract nested ZIP {extracted.filename}: {str(e)}")
+                        # Continue with other files
 
             logger.info(f"Extracted {len(extracted_files)} files total to {extraction_path}")
             return extracted_files
@@ -293,6 +397,30 @@ class ZipExtractor:
         except Exception as e:
             raise ZipExtractionError(f"Extraction failed: {str(e)}")
     
+    def extract_from_bytes(
+        self,
+        content: bytes,
+        dataset_id: str,
+        file_filter: Optional[callable] = None,
+        current_depth: int = 0
+    ) -> List[ExtractedFile]:
+        """
+        Extract ZIP content from bytes with recursive nested ZIP support.
+
+        Args:
+            content: ZIP file content as bytes
+            dataset_id: Dataset ID for directory naming
+            file_filter: Optional function to filter files (returns True to include)
+            current_depth: Current recursion depth (internal use)
+
+        Returns:
+            List of ExtractedFile objects
+
+        Raises:
+            ZipExtractionError: If extraction fails
+        """
+        return self.extract_from_file(io.BytesIO(content), dataset_id, file_filter, current_depth)
+    
     def _get_existing_files(self, extraction_path: Path) -> List[ExtractedFile]:
         """Get list of already extracted files."""
         extracted_files = []
@@ -329,12 +457,30 @@ class ZipExtractor:
         """
         dataset_id = dataset_id or str(uuid4())
         
-        # Download
-        content, size = self.download_zip(url, dataset_id)
-        downloaded_at = datetime.utcnow()
+        # Already extracted: skip the download entirely
+        if not self.overwrite and self._check_file_exists(dataset_id):
+            logger.info(f"Already extracted, skipping download: {dataset_id}")
+            extracted_files = self._get_existing_files(self._get_extraction_path(dataset_id))
+            return ZipArchiveInfo(
+                source_url=url,
+                total_files=len(extracted_files),
+                total_size=sum(f.file_size for f in extracted_files),
+                extracted_files=extracted_files,
+                extraction_path=str(self._get_extraction_path(dataset_id)),
+                downloaded_at=datetime.utcnow()
+            )
         
-        # Extract
-        extracted_files = self.extract_from_bytes(content, dataset_id, file_filter)
+        # Stream the archive into a spooled buffer (spills to disk when large),
+        # then extract members straight from it
+        with tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_BYTES) as spool:
+            size = self.download_zip_to_file(url, spool)
+            downloaded_at = datetime.utcnow()
+            spool.seek(0)
+            
+            # Extract
+            extracted_files = self.extract_from_file(spool, dataset_id, file_filter)
+        
+        self._write_summary(dataset_id, extracted_files)
         
         return ZipArchiveInfo(
             source_url=url,
@@ -355,10 +501,11 @@ class ZipExtractor:
         Returns:
             List of filenames in the archive
         """
-        content, _ = self.download_zip(url)
-        
-        with zipfile.ZipFile(io.BytesIO(content)) as zf:
-            return [info.filename for info in zf.infolist() if not info.is_dir()]
+        with tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_BYTES) as spool:
+            self.download_zip_to_file(url, spool)
+            spool.seek(0)
+            with zipfile.ZipFile(spool) as zf:
+                return [info.filename for info in zf.infolist() if not info.is_dir()]
     
     def get_manifest(self, dataset_id: str) -> Optional[List[ExtractedFile]]:
         """
@@ -377,6 +524,32 @@ class ZipExtractor:
         
         return self._get_existing_files(extraction_path)
     
+    def get_manifest_summary(self, dataset_id: str) -> Optional[ManifestSummary]:
+        """
+        Get file count, total size and a short preview for an extracted dataset.
+        
+        Reads the summary saved at extraction time instead of walking every
+        extracted file; extractions without one are summarized once and saved.
+        
+        Args:
+            dataset_id: Dataset ID
+            
+        Returns:
+            ManifestSummary or None if not extracted
+        """
+        summary_path = self._get_summary_path(dataset_id)
+        try:
+            return ManifestSummary(**json.loads(summary_path.read_text()))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable manifest summary for {dataset_id}: {e}")
+        
+        manifest = self.get_manifest(dataset_id)
+        if manifest is None:
+            return None
+        return self._write_summary(dataset_id, manifest)
+    
     def close(self):
         """Close HTTP session."""
         self.session.close()
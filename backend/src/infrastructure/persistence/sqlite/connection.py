@@ -15,7 +15,7 @@ from contextlib import contextmanager
 
 from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool, StaticPool
 
 from .models import Base, create_tables
 
@@ -28,7 +28,8 @@ class DatabaseConnection:
     Database connection manager for SQLite.
 
     This class manages the SQLAlchemy engine and session factory,
-    providing connection pooling and session lifecycle management.
+    providing connection pooling (WAL mode, pooled persistent connections)
+    and session lifecycle management.
 
     Design Pattern: Singleton (single engine per database path)
 
@@ -65,19 +66,31 @@ class DatabaseConnection:
 
         # Create SQLAlchemy engine
         # Use check_same_thread=False for SQLite to allow multi-threading
-        # Use StaticPool for better connection management
+        # File databases get a pool of persistent connections, so requests
+        # reuse an open file and parsed schema; WAL lets readers run
+        # alongside a writer. In-memory databases exist per connection and
+        # must keep a single StaticPool connection.
+        if db_path == ":memory:":
+            pool_args = {"poolclass": StaticPool}
+        else:
+            pool_args = {"poolclass": QueuePool, "pool_size": 10}
+
         self.engine = create_engine(
             f'sqlite:///{db_path}',
             echo=echo,
             connect_args={"check_same_thread": False},
-            poolclass=StaticPool,  # Use single connection pool for SQLite
+            **pool_args,
         )
 
-        # Enable foreign key support for SQLite
+        # Per-connection pragmas, applied once when the pool opens it
         @event.listens_for(self.engine, "connect")
         def set_sqlite_pragma(dbapi_conn, connection_record):
             cursor = dbapi_conn.cursor()
             cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("PRAGMA cache_size=-64000")  # 64 MB page cache
             cursor.close()
 
         # Create session factory
@@ -102,6 +115,7 @@ class DatabaseConnection:
         try:
             Base.metadata.create_all(bind=self.engine)
             self._ensure_metadata_columns()
+            self._ensure_indexes()
             logger.info("Database tables created successfully")
         except Exception as e:
             logger.error(f"Failed to create tables: {str(e)}")
@@ -124,6 +138,14 @@ class DatabaseConnection:
                     conn.execute(text(f"ALTER TABLE metadata ADD COLUMN {name} {ddl}"))
                     logger.info(f"Added missing column to metadata: {name}")
 
+    def _ensure_indexes(self):
+        """Create indexes declared after a table already existed."""
+        # create_all() only creates indexes together with a new table
+        with self.engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(bind=conn, checkfirst=True)
+
     def drop_tables(self):
         """
         Drop all tables from the database.
@@ -7,8 +7,11 @@ It handles all CRUD operations for datasets and metadata.
 Author: University of Manchester RSE Team
 """
 
+import json
 import logging
-from typing import Optional, List
+import threading
+from functools import wraps
+from typing import Any, Callable, ContextManager, Dict, Optional, List
 from datetime import datetime
 from uuid import UUID
 import sys
@@ -17,7 +20,8 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../../')))
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from domain.repositories.dataset_repository import (
@@ -42,6 +46,21 @@ from .models import (
 logger = logging.getLogger(__name__)
 
 
+def _scoped(method):
+    """Run a repository method inside its own session when factory-bound."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._session is not None or getattr(self._local, 'session', None) is not None:
+            return method(self, *args, **kwargs)
+        with self._session_factory() as session:
+            self._local.session = session
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self._local.session = None
+    return wrapper
+
+
 class SQLiteDatasetRepository(IDatasetRepository):
     """
     SQLite implementation of IDatasetRepository.
@@ -55,25 +74,50 @@ class SQLiteDatasetRepository(IDatasetRepository):
     - Maps between domain entities and ORM models
     - Handles transactions and error handling
 
+    The repository is either bound to one session (the caller manages the
+    transaction) or to a session factory such as DatabaseConnection.
+    session_scope, in which case each public method runs in its own
+    committed session. A factory-bound instance is thread-safe and can be
+    shared for the life of the process.
+
     Attributes:
         session: SQLAlchemy session for database operations
     """
 
-    def __init__(self, session: Session):
+    def __init__(
+        self,
+        session: Optional[Session] = None,
+        session_factory: Optional[Callable[[], ContextManager[Session]]] = None
+    ):
         """
-        Initialize the repository with a database session.
+        Initialize the repository with a database session or session factory.
 
         Args:
             session: SQLAlchemy session instance
+            session_factory: Callable returning a session context manager,
+                used to open one session per method call
 
         Example:
             >>> from infrastructure.persistence.sqlite.connection import get_session
             >>> session = get_session()
             >>> repo = SQLiteDatasetRepository(session)
+            >>> shared = SQLiteDatasetRepository(session_factory=db.session_scope)
         """
-        self.session = session
+        if session is None and session_factory is None:
+            raise ValueError("Either session or session_factory is required")
+        self._session = session
+        self._session_factory = session_factory
+        self._local = threading.local()
         logger.debug("SQLiteDatasetRepository initialized")
 
+    @property
+    def session(self) -> Session:
+        """Bound session, or the session opened for the current call."""
+        if self._session is not None:
+            return self._session
+        return self._local.session
+
+    @_scoped
     def save(
         self,
         dataset: Dataset,
@@ -228,6 +272,7 @@ class SQLiteDatasetRepository(IDatasetRepository):
             logger.error(f"Unexpected error saving dataset: {str(e)}")
             raise RepositoryError(f"Unexpected error: {str(e)}")
 
+    @_scoped
     def get_by_id(self, dataset_id: str) -> Optional[tuple[Dataset, Metadata]]:
         """
         Retrieve a dataset and its metadata by ID.
@@ -245,7 +290,16 @@ class SQLiteDatasetRepository(IDatasetRepository):
             ...     dataset, metadata = result
         """
         try:
-            dataset_model = self.session.query(DatasetModel).filter_by(id=dataset_id).first()
+            # Single row, so load metadata in the same SELECT via a JOIN
+            dataset_model = (
+                self.session.query(DatasetModel)
+                .options(
+                    joinedload(DatasetModel.dataset_metadata),
+                    selectinload(DatasetModel.metadata_relationships)
+                )
+                .filter_by(id=dataset_id)
+                .first()
+            )
 
             if not dataset_model or not dataset_model.dataset_metadata:
                 return None
@@ -263,6 +317,7 @@ class SQLiteDatasetRepository(IDatasetRepository):
             logger.error(f"Database error retrieving dataset {dataset_id}: {str(e)}")
             raise RepositoryError(f"Database error: {str(e)}")
 
+    @_scoped
     def exists(self, dataset_id: str) -> bool:
         """
         Check if a dataset exists in the database.
@@ -280,6 +335,7 @@ class SQLiteDatasetRepository(IDatasetRepository):
             logger.error(f"Database error checking existence of {dataset_id}: {str(e)}")
             raise RepositoryError(f"Database error: {str(e)}")
 
+    @_scoped
     def get_all(
         self,
         limit: Optional[int] = None,
@@ -296,7 +352,12 @@ class SQLiteDatasetRepository(IDatasetRepository):
             List of (Dataset, Metadata) tuples
         """
         try:
-            query = self.session.query(DatasetModel).order_by(DatasetModel.created_at.desc())
+            # Eager-load relationships in one extra SELECT each, not two per row
+            query = (
+                self.session.query(DatasetModel)
+                .options(*self._entity_load_options())
+                .order_by(DatasetModel.created_at.desc())
+            )
 
             if offset:
                 query = query.offset(offset)
@@ -322,6 +383,88 @@ class SQLiteDatasetRepository(IDatasetRepository):
             logger.error(f"Database error retrieving datasets: {str(e)}")
             raise RepositoryError(f"Database error: {str(e)}")
 
+    @_scoped
+    def get_all_rows(
+        self,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve datasets with metadata as plain dicts, for read-only listings.
+
+        Selects only the listed columns in one JOIN query, with no ORM objects
+        or domain entities. Each dict has the dataset fields plus a nested
+        'metadata' dict, ready for bulk validation into API schemas.
+
+        Args:
+            limit: Maximum number of datasets to return
+            offset: Number of datasets to skip
+
+        Returns:
+            List of dataset dicts, newest first
+        """
+        try:
+            stmt = (
+                select(
+                    DatasetModel.id,
+                    DatasetModel.title,
+                    DatasetModel.abstract,
+                    DatasetModel.metadata_url,
+                    DatasetModel.created_at,
+                    DatasetModel.last_updated,
+                    MetadataModel.title.label('m_title'),
+                    MetadataModel.abstract.label('m_abstract'),
+                    MetadataModel.keywords_json,
+                    MetadataModel.bounding_box_json,
+                    MetadataModel.contact_organization,
+                    MetadataModel.contact_email,
+                    MetadataModel.dataset_language,
+                    MetadataModel.topic_category,
+                    MetadataModel.temporal_extent_start,
+                    MetadataModel.temporal_extent_end,
+                    MetadataModel.metadata_date,
+                )
+                .join(MetadataModel, MetadataModel.dataset_id == DatasetModel.id)
+                .order_by(DatasetModel.created_at.desc())
+            )
+            if offset:
+                stmt = stmt.offset(offset)
+            if limit:
+                stmt = stmt.limit(limit)
+
+            rows = [
+                {
+                    'id': row['id'],
+                    'title': row['title'],
+                    'abstract': row['abstract'],
+                    'metadata_url': row['metadata_url'],
+                    'created_at': row['created_at'],
+                    'last_updated': row['last_updated'],
+                    'metadata': {
+                        'title': row['m_title'],
+                        'abstract': row['m_abstract'],
+                        'keywords': self._parse_keywords_json(row['keywords_json']),
+                        'contact_organization': row['contact_organization'] or "",
+                        'contact_email': row['contact_email'] or "",
+                        'dataset_language': row['dataset_language'] or "eng",
+                        'topic_category': row['topic_category'] or "",
+                        'bounding_box': self._parse_bounding_box_json(row['bounding_box_json']),
+                        'temporal_extent_start': row['temporal_extent_start'],
+                        'temporal_extent_end': row['temporal_extent_end'],
+                        'metadata_date': row['metadata_date'],
+                    },
+                }
+                for row in self.session.execute(stmt).mappings()
+            ]
+
+            logger.debug(f"Retrieved {len(rows)} dataset rows")
+            return rows
+
+        except SQLAlchemyError as e:
+            logger.error(f"Database error retrieving datasets: {str(e)}")
+            raise RepositoryError(f"Database error: {str(e)}")
+
+    @_scoped
     def search_by_title(self, title_query: str) -> List[tuple[Dataset, Metadata]]:
         """
         Search datasets by title (case-insensitive partial match).
@@ -333,7 +476,9 @@ class SQLiteDatasetRepository(IDatasetRepository):
             List of (Dataset, Metadata) tuples matching the query
         """
         try:
-            dataset_models = self.session.query(DatasetModel).filter(
+            dataset_models = self.session.query(DatasetModel).options(
+                *self._entity_load_options()
+            ).filter(
                 DatasetModel.title.ilike(f'%{title_query}%')
             ).all()
 
@@ -354,6 +499,7 @@ class SQLiteDatasetRepository(IDatasetRepository):
             logger.error(f"Database error searching datasets: {str(e)}")
             raise RepositoryError(f"Database error: {str(e)}")
 
+    @_scoped
     def delete(self, dataset_id: str) -> bool:
         """
         Delete a dataset and its metadata from the database.
@@ -381,6 +527,7 @@ class SQLiteDatasetRepository(IDatasetRepository):
             logger.error(f"Database error deleting dataset {dataset_id}: {str(e)}")
             raise RepositoryError(f"Database error: {str(e)}")
 
+    @_scoped
     def count(self) -> int:
         """
         Count total number of datasets in the database.
@@ -389,13 +536,24 @@ class SQLiteDatasetRepository(IDatasetRepository):
             int: Total count of datasets
         """
         try:
-            return self.session.query(DatasetModel).count()
+            # Plain COUNT(*) on the table; Query.count() wraps it in a subquery
+            return self.session.execute(
+                select(func.count()).select_from(DatasetModel)
+            ).scalar_one()
         except SQLAlchemyError as e:
             logger.error(f"Database error counting datasets: {str(e)}")
             raise RepositoryError(f"Database error: {str(e)}")
 
     # Private helper methods for entity/model conversion
 
+    @staticmethod
+    def _entity_load_options():
+        """Loader options for queries whose rows become (Dataset, Metadata) pairs."""
+        return (
+            selectinload(DatasetModel.dataset_metadata),
+            selectinload(DatasetModel.metadata_relationships)
+        )
+
     def _create_dataset_model(self, dataset: Dataset) -> DatasetModel:
         """Create a DatasetModel from a Dataset entity."""
         return DatasetModel(
@@ -526,6 +684,40 @@ class SQLiteDatasetRepository(IDatasetRepository):
 
             logger.debug(f"Updated raw document ({len(raw_document)} chars, format={document_format})")
 
+    @staticmethod
+    def _parse_keywords_json(keywords_json: Optional[str]) -> List[str]:
+        """Decode a keywords_json column value (see MetadataModel.get_keywords)."""
+        if not keywords_json:
+            return []
+        try:
+            return json.loads(keywords_json)
+        except json.JSONDecodeError:
+            return []
+
+    @staticmethod
+    def _parse_bounding_box_json(bbox_json: Optional[str]) -> Optional[Dict[str, float]]:
+        """Decode a bounding_box_json value into BoundingBox field names."""
+        if not bbox_json:
+            return None
+        try:
+            bbox_dict = json.loads(bbox_json)
+            # Reuse the entity's validation so invalid boxes are dropped as in get_all()
+            bounding_box = BoundingBox(
+                west_longitude=bbox_dict['west'],
+                east_longitude=bbox_dict['east'],
+                south_latitude=bbox_dict['south'],
+                north_latitude=bbox_dict['north']
+            )
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Invalid bounding box data: {str(e)}")
+            return None
+        return {
+            'west_longitude': float(bounding_box.west_longitude),
+            'east_longitude': float(bounding_box.east_longitude),
+            'south_latitude': float(bounding_box.south_latitude),
+            'north_latitude': float(bounding_box.north_latitude)
+        }
+
     def _to_dataset_entity(self, model: DatasetModel) -> Dataset:
         """Convert a DatasetModel to a Dataset entity."""
         return Dataset(
@@ -590,4 +782,6 @@ class SQLiteDatasetRepository(IDatasetRepository):
 
     def __repr__(self):
         """Return string representation."""
-        return f"SQLiteDatasetRepository(session={self.session})"
+        if self._session is None:
+            return f"SQLiteDatasetRepository(session_factory={self._session_factory})"
+        return f"SQLiteDatasetRepository(session={self._session})"
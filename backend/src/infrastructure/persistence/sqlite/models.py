@@ -7,6 +7,7 @@ These models map domain entities to database tables.
 Tables:
     - datasets: Core dataset information
     - metadata: ISO 19115 metadata for each dataset
+    - processing_cache: Last supporting-document processing result per dataset
 
 Author: University of Manchester RSE Team
 """
@@ -149,6 +150,12 @@ class MetadataModel(Base):
     __table_args__ = (
         Index('idx_metadata_title', 'title'),
         Index('idx_metadata_dataset_id', 'dataset_id'),
+        # Partial indexes for the ETL scripts' driving queries; their WHERE
+        # clauses must match the scripts' verbatim for SQLite to use them
+        Index('idx_metadata_has_xml', 'id',
+              sqlite_where=raw_document_xml.isnot(None)),
+        Index('idx_metadata_zip_download', 'dataset_id', 'download_url', 'title',
+              sqlite_where=download_url.like('%.zip')),
     )
 
     def __repr__(self):
@@ -261,6 +268,7 @@ class DataFileModel(Base):
     file_size = Column(Integer, nullable=True, default=0)
     file_format = Column(String(50), nullable=True)
     checksum = Column(String(64), nullable=True)  # MD5/SHA256
+    checksum_algo = Column(String(20), nullable=True, default='sha256')  # sha256 or blake3
     description = Column(Text, nullable=True)
     
     # Timestamps
@@ -273,6 +281,9 @@ class DataFileModel(Base):
     __table_args__ = (
         Index('idx_data_file_dataset_id', 'dataset_id'),
         Index('idx_data_file_filename', 'filename'),
+        # Covering partial index for extract_supporting_docs.py's ZIP lookup
+        Index('idx_data_files_zip', 'file_format', 'id', 'dataset_id', 'filename', 'file_path',
+              sqlite_where=file_format == 'zip'),
     )
     
     def __repr__(self):
@@ -301,6 +312,10 @@ class SupportingDocumentModel(Base):
     filename = Column(String(500), nullable=False)
     file_path = Column(String(1000), nullable=True)
     file_size = Column(Integer, nullable=True, default=0)
+    file_type = Column(String(50), nullable=True)  # Extension, e.g. pdf
+    checksum = Column(String(64), nullable=True)
+    checksum_algo = Column(String(20), nullable=True, default='sha256')  # sha256 or blake3
+    extracted_from_zip = Column(String(36), nullable=True)  # data_files.id of the source ZIP
     
     # RAG support
     content_text = Column(Text, nullable=True)  # Extracted text content
@@ -322,6 +337,25 @@ class SupportingDocumentModel(Base):
         return f"<SupportingDocumentModel(id='{self.id}', title='{self.title or self.filename}')>"
 
 
+class ProcessingCacheModel(Base):
+    """
+    SQLAlchemy model for cached document processing results.
+    
+    One row per dataset: the result of the last /process run and the
+    remote content version (ETag / Last-Modified) it was computed from.
+    """
+    
+    __tablename__ = 'processing_cache'
+    
+    dataset_id = Column(String(36), primary_key=True)
+    content_version = Column(String(500), nullable=False)
+    response_json = Column(Text, nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<ProcessingCacheModel(dataset_id='{self.dataset_id}', version='{self.content_version}')>"
+
+
 # Database initialization helper
 def create_tables(engine):
     """
@@ -0,0 +1,82 @@
+"""
+Infrastructure: Processing Result Cache
+
+This module persists the result of supporting-document processing per
+dataset, keyed by the remote content version (ETag / Last-Modified) it was
+computed from. Re-processing an unchanged dataset then becomes a single
+primary-key read instead of downloads, PDF parsing and model inference, and
+the cache survives restarts.
+
+Author: University of Manchester RSE Team
+"""
+
+import json
+import logging
+from contextlib import AbstractContextManager
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from .models import ProcessingCacheModel
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessingResultCache:
+    """
+    SQLite-backed cache of processing results keyed by dataset and version.
+
+    Attributes:
+        session_factory: Callable returning a transactional session scope
+    """
+
+    def __init__(self, session_factory: Callable[[], AbstractContextManager[Session]]):
+        """
+        Initialize the cache.
+
+        Args:
+            session_factory: e.g. DatabaseConnection.session_scope
+        """
+        self.session_factory = session_factory
+
+    def get(self, dataset_id: str, content_version: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached result if it was computed from this content version.
+
+        Args:
+            dataset_id: Dataset UUID
+            content_version: Current remote content version
+
+        Returns:
+            Cached result dict, or None on a miss or version change
+        """
+        try:
+            with self.session_factory() as session:
+                row = session.get(ProcessingCacheModel, dataset_id)
+                if row is None or row.content_version != content_version:
+                    return None
+                return json.loads(row.response_json)
+        except Exception as e:
+            logger.warning(f"Processing cache read failed for {dataset_id}: {e}")
+            return None
+
+    def put(self, dataset_id: str, content_version: str, result: Dict[str, Any]) -> None:
+        """
+        Store (or replace) the result for a dataset.
+
+        Args:
+            dataset_id: Dataset UUID
+            content_version: Remote content version the result was computed from
+            result: JSON-serializable result
+        """
+        try:
+            with self.session_factory() as session:
+                session.merge(ProcessingCacheModel(
+                    dataset_id=dataset_id,
+                    content_version=content_version,
+                    response_json=json.dumps(result),
+                    updated_at=datetime.utcnow()
+                ))
+        except Exception as e:
+            logger.warning(f"Processing cache write failed for {dataset_id}: {e}")
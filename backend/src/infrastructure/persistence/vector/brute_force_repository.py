@@ -0,0 +1,405 @@
+"""
+Infrastructure: In-Memory Brute-Force Vector Repository
+
+This module implements IVectorRepository as an exact, in-memory scan over
+another repository's vectors. At the catalogue's scale (thousands to low
+millions of embeddings) one BLAS matrix product over a contiguous float32
+matrix is fast, has no index build cost and always returns the true top-k.
+
+Author: University of Manchester RSE Team
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+import sys
+
+import numpy as np
+
+# Numba fuses int8 widening into the similarity scan (optional)
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from domain.repositories.vector_repository import (
+    IVectorRepository,
+    VectorSearchResult,
+    VectorRepositoryError
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+# Search profiles selectable through the ANN_PROFILE environment variable:
+# exact in-memory scan (optionally int8), or the persistent HNSW index at a
+# given ef_search
+ANN_PROFILES = {
+    "fast": {"in_memory": True},
+    "fast-int8": {"in_memory": True, "quantize": True},
+    "balanced": {"ef_search": 128},
+    "recall-max": {"ef_search": 512},
+}
+DEFAULT_ANN_PROFILE = "balanced"
+
+# Rows dequantized per matrix product; keeps the float32 block in cache
+QUANTIZED_BLOCK_ROWS = 4096
+
+# int8 candidates per requested result that are rescored in float32
+DEFAULT_RERANK_FACTOR = 4
+
+
+def quantize_int8(vectors: np.ndarray):
+    """
+    Symmetric int8 quantization with one scale per vector.
+
+    Args:
+        vectors: (D,) or (N, D) float array
+
+    Returns:
+        Tuple of (int8 codes with the same shape, float32 scales) such that
+        vectors ~= codes * scales[..., None]
+
+    Example:
+        >>> codes, scales = quantize_int8(np.array([[0.5, -1.0]]))
+        >>> codes
+        array([[  64, -127]], dtype=int8)
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=-1) / 127.0
+    scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+    codes = np.rint(vectors / scales[..., np.newaxis]).astype(np.int8)
+    return codes, scales
+
+
+if HAS_NUMBA:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _int8_similarities(queries, codes, scales):
+        """Dot each query with each int8 row, scaling per row; parallel over rows."""
+        n, d = codes.shape
+        out = np.empty((queries.shape[0], n), dtype=np.float32)
+        for i in numba.prange(n):
+            for b in range(queries.shape[0]):
+                acc = np.float32(0.0)
+                for j in range(d):
+                    acc += queries[b, j] * codes[i, j]
+                out[b, i] = acc * scales[i]
+        return out
+
+
+class BruteForceVectorRepository(IVectorRepository):
+    """
+    Exact cosine search over an in-memory copy of another repository.
+
+    The wrapped repository stays the source of truth: writes go to it and
+    mark the in-memory matrix stale, and the next search reloads it. Vectors
+    are held L2-normalized in one C-contiguous (N, D) float32 array, so a
+    search is a single SGEMM/SGEMV followed by a top-k partition.
+
+    With quantize=True the copy is stored as int8 codes plus one float32
+    scale per vector (4x less memory and memory traffic). Queries stay
+    float32; codes are widened a block at a time, so the scan reads int8
+    from RAM while the float32 block stays in cache. When numba is
+    installed, a JIT-compiled parallel loop does the widening inside the
+    dot product instead (first call compiles, cached on disk). The int8
+    scan only shortlists rerank_factor * limit candidates; their float32
+    vectors are fetched from the wrapped repository in one call and
+    rescored exactly, so returned scores and order match the unquantized
+    search whenever the true top-k is in the shortlist.
+
+    Design Pattern: Decorator Pattern
+    - Same interface as the wrapped repository
+    - Replaces only the search path
+
+    Attributes:
+        inner: Persistent repository providing get_all() and writes
+        quantize: Whether the in-memory copy is int8-quantized
+        rerank_factor: Shortlist size multiplier for float32 reranking
+    """
+
+    def __init__(
+        self,
+        inner: IVectorRepository,
+        quantize: bool = False,
+        rerank_factor: int = DEFAULT_RERANK_FACTOR
+    ):
+        """
+        Initialize the repository; vectors load on the first search.
+
+        Args:
+            inner: Repository to read vectors from (must provide get_all())
+            quantize: Store the in-memory copy as int8 with per-vector scales
+            rerank_factor: Rescore this many int8 candidates per result in
+                float32 (1 disables reranking)
+
+        Example:
+            >>> repo = BruteForceVectorRepository(ChromaVectorRepository("chroma_db"))
+            >>> repo.search(query_embedding, limit=5)
+        """
+        self.inner = inner
+        self.quantize = quantize
+        self.rerank_factor = max(1, rerank_factor)
+        self._ids: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        """L2-normalize each row, leaving zero rows untouched."""
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _snapshot(self):
+        """Return (ids, metadatas, matrix, scales), loading them if stale."""
+        with self._lock:
+            if self._matrix is None:
+                data = self.inner.get_all()
+                matrix = np.asarray(data['vectors'], dtype=np.float32)
+                if matrix.ndim != 2:
+                    matrix = matrix.reshape(len(data['ids']), -1)
+                matrix = self._normalize_rows(matrix)
+                if self.quantize:
+                    matrix, self._scales = quantize_int8(matrix)
+                self._matrix = np.ascontiguousarray(matrix)
+                self._ids = data['ids']
+                self._metadatas = [metadata or {} for metadata in data['metadatas']]
+                logger.info(
+                    f"Loaded {len(self._ids)} vectors for brute-force search "
+                    f"({self._matrix.nbytes / 1e6:.1f} MB, {self._matrix.dtype})"
+                )
+            return self._ids, self._metadatas, self._matrix, self._scales
+
+    def _invalidate(self) -> None:
+        """Drop the in-memory copy after a write."""
+        with self._lock:
+            self._matrix = None
+
+    @staticmethod
+    def _similarities(queries: np.ndarray, matrix: np.ndarray, scales: Optional[np.ndarray]) -> np.ndarray:
+        """Cosine similarity of normalized queries against every stored row."""
+        if scales is None:
+            return queries @ matrix.T
+
+        if HAS_NUMBA:
+            return _int8_similarities(np.ascontiguousarray(queries), matrix, scales)
+
+        similarities = np.empty((len(queries), len(matrix)), dtype=np.float32)
+        for start in range(0, len(matrix), QUANTIZED_BLOCK_ROWS):
+            block = matrix[start:start + QUANTIZED_BLOCK_ROWS].astype(np.float32)
+            similarities[:, start:start + len(block)] = queries @ block.T
+        similarities *= scales
+        return similarities
+
+    def _top_k(self, similarities: np.ndarray, limit: int) -> List[np.ndarray]:
+        """Indices of the best `limit` columns per row, most similar first."""
+        n = similarities.shape[1]
+        k = min(limit, n)
+        if k == 0:
+            return [np.empty(0, dtype=np.intp) for _ in range(similarities.shape[0])]
+        if k < n:
+            candidates = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(n), similarities.shape)
+        rows = []
+        for row, cand in zip(similarities, candidates):
+            rows.append(cand[np.argsort(-row[cand], kind='stable')])
+        return rows
+
+    def _query(self, query_vectors, limit: int):
+        """Run the scan; returns (ids, metadatas, [(indices, scores)] per query)."""
+        ids, metadatas, matrix, scales = self._snapshot()
+        queries = np.atleast_2d(np.asarray(query_vectors, dtype=np.float32))
+        if matrix.size and queries.shape[1] != matrix.shape[1]:
+            raise VectorRepositoryError(
+                f"Query dimension {queries.shape[1]} does not match index dimension {matrix.shape[1]}"
+            )
+
+        queries = self._normalize_rows(queries)
+        if matrix.size:
+            similarities = self._similarities(queries, matrix, scales)
+        else:
+            similarities = np.empty((len(queries), 0), dtype=np.float32)
+
+        if scales is not None and self.rerank_factor > 1 and matrix.size:
+            return ids, metadatas, self._rerank(ids, queries, similarities, limit)
+
+        hits = []
+        for row, indices in zip(similarities, self._top_k(similarities, limit)):
+            # Same similarity mapping as ChromaVectorRepository: 1 - distance/2;
+            # int8 rounding can push a self-match slightly past 1
+            hits.append((indices, np.clip((1.0 + row[indices]) / 2.0, 0.0, 1.0)))
+        return ids, metadatas, hits
+
+    def _rerank(self, ids: List[str], queries: np.ndarray, similarities: np.ndarray, limit: int):
+        """Rescore each query's int8 shortlist against exact float32 vectors."""
+        shortlists = self._top_k(similarities, limit * self.rerank_factor)
+        candidates = np.unique(np.concatenate(shortlists))
+        try:
+            exact = np.asarray(
+                self.inner.get_vectors([ids[i] for i in candidates.tolist()]),
+                dtype=np.float32
+            )
+        except VectorRepositoryError as e:
+            # Snapshot is stale (e.g. vectors deleted elsewhere); keep int8 scores
+            logger.warning(f"Float32 rerank skipped: {e}")
+            exact = None
+
+        hits = []
+        for query, row, shortlist in zip(queries, similarities, shortlists):
+            if exact is None:
+                scores = row[shortlist]
+            else:
+                rows = np.searchsorted(candidates, shortlist)
+                scores = self._normalize_rows(exact[rows]) @ query
+            best = np.argsort(-scores, kind='stable')[:limit]
+            hits.append((shortlist[best], np.clip((1.0 + scores[best]) / 2.0, 0.0, 1.0)))
+        return hits
+
+    def search(self, query_vector: List[float], limit: int = 10) -> List[VectorSearchResult]:
+        """
+        Exact cosine search.
+
+        Args:
+            query_vector: Query embedding vector
+            limit: Maximum number of results to return
+
+        Returns:
+            List[VectorSearchResult]: Sorted by similarity (most similar first)
+        """
+        ids, metadatas, [(indices, scores)] = self._query(query_vector, limit)
+        return [
+            VectorSearchResult(
+                id=ids[i],
+                score=float(score),
+                metadata=metadatas[i],
+                distance=float(2.0 - 2.0 * score)
+            )
+            for i, score in zip(indices.tolist(), scores.tolist())
+        ]
+
+    def search_batch(
+        self,
+        query_vector: List[float],
+        limit: int = 10,
+        fields: Sequence[str] = ()
+    ) -> Dict[str, List[Any]]:
+        """Column-oriented exact search (see IVectorRepository)."""
+        return self.search_many([query_vector], limit=limit, fields=fields)[0]
+
+    def search_many(
+        self,
+        query_vectors: Sequence[List[float]],
+        limit: int = 10,
+        fields: Sequence[str] = ()
+    ) -> List[Dict[str, List[Any]]]:
+        """Exact search for a (B, D) query matrix in one matrix product."""
+        ids, metadatas, hits = self._query(query_vectors, limit)
+        batch = []
+        for indices, scores in hits:
+            indices = indices.tolist()
+            columns: Dict[str, List[Any]] = {
+                'ids': [ids[i] for i in indices],
+                'scores': scores.tolist(),
+            }
+            for field_name in fields:
+                columns[field_name] = [metadatas[i].get(field_name) for i in indices]
+            batch.append(columns)
+        return batch
+
+    def upsert_vector(self, id: str, vector: List[float], metadata: Dict[str, Any]) -> None:
+        """Write through to the wrapped repository."""
+        self.inner.upsert_vector(id, vector, metadata)
+        self._invalidate()
+
+    def upsert_vectors_batch(
+        self,
+        ids: List[str],
+        vectors: List[List[float]],
+        metadatas: List[Dict[str, Any]]
+    ) -> None:
+        """Write through to the wrapped repository."""
+        self.inner.upsert_vectors_batch(ids, vectors, metadatas)
+        self._invalidate()
+
+    def get_by_id(self, id: str) -> Optional[Dict[str, Any]]:
+        """Read from the wrapped repository."""
+        return self.inner.get_by_id(id)
+
+    def get_vectors(self, ids: Sequence[str]) -> np.ndarray:
+        """Read from the wrapped repository in one call."""
+        return self.inner.get_vectors(ids)
+
+    def get_all(self) -> Dict[str, List[Any]]:
+        """Read from the wrapped repository."""
+        return self.inner.get_all()
+
+    def delete(self, id: str) -> bool:
+        """Delete from the wrapped repository."""
+        deleted = self.inner.delete(id)
+        self._invalidate()
+        return deleted
+
+    def count(self) -> int:
+        """Count vectors in the wrapped repository."""
+        return self.inner.count()
+
+    def clear(self) -> None:
+        """Clear the wrapped repository."""
+        self.inner.clear()
+        self._invalidate()
+
+    def __repr__(self):
+        """Return string representation."""
+        return (
+            f"BruteForceVectorRepository(inner={self.inner!r}, quantize={self.quantize}, "
+            f"rerank_factor={self.rerank_factor})"
+        )
+
+
+def create_vector_repository(
+    persist_directory: str,
+    collection_name: Optional[str] = None,
+    profile: Optional[str] = None
+) -> IVectorRepository:
+    """
+    Build the dataset vector repository for a search profile.
+
+    Profiles: "fast" scans an in-memory float32 copy exactly, "fast-int8"
+    scans an int8-quantized copy and reranks its shortlist in float32,
+    "balanced" and "recall-max" use
+    ChromaDB's HNSW index with ef_search 128 and 512.
+
+    Args:
+        persist_directory: ChromaDB persistence directory
+        collection_name: Collection to open (ChromaDB default if None)
+        profile: Profile name; defaults to $ANN_PROFILE, then "balanced"
+
+    Returns:
+        IVectorRepository for the chosen profile
+    """
+    from infrastructure.persistence.vector.chroma_repository import ChromaVectorRepository
+
+    profile = (profile or os.environ.get("ANN_PROFILE") or DEFAULT_ANN_PROFILE).lower()
+    if profile not in ANN_PROFILES:
+        logger.warning(f"Unknown ANN_PROFILE '{profile}', using '{DEFAULT_ANN_PROFILE}'")
+        profile = DEFAULT_ANN_PROFILE
+
+    settings = ANN_PROFILES[profile]
+    kwargs = {"collection_name": collection_name} if collection_name else {}
+    chroma = ChromaVectorRepository(
+        persist_directory, ef_search=settings.get("ef_search"), **kwargs
+    )
+
+    logger.info(f"Vector search profile: {profile}")
+    if settings.get("in_memory"):
+        return BruteForceVectorRepository(chroma, quantize=settings.get("quantize", False))
+    return chroma
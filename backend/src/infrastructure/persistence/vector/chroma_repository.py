@@ -7,12 +7,22 @@ a local-first vector database optimized for embeddings.
 Author: University of Manchester RSE Team
 """
 
+import json
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 from pathlib import Path
 import sys
 import os
 
+import numpy as np
+
+# orjson is a faster drop-in for encoding list metadata (optional)
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
 
@@ -49,14 +59,20 @@ class ChromaVectorRepository(IVectorRepository):
         collection: ChromaDB collection for storing vectors
         collection_name: Name of the collection
         persist_directory: Path to persistence directory
+        ef_search: HNSW search breadth applied to the collection, if set
     """
 
     DEFAULT_COLLECTION_NAME = "dataset_embeddings"
 
+    # Vectors per ChromaDB upsert call in upsert_vectors_batch(); large
+    # enough to amortize HNSW insertion, small enough to bound memory
+    UPSERT_BATCH_SIZE = 1024
+
     def __init__(
         self,
         persist_directory: str = "chroma_db",
-        collection_name: str = DEFAULT_COLLECTION_NAME
+        collection_name: str = DEFAULT_COLLECTION_NAME,
+        ef_search: Optional[int] = None
     ):
         """
         Initialize ChromaDB vector repository.
@@ -64,6 +80,8 @@ class ChromaVectorRepository(IVectorRepository):
         Args:
             persist_directory: Directory for ChromaDB persistence
             collection_name: Name of the ChromaDB collection
+            ef_search: HNSW search breadth (higher = better recall, slower);
+                None keeps the collection's setting
 
         Example:
             >>> repo = ChromaVectorRepository("chroma_db")
@@ -72,6 +90,7 @@ class ChromaVectorRepository(IVectorRepository):
         """
         self.persist_directory = persist_directory
         self.collection_name = collection_name
+        self.ef_search = ef_search
 
         # Create persist directory if it doesn't exist
         Path(persist_directory).mkdir(parents=True, exist_ok=True)
@@ -94,6 +113,9 @@ class ChromaVectorRepository(IVectorRepository):
                 metadata={"hnsw:space": "cosine"}  # Cosine similarity
             )
 
+            if ef_search is not None:
+                self._set_ef_search(ef_search)
+
             logger.info(
                 f"ChromaDB initialized: collection='{collection_name}', "
                 f"vectors={self.count()}"
@@ -103,6 +125,14 @@ class ChromaVectorRepository(IVectorRepository):
             logger.error(f"Failed to initialize ChromaDB: {str(e)}")
             raise VectorRepositoryError(f"ChromaDB initialization failed: {str(e)}")
 
+    def _set_ef_search(self, ef_search: int) -> None:
+        """Apply the HNSW search breadth; ef_search is mutable after creation."""
+        try:
+            self.collection.modify(configuration={"hnsw": {"ef_search": ef_search}})
+            logger.info(f"HNSW ef_search set to {ef_search}")
+        except Exception as e:
+            logger.warning(f"Could not set HNSW ef_search={ef_search}: {str(e)}")
+
     def upsert_vector(
         self,
         id: str,
@@ -131,7 +161,7 @@ class ChromaVectorRepository(IVectorRepository):
             # Upsert to ChromaDB
             self.collection.upsert(
                 ids=[id],
-                embeddings=[vector],
+                embeddings=np.atleast_2d(np.asarray(vector, dtype=np.float32)),
                 metadatas=[sanitized_metadata]
             )
 
@@ -150,19 +180,22 @@ class ChromaVectorRepository(IVectorRepository):
         """
         Insert or update multiple vectors in a batch.
 
+        Large batches are written in UPSERT_BATCH_SIZE slices (capped by the
+        client's maximum batch size).
+
         Args:
             ids: List of unique identifiers
-            vectors: List of embedding vectors
+            vectors: List of embedding vectors, or an (N, D) numpy array
             metadatas: List of metadata dictionaries
 
         Raises:
             VectorRepositoryError: If batch upsert fails
         """
-        if not ids or not vectors or not metadatas:
+        if len(ids) == 0 or len(vectors) == 0 or len(metadatas) == 0:
             logger.warning("Empty batch provided for upsert")
             return
 
-        if len(ids) != len(vectors) != len(metadatas):
+        if not len(ids) == len(vectors) == len(metadatas):
             raise VectorRepositoryError(
                 f"Length mismatch: ids={len(ids)}, vectors={len(vectors)}, "
                 f"metadatas={len(metadatas)}"
@@ -175,12 +208,16 @@ class ChromaVectorRepository(IVectorRepository):
                 for metadata in metadatas
             ]
 
+            vectors = np.asarray(vectors, dtype=np.float32)
+            step = min(self.UPSERT_BATCH_SIZE, self.client.get_max_batch_size())
+
             # Batch upsert to ChromaDB
-            self.collection.upsert(
-                ids=ids,
-                embeddings=vectors,
-                metadatas=sanitized_metadatas
-            )
+            for start in range(0, len(ids), step):
+                self.collection.upsert(
+                    ids=ids[start:start + step],
+                    embeddings=vectors[start:start + step],
+                    metadatas=sanitized_metadatas[start:start + step]
+                )
 
             logger.info(f"Batch upserted {len(ids)} vectors")
 
@@ -206,7 +243,7 @@ class ChromaVectorRepository(IVectorRepository):
         try:
             # Query ChromaDB
             results = self.collection.query(
-                query_embeddings=[query_vector],
+                query_embeddings=np.atleast_2d(np.asarray(query_vector, dtype=np.float32)),
                 n_results=limit,
                 include=["metadatas", "distances"]
             )
@@ -241,6 +278,74 @@ class ChromaVectorRepository(IVectorRepository):
             logger.error(f"Search failed: {str(e)}")
             raise VectorRepositoryError(f"Search failed: {str(e)}")
 
+    def search_batch(
+        self,
+        query_vector: List[float],
+        limit: int = 10,
+        fields: Sequence[str] = ()
+    ) -> Dict[str, List[Any]]:
+        """
+        Search and return parallel result columns (see IVectorRepository).
+
+        Args:
+            query_vector: Query embedding vector
+            limit: Maximum number of results to return
+            fields: Metadata keys to return as columns (None where missing)
+
+        Returns:
+            Dict with 'ids' and 'scores' lists plus one list per field
+        """
+        return self.search_many([query_vector], limit=limit, fields=fields)[0]
+
+    def search_many(
+        self,
+        query_vectors: Sequence[List[float]],
+        limit: int = 10,
+        fields: Sequence[str] = ()
+    ) -> List[Dict[str, List[Any]]]:
+        """
+        Search for several queries in one ChromaDB call (see IVectorRepository).
+
+        Args:
+            query_vectors: Query embedding vectors (list or 2-D array)
+            limit: Maximum number of results per query
+            fields: Metadata keys to return as columns (None where missing)
+
+        Returns:
+            One column dict per query, in input order
+        """
+        try:
+            # ChromaDB takes float32 arrays as-is; no per-float boxing
+            query_vectors = np.atleast_2d(np.asarray(query_vectors, dtype=np.float32))
+
+            results = self.collection.query(
+                query_embeddings=query_vectors,
+                n_results=limit,
+                include=["metadatas", "distances"]
+            )
+
+            batch: List[Dict[str, List[Any]]] = []
+            for row, ids in enumerate(results['ids'] or [[] for _ in query_vectors]):
+                distances = results['distances'][row] if results['distances'] else [0.0] * len(ids)
+                metadatas = results['metadatas'][row] if results['metadatas'] else [{}] * len(ids)
+
+                # Same distance-to-similarity mapping as search()
+                columns: Dict[str, List[Any]] = {
+                    'ids': list(ids),
+                    'scores': [1.0 - (distance / 2.0) for distance in distances],
+                }
+                for field_name in fields:
+                    columns[field_name] = [metadata.get(field_name) for metadata in metadatas]
+                batch.append(columns)
+
+            logger.debug(f"Batch search returned {sum(len(c['ids']) for c in batch)} results "
+                         f"for {len(batch)} queries")
+            return batch
+
+        except Exception as e:
+            logger.error(f"Search failed: {str(e)}")
+            raise VectorRepositoryError(f"Search failed: {str(e)}")
+
     def get_by_id(self, id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve vector and metadata by ID.
@@ -270,6 +375,53 @@ class ChromaVectorRepository(IVectorRepository):
             logger.error(f"Failed to get vector {id}: {str(e)}")
             raise VectorRepositoryError(f"Get failed: {str(e)}")
 
+    def get_vectors(self, ids: Sequence[str]) -> np.ndarray:
+        """
+        Retrieve the stored vectors for several IDs in one query.
+
+        Args:
+            ids: Identifiers to fetch
+
+        Returns:
+            (len(ids), D) float32 array in input order
+
+        Raises:
+            VectorNotFoundError: If any ID is not stored
+        """
+        try:
+            result = self.collection.get(ids=list(ids), include=["embeddings"])
+        except Exception as e:
+            logger.error(f"Failed to get vectors: {str(e)}")
+            raise VectorRepositoryError(f"Get vectors failed: {str(e)}")
+
+        # ChromaDB does not guarantee the requested order
+        position = {id: row for row, id in enumerate(result['ids'])}
+        missing = [id for id in ids if id not in position]
+        if missing:
+            raise VectorNotFoundError(f"Vectors not found: {missing[:5]}")
+        embeddings = np.asarray(result['embeddings'], dtype=np.float32)
+        return embeddings[[position[id] for id in ids]]
+
+    def get_all(self) -> Dict[str, List[Any]]:
+        """
+        Retrieve every vector with its metadata.
+
+        Used to build in-memory indexes over the whole collection.
+
+        Returns:
+            Dict with parallel 'ids', 'vectors' and 'metadatas' lists
+        """
+        try:
+            result = self.collection.get(include=["embeddings", "metadatas"])
+            ids = result['ids'] or []
+            vectors = result['embeddings'] if result['embeddings'] is not None else []
+            metadatas = result['metadatas'] or [{}] * len(ids)
+            return {'ids': list(ids), 'vectors': vectors, 'metadatas': list(metadatas)}
+
+        except Exception as e:
+            logger.error(f"Failed to load vectors: {str(e)}")
+            raise VectorRepositoryError(f"Get all failed: {str(e)}")
+
     def delete(self, id: str) -> bool:
         """
         Delete a vector by ID.
@@ -323,6 +475,8 @@ class ChromaVectorRepository(IVectorRepository):
                 name=self.collection_name,
                 metadata={"hnsw:space": "cosine"}
             )
+            if self.ef_search is not None:
+                self._set_ef_search(self.ef_search)
 
             logger.warning(f"Cleared all vectors from collection '{self.collection_name}'")
 
@@ -335,7 +489,7 @@ class ChromaVectorRepository(IVectorRepository):
         Sanitize metadata for ChromaDB compatibility.
 
         ChromaDB requires metadata values to be strings, ints, floats, or bools.
-        Complex types (lists, dicts) are converted to strings.
+        Complex types (lists, dicts) are stored as JSON strings.
 
         Args:
             metadata: Raw metadata dictionary
@@ -352,9 +506,11 @@ class ChromaVectorRepository(IVectorRepository):
             # Keep primitives as-is
             if isinstance(value, (str, int, float, bool)):
                 sanitized[key] = value
-            # Convert complex types to strings
+            # Encode complex types as JSON so readers can decode them safely
             elif isinstance(value, (list, dict)):
-                sanitized[key] = str(value)
+                sanitized[key] = (
+                    orjson.dumps(value).decode() if HAS_ORJSON else json.dumps(value)
+                )
             else:
                 # Convert other types to string
                 sanitized[key] = str(value)
@@ -0,0 +1,72 @@
+"""
+Infrastructure: Locality-Preserving Vector Ordering
+
+This module computes an insertion order that places similar embeddings next
+to each other. HNSW indexes (ChromaDB included) number nodes in insertion
+order, so inserting a rebuilt collection in this order clusters each node's
+graph neighbours in memory and cuts cache misses during traversal. The cost
+is paid once, offline, when the collection is rebuilt.
+
+Author: University of Manchester RSE Team
+"""
+
+import logging
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def _principal_axis(vectors: np.ndarray, iterations: int = 8) -> np.ndarray:
+    """Approximate top principal direction of centered rows by power iteration."""
+    axis = vectors[np.argmax(np.einsum('ij,ij->i', vectors, vectors))].copy()
+    for _ in range(iterations):
+        axis = vectors.T @ (vectors @ axis)
+        norm = np.linalg.norm(axis)
+        if norm == 0:
+            break
+        axis /= norm
+    return axis
+
+
+def locality_order(vectors, leaf_size: int = 64) -> np.ndarray:
+    """
+    Order vectors so that neighbours in embedding space are adjacent.
+
+    Recursively splits the set at the median of its principal axis (a PCA
+    tree) and concatenates the leaves left to right, so each leaf and its
+    sibling subtrees occupy contiguous positions.
+
+    Args:
+        vectors: (N, D) array-like of embeddings
+        leaf_size: Stop splitting below this many vectors
+
+    Returns:
+        Permutation of range(N); vectors[order] is the new insertion order
+
+    Example:
+        >>> order = locality_order(embeddings)
+        >>> repo.upsert_vectors_batch([ids[i] for i in order], ...)
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    order = []
+    # Depth-first over (index array) nodes; right child pushed first so the
+    # left subtree is emitted first
+    stack = [np.arange(len(vectors))]
+    while stack:
+        indices = stack.pop()
+        if len(indices) <= leaf_size:
+            order.extend(indices.tolist())
+            continue
+
+        subset = vectors[indices]
+        centered = subset - subset.mean(axis=0)
+        projection = centered @ _principal_axis(centered)
+        ranked = indices[np.argsort(projection, kind='stable')]
+        middle = len(ranked) // 2
+        stack.append(ranked[middle:])
+        stack.append(ranked[:middle])
+
+    logger.debug(f"Computed locality order for {len(vectors)} vectors")
+    return np.asarray(order, dtype=np.intp)
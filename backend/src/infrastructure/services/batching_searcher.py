@@ -0,0 +1,154 @@
+"""
+Infrastructure: Batching Vector Searcher
+
+This module coalesces concurrent /api/search requests into a single
+multi-query call on the vector repository. Under load, queries that arrive
+within a few milliseconds of each other share one round-trip, so distance
+computations run over a (B, D) query matrix instead of B separate calls.
+
+Author: University of Manchester RSE Team
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from domain.repositories.vector_repository import IVectorRepository
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class BatchingSearcher:
+    """
+    Micro-batcher in front of IVectorRepository.search_many().
+
+    Callers await search(); a background task collects pending queries for
+    up to window_seconds (or until max_batch are queued), runs them as one
+    batch at the largest requested limit, and trims each result back to the
+    limit its caller asked for. The batch runs on the default executor, and
+    queries arriving meanwhile form the next batch.
+
+    Attributes:
+        repository: Vector repository to search
+        fields: Metadata keys returned as columns for every query
+        max_batch: Maximum queries per repository call
+        window_seconds: How long to wait for more queries after the first
+    """
+
+    MAX_BATCH = 32
+    WINDOW_SECONDS = 0.01
+
+    def __init__(
+        self,
+        repository: IVectorRepository,
+        fields: Sequence[str] = (),
+        max_batch: int = MAX_BATCH,
+        window_seconds: float = WINDOW_SECONDS
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            repository: Vector repository to search
+            fields: Metadata keys to return as columns
+            max_batch: Maximum queries per repository call
+            window_seconds: Collection window after the first queued query
+
+        Example:
+            >>> searcher = BatchingSearcher(vector_repository, fields=("title",))
+            >>> columns = await searcher.search(query_embedding, limit=10)
+        """
+        self.repository = repository
+        self.fields = tuple(fields)
+        self.max_batch = max_batch
+        self.window_seconds = window_seconds
+        self._queue: "asyncio.Queue[Tuple[Any, int, asyncio.Future]]" = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+
+    async def search(self, query_vector, limit: int = 10) -> Dict[str, List[Any]]:
+        """
+        Queue a query and wait for its batched result.
+
+        Args:
+            query_vector: Query embedding vector
+            limit: Maximum number of results to return
+
+        Returns:
+            Dict with 'ids' and 'scores' lists plus one list per field
+
+        Raises:
+            VectorRepositoryError: If the batched search fails
+        """
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((query_vector, limit, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[Any, int, asyncio.Future]]:
+        """Wait for one query, then gather more until the window closes."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.window_seconds
+
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        """Serve batches until cancelled."""
+        while True:
+            batch = await self._collect()
+            # Skip callers that gave up (e.g. client disconnected)
+            batch = [item for item in batch if not item[2].done()]
+            if not batch:
+                continue
+
+            vectors = np.stack([np.asarray(vector, dtype=np.float32) for vector, _, _ in batch])
+            limit = max(item_limit for _, item_limit, _ in batch)
+
+            try:
+                results = await asyncio.to_thread(
+                    self.repository.search_many, vectors, limit=limit, fields=self.fields
+                )
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            logger.debug(f"Batched {len(batch)} searches (limit={limit})")
+            for (_, item_limit, future), columns in zip(batch, results):
+                if not future.done():
+                    future.set_result({
+                        name: values[:item_limit] for name, values in columns.items()
+                    })
+
+    async def close(self) -> None:
+        """Stop the background task; pending callers are cancelled."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        while not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            future.cancel()
@@ -0,0 +1,178 @@
+"""
+Infrastructure: Cached Embedding Service
+
+This module wraps any IEmbeddingService with an in-memory LRU cache keyed by
+normalized query text, so repeated searches and chat questions (typeahead,
+pagination, refresh) skip the transformer forward pass.
+
+Author: University of Manchester RSE Team
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from application.interfaces.embedding_service import IEmbeddingService
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class CachedEmbeddingService(IEmbeddingService):
+    """
+    LRU-caching decorator around another embedding service.
+
+    Keys are a digest of the stripped text, so long chat messages do not
+    stay resident as keys. Case is preserved: the embedding model is
+    configurable and a cased model embeds "Land" and "land" differently.
+
+    Design Pattern: Decorator Pattern
+    - Same interface as the wrapped service
+    - Unknown attributes (e.g. generate_embeddings_batch) pass through
+
+    Attributes:
+        inner: Wrapped embedding service
+        maxsize: Maximum number of cached embeddings
+    """
+
+    DEFAULT_MAXSIZE = 4096
+
+    def __init__(self, inner: IEmbeddingService, maxsize: int = DEFAULT_MAXSIZE):
+        """
+        Initialize the cache.
+
+        Args:
+            inner: Embedding service that computes cache misses
+            maxsize: Maximum number of cached embeddings
+
+        Example:
+            >>> service = CachedEmbeddingService(HuggingFaceEmbeddingService())
+            >>> service.generate_embedding("Land cover") is service.generate_embedding("Land cover ")
+            True
+        """
+        self.inner = inner
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        # Requests may run on several threadpool workers at once
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(text: str) -> bytes:
+        """Cache key for a query."""
+        return hashlib.blake2b(text.strip().encode("utf-8"), digest_size=16).digest()
+
+    def generate_embedding(self, text: str) -> np.ndarray:
+        """
+        Return the cached embedding for text, computing it on a miss.
+
+        The lock is not held while the model runs, so a slow miss does not
+        block hits for other queries. Cached arrays are shared between
+        callers, so they are returned read-only.
+
+        Args:
+            text: Input text to embed
+
+        Returns:
+            np.ndarray: Read-only float32 embedding vector
+        """
+        key = self._normalize(text)
+
+        with self._lock:
+            embedding = self._cache.get(key)
+            if embedding is not None:
+                self._cache.move_to_end(key)
+                return embedding
+
+        embedding = np.array(self.inner.generate_embedding(text.strip()), dtype=np.float32)
+        embedding.flags.writeable = False
+
+        with self._lock:
+            self._cache[key] = embedding
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+        return embedding
+
+    def generate_embeddings(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Return embeddings for many texts, serving hits from the cache.
+
+        All misses (deduplicated) go to the wrapped service's batched
+        encoder in a single call, and are cached for later lookups.
+
+        Args:
+            texts: Input texts to embed
+            batch_size: Texts per model forward pass for the misses
+
+        Returns:
+            np.ndarray: (len(texts), dimension) float32 matrix
+        """
+        keys = [self._normalize(text) for text in texts]
+
+        found: Dict[bytes, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                embedding = self._cache.get(key)
+                if embedding is not None:
+                    self._cache.move_to_end(key)
+                    found[key] = embedding
+
+        # First text for each missing key, in input order
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text.strip()
+
+        if missing:
+            computed = np.asarray(
+                self.inner.generate_embeddings(list(missing.values()), batch_size=batch_size),
+                dtype=np.float32
+            )
+            with self._lock:
+                for key, row in zip(missing, computed):
+                    embedding = row.copy()
+                    embedding.flags.writeable = False
+                    found[key] = embedding
+                    self._cache[key] = embedding
+                    self._cache.move_to_end(key)
+                while len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+
+        if not keys:
+            return np.empty((0, self.get_dimension()), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    def get_dimension(self) -> int:
+        """Return the wrapped service's embedding dimension."""
+        return self.inner.get_dimension()
+
+    def get_model_name(self) -> str:
+        """Return the wrapped service's model name."""
+        return self.inner.get_model_name()
+
+    def clear(self) -> None:
+        """Drop all cached embeddings."""
+        with self._lock:
+            self._cache.clear()
+
+    def __getattr__(self, name):
+        """Delegate anything else to the wrapped service."""
+        return getattr(self.inner, name)
+
+    def __len__(self) -> int:
+        """Number of cached embeddings."""
+        return len(self._cache)
+
+    def __repr__(self):
+        """Return string representation."""
+        return f"CachedEmbeddingService(inner={self.inner!r}, size={len(self)}/{self.maxsize})"
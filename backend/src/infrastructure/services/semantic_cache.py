@@ -0,0 +1,181 @@
+"""
+Infrastructure: Semantic Response Cache
+
+This module provides an in-memory cache keyed by query embeddings rather than
+query text. A lookup returns a stored response when a previous query is close
+enough in embedding space (cosine similarity above a threshold), so
+paraphrases such as "land cover mapping" and "mapping land cover" share one
+search result or LLM answer.
+
+Author: University of Manchester RSE Team
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Bucket:
+    """
+    Cached entries for one namespace.
+
+    Embeddings live in a matrix preallocated to the cache size; the first
+    len(values) rows are in use, so inserts and evictions write one row
+    instead of re-stacking the whole matrix.
+    """
+    vectors: Optional[np.ndarray] = None
+    values: List[Any] = field(default_factory=list)
+    created: List[float] = field(default_factory=list)
+    last_used: List[float] = field(default_factory=list)
+
+    def matrix(self) -> np.ndarray:
+        """View of the rows in use."""
+        return self.vectors[:len(self.values)]
+
+    def store(self, vector: np.ndarray, value: Any, now: float, capacity: int) -> None:
+        """Store one entry in the next free row, or over the least recently used one."""
+        if self.vectors is None:
+            self.vectors = np.empty((capacity, vector.shape[0]), dtype=vector.dtype)
+
+        if len(self.values) < capacity:
+            self.vectors[len(self.values)] = vector
+            self.values.append(value)
+            self.created.append(now)
+            self.last_used.append(now)
+            return
+
+        index = min(range(len(self.last_used)), key=self.last_used.__getitem__)
+        self.vectors[index] = vector
+        self.values[index] = value
+        self.created[index] = now
+        self.last_used[index] = now
+
+    def drop(self, keep: np.ndarray) -> None:
+        """Keep only the rows where keep is True, compacted to the front."""
+        indices = np.flatnonzero(keep)
+        self.vectors[:len(indices)] = self.vectors[indices]
+        self.values = [self.values[i] for i in indices]
+        self.created = [self.created[i] for i in indices]
+        self.last_used = [self.last_used[i] for i in indices]
+
+
+class SemanticCache:
+    """
+    Bounded, TTL-limited cache looked up by embedding similarity.
+
+    Embeddings are L2-normalized on the way in, so a single matrix-vector
+    product gives the cosine similarity against every cached query. They are
+    stored at half precision, which halves the cache's memory; the rounding
+    error in a unit vector's cosine is far below any useful threshold.
+    Entries are grouped by namespace so that, for example, searches with
+    different limits never share results.
+
+    Attributes:
+        threshold: Minimum cosine similarity for a hit
+        maxsize: Maximum entries per namespace (least recently used evicted)
+        ttl_seconds: Entry lifetime, bounding staleness after re-indexing
+    """
+
+    # Storage dtype for cached query embeddings
+    VECTOR_DTYPE = np.float16
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        maxsize: int = 1024,
+        ttl_seconds: float = 300.0
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            maxsize: Maximum entries per namespace
+            ttl_seconds: Entry lifetime in seconds
+
+        Example:
+            >>> cache = SemanticCache(threshold=0.95)
+            >>> cache.put(embedding, response, namespace="search:10")
+            >>> cache.get(similar_embedding, namespace="search:10")
+        """
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        """Return the embedding as a unit-length float32 vector."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def get(self, embedding, namespace: str = "") -> Optional[Any]:
+        """
+        Return the cached value for the most similar query, if close enough.
+
+        Args:
+            embedding: Query embedding
+            namespace: Cache partition to search
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        query = self._normalize(embedding)
+        now = time.monotonic()
+
+        with self._lock:
+            bucket = self._buckets.get(namespace)
+            if bucket is None or not bucket.values:
+                return None
+
+            # Expire old entries before matching against them
+            expired = now - np.asarray(bucket.created) > self.ttl_seconds
+            if expired.any():
+                bucket.drop(~expired)
+                if not bucket.values:
+                    return None
+
+            # Upcast so the product runs through float32 BLAS
+            scores = bucket.matrix().astype(np.float32) @ query
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+
+            bucket.last_used[best] = now
+            logger.debug(f"Semantic cache hit ({namespace}): similarity={scores[best]:.3f}")
+            return bucket.values[best]
+
+    def put(self, embedding, value: Any, namespace: str = "") -> None:
+        """
+        Store a value under a query embedding.
+
+        Args:
+            embedding: Query embedding
+            value: Response to return for similar queries
+            namespace: Cache partition to store in
+        """
+        vector = self._normalize(embedding).astype(self.VECTOR_DTYPE)
+        now = time.monotonic()
+
+        with self._lock:
+            bucket = self._buckets.setdefault(namespace, _Bucket())
+            bucket.store(vector, value, now, self.maxsize)
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        """Total number of cached entries across namespaces."""
+        return sum(len(bucket.values) for bucket in self._buckets.values())
@@ -27,8 +27,10 @@ Author: University of Manchester RSE Team
 
 import argparse
 import logging
+import multiprocessing
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import List, Optional
@@ -51,7 +53,7 @@ from domain.repositories.vector_repository import VectorRepositoryError
 from infrastructure.etl.zip_extractor import ZipExtractor, ExtractedFile
 from infrastructure.etl.supporting_doc_fetcher import SupportingDocFetcher
 from infrastructure.etl.file_access_fetcher import FileAccessFetcher
-from application.services.document_processor import DocumentProcessorFactory
+from application.services.document_processor import get_document_processor_factory
 from domain.entities.data_file import DataFile, SupportingDocument
 
 
@@ -130,7 +132,13 @@ class ETLRunner:
         self.zip_extractor = ZipExtractor(overwrite=True)  # Overwrite for idempotency
         self.doc_fetcher = SupportingDocFetcher()
         self.file_access_fetcher = FileAccessFetcher(max_size_mb=fileaccess_max_size_mb)
-        self.doc_processor_factory = DocumentProcessorFactory()
+        # Large PDFs are split into page ranges extracted in parallel; workers
+        # are spawned so they don't inherit the loaded embedding model
+        self.pdf_pool = ProcessPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        self.doc_processor_factory = get_document_processor_factory(pdf_executor=self.pdf_pool)
 
         # Initialize database if persistence is enabled
         self.db = None
@@ -314,18 +322,21 @@ class ETLRunner:
                 # Prepare metadata for vector store
                 vector_metadata = {
                     "title": metadata.title,
-                    "abstract": metadata.abstract[:500],  # Truncate for storage
+                    "abstract": metadata.abstract,
+                    # Ready-made search snippet, so /api/search never slices
+                    "abstract_preview": metadata.abstract[:500],
                     "contact_email": metadata.contact_email or "",
                     "dataset_language": metadata.dataset_language or "eng",
-                    "keywords": str(metadata.keywords),
+                    "keywords": metadata.keywords,  # JSON-encoded by the repository
                     "type": "dataset",
                 }
 
                 # Add geographic/temporal info if available
                 if metadata.bounding_box:
                     vector_metadata["has_geo_extent"] = True
-                    vector_metadata["center_lat"] = str(metadata.bounding_box.get_center()[1])
-                    vector_metadata["center_lon"] = str(metadata.bounding_box.get_center()[0])
+                    center_lon, center_lat = metadata.bounding_box.center
+                    vector_metadata["center_lat"] = float(center_lat)
+                    vector_metadata["center_lon"] = float(center_lon)
                 else:
                     vector_metadata["has_geo_extent"] = False
 
@@ -473,18 +484,15 @@ class ETLRunner:
                         if self.enable_vector_search and self.vector_repository and self.embedding_service:
                             try:
                                 logger.info(f"Generating embeddings for {len(processed.chunks)} chunks...")
-                                ids = []
-                                vectors = []
-                                metadatas = []
-                                
-                                for chunk in processed.chunks:
-                                    # Generate embedding
-                                    vector = self.embedding_service.generate_embedding(chunk.content)
-                                    
-                                    ids.append(chunk.id)
-                                    vectors.append(vector)
-                                    # ChromaDB metadata must be flat
-                                    metadatas.append({
+                                chunks = processed.chunks
+                                # One batched model call, then one batched upsert
+                                vectors = self.embedding_service.generate_embeddings(
+                                    [chunk.content for chunk in chunks]
+                                )
+                                ids = [chunk.id for chunk in chunks]
+                                # ChromaDB metadata must be flat
+                                metadatas = [
+                                    {
                                         "type": "document",
                                         "parent_id": dataset_id,
                                         "filename": doc.filename,
@@ -492,7 +500,9 @@ class ETLRunner:
                                         "chunk_index": chunk.chunk_index,
                                         "content": chunk.content[:1000],  # Truncate content in metadata if too long
                                         "abstract": chunk.content[:1000]  # Map to abstract for search compatibility
-                                    })
+                                    }
+                                    for chunk in chunks
+                                ]
                                 
                                 # Batch upsert
                                 self.vector_repository.upsert_vectors_batch(ids, vectors, metadatas)
@@ -514,6 +524,8 @@ class ETLRunner:
             self.fetcher.close()
         if self.zip_extractor:
             self.zip_extractor.close()
+        if self.pdf_pool:
+            self.pdf_pool.shutdown(wait=True)
 
 
 def print_metadata_summary(metadata: Metadata):
@@ -24,6 +24,7 @@ from src.infrastructure.persistence.sqlite.connection import get_database
 from src.infrastructure.persistence.sqlite.models import MetadataModel, DatasetModel
 from src.infrastructure.services.embedding_service import HuggingFaceEmbeddingService
 from src.infrastructure.persistence.vector.chroma_repository import ChromaVectorRepository
+from src.infrastructure.persistence.vector.reordering import locality_order
 
 # Configure logging
 logging.basicConfig(
@@ -35,6 +36,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Vectors per ChromaDB upsert call
+UPSERT_BATCH_SIZE = 500
+
 def main():
     logger.info("Starting vector regeneration from SQLite...")
     
@@ -56,9 +60,11 @@ def main():
         logger.error(f"Failed to initialize vector components: {e}")
         return
 
-    # Process all datasets
+    # Process all datasets; vectors are collected first and inserted in
+    # locality order, so the HNSW graph's neighbours sit close in memory
     success_count = 0
     fail_count = 0
+    ids, embeddings, metadatas = [], [], []
     
     with db.session_scope() as session:
         # Fetch all datasets with their metadata
@@ -82,11 +88,12 @@ def main():
                 # Prepare vector metadata
                 vector_metadata = {
                     "title": metadata.title,
-                    "abstract": metadata.abstract[:500] if metadata.abstract else "",
+                    "abstract": metadata.abstract or "",
+                    "abstract_preview": metadata.abstract[:500] if metadata.abstract else "",
                     "contact_email": metadata.contact_email or "",
                     "dataset_language": metadata.dataset_language or "eng",
-                    # Convert list to string for ChromaDB metadata
-                    "keywords": str(metadata.get_keywords()),
+                    # Stored as a JSON string by the vector repository
+                    "keywords": metadata.get_keywords(),
                 }
                 
                 # Geo info
@@ -103,8 +110,8 @@ def main():
                             north = float(bbox.get('north_latitude', 0))
                             
                             vector_metadata["has_geo_extent"] = True
-                            vector_metadata["center_lat"] = str((south + north) / 2)
-                            vector_metadata["center_lon"] = str((west + east) / 2)
+                            vector_metadata["center_lat"] = (south + north) / 2
+                            vector_metadata["center_lon"] = (west + east) / 2
                     except:
                         vector_metadata["has_geo_extent"] = False
                 else:
@@ -118,21 +125,32 @@ def main():
                 else:
                     vector_metadata["has_temporal_extent"] = False
                 
-                # Upsert to Chroma
-                vector_repo.upsert_vector(
-                    id=dataset.id,
-                    vector=embedding,
-                    metadata=vector_metadata
-                )
+                ids.append(dataset.id)
+                embeddings.append(embedding)
+                metadatas.append(vector_metadata)
                 
-                success_count += 1
                 if i % 10 == 0:
-                    logger.info(f"[{i}/{total}] Processed... Success so far: {success_count}")
+                    logger.info(f"[{i}/{total}] Embedded... So far: {len(ids)}")
                     
             except Exception as e:
                 logger.error(f"Failed to process {dataset.id}: {e}")
                 fail_count += 1
 
+    # Upsert to Chroma in locality order (only affects newly inserted vectors)
+    order = locality_order(embeddings).tolist() if embeddings else []
+    for start in range(0, len(order), UPSERT_BATCH_SIZE):
+        batch = order[start:start + UPSERT_BATCH_SIZE]
+        try:
+            vector_repo.upsert_vectors_batch(
+                ids=[ids[j] for j in batch],
+                vectors=[embeddings[j] for j in batch],
+                metadatas=[metadatas[j] for j in batch]
+            )
+            success_count += len(batch)
+        except Exception as e:
+            logger.error(f"Failed to upsert batch at {start}: {e}")
+            fail_count += len(batch)
+
     logger.info("=" * 60)
     logger.info("REGENERATION COMPLETE")
     logger.info(f"Total processed: {total}")
@@ -8,6 +8,8 @@ import sys
 import json
 from pathlib import Path
 
+import numpy as np
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
@@ -180,9 +182,13 @@ def test_semantic_database():
         # Test 2.2: Vector Generation
         test_text = "land cover mapping United Kingdom"
         embedding = embedding_service.generate_embedding(test_text)
-        is_vector = len(embedding) == 384 and all(isinstance(x, float) for x in embedding)
+        is_vector = (
+            isinstance(embedding, np.ndarray)
+            and embedding.shape == (384,)
+            and embedding.dtype == np.float32
+        )
         print_result("Vector Generation", is_vector,
-                    f"Generated {len(embedding)}-dimensional vector")
+                    f"Generated {embedding.shape[0]}-dimensional vector")
         results.append(is_vector)
 
         # Test 2.3: ChromaDB Repository
@@ -63,12 +63,12 @@ def main():
             print(f"   Title: {result.metadata.get('title', 'N/A')}")
             print(f"   Keywords: {result.metadata.get('keywords', 'N/A')}")
 
-            if result.metadata.get('has_geo_extent') == 'True':
+            if result.metadata.get('has_geo_extent') in (True, 'True'):
                 center_lat = result.metadata.get('center_lat', 'N/A')
                 center_lon = result.metadata.get('center_lon', 'N/A')
                 print(f"   Geographic Center: {center_lat}°N, {center_lon}°E")
 
-            if result.metadata.get('has_temporal_extent') == 'True':
+            if result.metadata.get('has_temporal_extent') in (True, 'True'):
                 temporal_start = result.metadata.get('temporal_start', 'N/A')
                 temporal_end = result.metadata.get('temporal_end', 'N/A')
                 print(f"   Temporal Range: {temporal_start} to {temporal_end}")
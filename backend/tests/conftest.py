@@ -0,0 +1,8 @@
+"""
+Shared pytest configuration: makes the backend/src packages importable.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
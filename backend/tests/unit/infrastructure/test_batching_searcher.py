@@ -0,0 +1,115 @@
+"""
+Unit tests for BatchingSearcher with a fake vector repository.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from domain.repositories.vector_repository import VectorRepositoryError
+from infrastructure.services.batching_searcher import BatchingSearcher
+
+
+class FakeRepository:
+    """Returns `limit` hits per query, tagged with the query's first component."""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    def search_many(self, query_vectors, limit=10, fields=()):
+        self.calls.append((np.array(query_vectors), limit, tuple(fields)))
+        if self.error is not None:
+            raise self.error
+        batch = []
+        for vector in query_vectors:
+            tag = int(vector[0])
+            columns = {
+                'ids': [f"{tag}-{rank}" for rank in range(limit)],
+                'scores': [1.0 - rank / 100 for rank in range(limit)],
+            }
+            for name in fields:
+                columns[name] = [f"{name}-{tag}-{rank}" for rank in range(limit)]
+            batch.append(columns)
+        return batch
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_concurrent_queries_share_one_call_and_keep_their_limits():
+    repository = FakeRepository()
+
+    async def scenario():
+        searcher = BatchingSearcher(repository, fields=("title",), window_seconds=0.05)
+        try:
+            return await asyncio.gather(
+                searcher.search([1.0, 0.0], limit=2),
+                searcher.search([2.0, 0.0], limit=5),
+                searcher.search([3.0, 0.0], limit=1),
+            )
+        finally:
+            await searcher.close()
+
+    first, second, third = run(scenario())
+
+    assert len(repository.calls) == 1
+    vectors, limit, fields = repository.calls[0]
+    assert vectors.shape == (3, 2)
+    assert limit == 5
+    assert fields == ("title",)
+
+    assert first['ids'] == ["1-0", "1-1"]
+    assert first['title'] == ["title-1-0", "title-1-1"]
+    assert second['ids'] == [f"2-{rank}" for rank in range(5)]
+    assert len(second['scores']) == 5
+    assert third == {'ids': ["3-0"], 'scores': [1.0], 'title': ["title-3-0"]}
+
+
+def test_batch_is_capped_at_max_batch():
+    repository = FakeRepository()
+
+    async def scenario():
+        searcher = BatchingSearcher(repository, max_batch=2, window_seconds=0.05)
+        try:
+            return await asyncio.gather(*[
+                searcher.search([float(i), 0.0], limit=1) for i in range(5)
+            ])
+        finally:
+            await searcher.close()
+
+    results = run(scenario())
+
+    assert [r['ids'] for r in results] == [[f"{i}-0"] for i in range(5)]
+    assert [len(vectors) for vectors, _, _ in repository.calls] == [2, 2, 1]
+
+
+def test_repository_error_reaches_every_caller():
+    repository = FakeRepository(error=VectorRepositoryError("down"))
+
+    async def scenario():
+        searcher = BatchingSearcher(repository, window_seconds=0.05)
+        try:
+            return await asyncio.gather(
+                searcher.search([1.0], limit=1),
+                searcher.search([2.0], limit=1),
+                return_exceptions=True
+            )
+        finally:
+            await searcher.close()
+
+    results = run(scenario())
+
+    assert all(isinstance(result, VectorRepositoryError) for result in results)
+
+
+def test_close_stops_the_worker():
+    async def scenario():
+        searcher = BatchingSearcher(FakeRepository(), window_seconds=0.0)
+        await searcher.search([1.0], limit=1)
+        await searcher.close()
+        return searcher._worker
+
+    assert run(scenario()) is None
@@ -0,0 +1,142 @@
+"""
+Unit tests for BruteForceVectorRepository, including the int8 path, against
+a fake in-memory wrapped repository.
+"""
+
+import numpy as np
+import pytest
+
+from domain.repositories.vector_repository import VectorNotFoundError
+from infrastructure.persistence.vector.brute_force_repository import (
+    BruteForceVectorRepository,
+    quantize_int8,
+)
+
+
+N, DIM = 500, 32
+
+
+class FakeRepository:
+    """Stores vectors in memory and records which read methods are used."""
+
+    def __init__(self, vectors):
+        self.ids = [f"v{i}" for i in range(len(vectors))]
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        self.calls = []
+
+    def get_all(self):
+        self.calls.append("get_all")
+        return {
+            'ids': list(self.ids),
+            'vectors': self.vectors.tolist(),
+            'metadatas': [{'title': f"title {id}"} for id in self.ids],
+        }
+
+    def get_vectors(self, ids):
+        self.calls.append("get_vectors")
+        position = {id: row for row, id in enumerate(self.ids)}
+        missing = [id for id in ids if id not in position]
+        if missing:
+            raise VectorNotFoundError(f"Vectors not found: {missing}")
+        return self.vectors[[position[id] for id in ids]]
+
+    def get_by_id(self, id):
+        self.calls.append("get_by_id")
+        return None
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(0).standard_normal((N, DIM)).astype(np.float32)
+
+
+@pytest.fixture
+def queries():
+    return np.random.default_rng(1).standard_normal((20, DIM)).astype(np.float32)
+
+
+def exact_top_k(vectors, query, k):
+    """Reference cosine top-k by brute force in float64."""
+    matrix = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = matrix.astype(np.float64) @ (query / np.linalg.norm(query))
+    return [f"v{i}" for i in np.argsort(-scores, kind='stable')[:k]]
+
+
+def test_quantize_int8_round_trips_within_one_step(vectors):
+    codes, scales = quantize_int8(vectors)
+
+    assert codes.dtype == np.int8
+    assert np.abs(codes).max() <= 127
+    error = np.abs(codes * scales[:, None] - vectors)
+    assert np.all(error <= scales[:, None] / 2 + 1e-6)
+
+
+def test_float32_search_returns_exact_top_k(vectors, queries):
+    repository = BruteForceVectorRepository(FakeRepository(vectors))
+
+    for query in queries:
+        results = repository.search(query, limit=10)
+        assert [r.id for r in results] == exact_top_k(vectors, query, 10)
+        scores = [r.score for r in results]
+        assert scores == sorted(scores, reverse=True)
+        assert results[0].metadata == {'title': f"title {results[0].id}"}
+
+
+def test_int8_reranked_top_k_matches_float32(vectors, queries):
+    exact = BruteForceVectorRepository(FakeRepository(vectors))
+    inner = FakeRepository(vectors)
+    quantized = BruteForceVectorRepository(inner, quantize=True)
+
+    for query in queries:
+        expected = exact.search(query, limit=10)
+        actual = quantized.search(query, limit=10)
+        assert [r.id for r in actual] == [r.id for r in expected]
+        np.testing.assert_allclose(
+            [r.score for r in actual], [r.score for r in expected], rtol=1e-5
+        )
+    assert "get_by_id" not in inner.calls
+
+
+def test_int8_without_rerank_finds_most_of_the_top_k(vectors, queries):
+    quantized = BruteForceVectorRepository(FakeRepository(vectors), quantize=True, rerank_factor=1)
+
+    overlaps = [
+        len({r.id for r in quantized.search(query, limit=10)} & set(exact_top_k(vectors, query, 10)))
+        for query in queries
+    ]
+
+    assert np.mean(overlaps) >= 9
+
+
+def test_search_many_trims_each_query_to_limit(vectors, queries):
+    repository = BruteForceVectorRepository(FakeRepository(vectors), quantize=True)
+
+    batch = repository.search_many(queries[:3], limit=4, fields=("title",))
+
+    assert len(batch) == 3
+    for columns, query in zip(batch, queries[:3]):
+        assert columns['ids'] == exact_top_k(vectors, query, 4)
+        assert columns['title'] == [f"title {id}" for id in columns['ids']]
+
+
+def test_stale_snapshot_falls_back_to_int8_scores(vectors, queries):
+    inner = FakeRepository(vectors)
+    repository = BruteForceVectorRepository(inner, quantize=True)
+    repository.search(queries[0], limit=5)
+    inner.ids = []  # everything deleted behind the snapshot's back
+
+    results = repository.search(queries[0], limit=5)
+
+    assert len(results) == 5
+
+
+def test_reads_pass_through_to_the_wrapped_repository(vectors):
+    inner = FakeRepository(vectors)
+    repository = BruteForceVectorRepository(inner)
+
+    fetched = repository.get_vectors(["v3", "v1"])
+    everything = repository.get_all()
+
+    np.testing.assert_array_equal(fetched, vectors[[3, 1]])
+    assert everything['ids'] == inner.ids
+    assert inner.calls == ["get_vectors", "get_all"]
@@ -0,0 +1,117 @@
+"""
+Unit tests for CachedEmbeddingService with a fake wrapped service.
+"""
+
+from typing import List
+
+import numpy as np
+
+from application.interfaces.embedding_service import IEmbeddingService
+from infrastructure.services.cached_embedding_service import CachedEmbeddingService
+
+
+DIM = 4
+
+
+class FakeEmbeddingService(IEmbeddingService):
+    """Deterministic embeddings that record every call."""
+
+    def __init__(self):
+        self.single_calls: List[str] = []
+        self.batch_calls: List[List[str]] = []
+
+    @staticmethod
+    def _embed(text: str) -> np.ndarray:
+        seed = sum(text.encode("utf-8"))
+        return np.random.default_rng(seed).standard_normal(DIM).astype(np.float32)
+
+    def generate_embedding(self, text: str) -> np.ndarray:
+        self.single_calls.append(text)
+        return self._embed(text)
+
+    def generate_embeddings(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        self.batch_calls.append(list(texts))
+        return np.stack([self._embed(text) for text in texts])
+
+    def get_dimension(self) -> int:
+        return DIM
+
+    def get_model_name(self) -> str:
+        return "fake"
+
+
+def test_repeated_text_is_served_from_cache():
+    inner = FakeEmbeddingService()
+    service = CachedEmbeddingService(inner)
+
+    first = service.generate_embedding("land cover")
+    second = service.generate_embedding("  land cover ")
+
+    assert second is first
+    assert inner.single_calls == ["land cover"]
+    assert not first.flags.writeable
+
+
+def test_keys_preserve_case():
+    inner = FakeEmbeddingService()
+    service = CachedEmbeddingService(inner)
+
+    service.generate_embedding("Land cover")
+    service.generate_embedding("land cover")
+
+    assert inner.single_calls == ["Land cover", "land cover"]
+
+
+def test_least_recently_used_entry_is_evicted():
+    inner = FakeEmbeddingService()
+    service = CachedEmbeddingService(inner, maxsize=2)
+
+    service.generate_embedding("a")
+    service.generate_embedding("b")
+    service.generate_embedding("a")
+    service.generate_embedding("c")  # evicts "b"
+    service.generate_embedding("a")
+    service.generate_embedding("b")
+
+    assert inner.single_calls == ["a", "b", "c", "b"]
+    assert len(service) == 2
+
+
+def test_batch_sends_all_distinct_misses_in_one_call():
+    inner = FakeEmbeddingService()
+    service = CachedEmbeddingService(inner)
+    service.generate_embedding("cached")
+
+    result = service.generate_embeddings(["x", "cached", "y", "x "])
+
+    assert inner.batch_calls == [["x", "y"]]
+    assert result.shape == (4, DIM)
+    assert result.dtype == np.float32
+    for row, text in zip(result, ["x", "cached", "y", "x"]):
+        np.testing.assert_array_equal(row, FakeEmbeddingService._embed(text))
+
+
+def test_batch_results_are_cached_for_single_lookups():
+    inner = FakeEmbeddingService()
+    service = CachedEmbeddingService(inner)
+
+    service.generate_embeddings(["x", "y"])
+    service.generate_embedding("y")
+
+    assert inner.single_calls == []
+
+
+def test_batch_of_cache_hits_does_not_call_inner():
+    inner = FakeEmbeddingService()
+    service = CachedEmbeddingService(inner)
+    service.generate_embeddings(["x", "y"])
+
+    service.generate_embeddings(["y", "x"])
+
+    assert inner.batch_calls == [["x", "y"]]
+
+
+def test_empty_batch_has_model_dimension():
+    service = CachedEmbeddingService(FakeEmbeddingService())
+
+    assert service.generate_embeddings([]).shape == (0, DIM)
@@ -0,0 +1,116 @@
+"""
+Unit tests for SemanticCache: similarity threshold, LRU eviction and TTL.
+"""
+
+import numpy as np
+import pytest
+
+from infrastructure.services import semantic_cache
+from infrastructure.services.semantic_cache import SemanticCache
+
+
+DIM = 8
+
+
+def unit(i):
+    """Basis vector e_i."""
+    vector = np.zeros(DIM, dtype=np.float32)
+    vector[i] = 1.0
+    return vector
+
+
+def at_cosine(cos):
+    """Unit vector whose cosine similarity with e_0 is cos."""
+    return cos * unit(0) + np.sqrt(1.0 - cos ** 2) * unit(1)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for time.monotonic inside the cache."""
+    now = [1000.0]
+    monkeypatch.setattr(semantic_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_hit_above_threshold_and_miss_below():
+    cache = SemanticCache(threshold=0.9)
+    cache.put(unit(0), "answer")
+
+    assert cache.get(at_cosine(0.95)) == "answer"
+    assert cache.get(at_cosine(0.85)) is None
+
+
+def test_similarity_equal_to_threshold_is_a_hit():
+    cache = SemanticCache(threshold=1.0)
+    cache.put(unit(0), "answer")
+
+    assert cache.get(unit(0)) == "answer"
+
+
+def test_embeddings_are_normalized_before_scoring():
+    cache = SemanticCache(threshold=0.99)
+    cache.put(5.0 * unit(0), "answer")
+
+    assert cache.get(0.1 * unit(0)) == "answer"
+
+
+def test_namespaces_do_not_share_entries():
+    cache = SemanticCache(threshold=0.9)
+    cache.put(unit(0), "ten", namespace="search:10")
+
+    assert cache.get(unit(0), namespace="search:20") is None
+    assert cache.get(unit(0), namespace="search:10") == "ten"
+
+
+def test_full_namespace_overwrites_least_recently_used(clock):
+    cache = SemanticCache(threshold=0.99, maxsize=2)
+    cache.put(unit(0), "a")
+    clock[0] += 1
+    cache.put(unit(1), "b")
+    clock[0] += 1
+    assert cache.get(unit(0)) == "a"  # a is now more recent than b
+    clock[0] += 1
+
+    cache.put(unit(2), "c")
+
+    assert len(cache) == 2
+    assert cache.get(unit(1)) is None
+    assert cache.get(unit(0)) == "a"
+    assert cache.get(unit(2)) == "c"
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = SemanticCache(threshold=0.99, ttl_seconds=10.0)
+    cache.put(unit(0), "old")
+    clock[0] += 5
+    cache.put(unit(1), "new")
+
+    clock[0] += 6  # "old" is 11s old, "new" 6s
+
+    assert cache.get(unit(0)) is None
+    assert cache.get(unit(1)) == "new"
+    assert len(cache) == 1
+
+
+def test_entries_added_after_expiry_are_scored_against_the_right_rows(clock):
+    cache = SemanticCache(threshold=0.99, ttl_seconds=10.0)
+    cache.put(unit(0), "expired")
+    clock[0] += 11
+    cache.put(unit(1), "b")
+    assert cache.get(unit(1)) == "b"  # compacts the expired row away
+
+    cache.put(unit(2), "c")
+
+    assert cache.get(unit(2)) == "c"
+    assert cache.get(unit(0)) is None
+
+
+def test_clear_drops_everything():
+    cache = SemanticCache()
+    cache.put(unit(0), "a", namespace="x")
+    cache.put(unit(1), "b", namespace="y")
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.get(unit(0), namespace="x") is None
@@ -54,8 +54,8 @@ export interface HealthCheck {
   vector_db_connected: boolean;
   total_datasets: number;
   total_vectors: number;
-  embedding_model: string;
-  embedding_dimension: number;
+  embedding_model: string | null;
+  embedding_dimension: number | null;
 }
 
 // Chat/RAG types